@@ -0,0 +1,423 @@
+"""
+추천 엔진 확장성 벤치마크 - 합성 카탈로그(1천 ~ 100만 아이템)로 로드/메모리/지연/처리량 측정
+
+entity_list.txt와 같은 trait 16개 / concept 15개에 아이템 N개를 붙인 그래프 스냅샷,
+임베딩 아티팩트, products.csv를 합성하고 크기/점수 방식마다 새 프로세스에서 측정한다.
+    - load_ms          : RecommendationEngine.load_model 시간
+    - peak_rss_mb      : 프로세스 최대 메모리, model_rss_mb: 로드 전후 메모리 차이
+    - single           : recommend 단건 지연 시간 p50/p90/p99 (결과 캐시 끔)
+    - batch            : get_batch_recommendations 배치 지연 시간과 초당 User 수
+
+결과는 JSON으로 저장하고, --baseline으로 이전 결과를 주면 지연 시간이 허용 범위를 넘게
+늘어난 항목을 회귀로 보고하고 종료 코드 1로 끝난다.
+
+실행:
+    python benchmarks/engine_benchmark.py --sizes 1000 10000 --json bench.json
+    python benchmarks/engine_benchmark.py --sizes 1000000 --scoring embedding propagation
+    python benchmarks/engine_benchmark.py --json new.json --baseline bench.json --tolerance 0.2
+"""
+import io
+import os
+import sys
+import csv
+import json
+import time
+import platform
+import statistics
+import subprocess
+import contextlib
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from data.graph_snapshot import GraphSnapshot, NODE_TYPES, RELATIONS
+from models.embedding_artifact import save_embedding_artifact
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+ENTITY_LIST_PATH = PROJECT_ROOT / "data" / "graph_data" / "entity_list.txt"
+DEFAULT_DATA_DIR = PROJECT_ROOT / "benchmarks" / "synthetic"
+
+# 합성 아이템 노드 ID / 상품 ID 시작 번호 (실제 그래프와 같이 아이템은 1000번대부터)
+ITEM_NODE_START = 1000
+PRODUCT_ID_START = 10_000_000
+NUM_CATEGORIES = 20
+NUM_THEMES = 8
+
+# 합성 데이터 형식이 바뀌면 올려서 기존 캐시를 다시 만들도록
+SYNTHETIC_FORMAT_VERSION = 1
+
+# --baseline 비교 대상 지표 (값이 클수록 나쁜 지표만)
+REGRESSION_METRICS = (
+    ('load_ms',),
+    ('single', 'p50_ms'),
+    ('single', 'p99_ms'),
+    ('batch', 'p50_ms'),
+)
+
+
+def read_feature_nodes(entity_list_path=ENTITY_LIST_PATH):
+    """entity_list.txt의 trait/concept 노드 (이름, ID, 타입) 목록"""
+    features = []
+    with open(entity_list_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] in ('trait', 'concept'):
+                features.append((parts[0], int(parts[1]), parts[2]))
+    return sorted(features, key=lambda feature: feature[1])
+
+
+def _pick_columns(rng, num_rows, num_columns, per_row, chunk_rows=100_000):
+    """행마다 서로 다른 열 per_row개를 무작위로 선택 → (rows x per_row)"""
+    picked = np.empty((num_rows, per_row), dtype=np.int64)
+    for start in range(0, num_rows, chunk_rows):
+        noise = rng.random((min(chunk_rows, num_rows - start), num_columns), dtype=np.float32)
+        picked[start:start + chunk_rows] = np.argpartition(noise, per_row - 1, axis=1)[:, :per_row]
+    return picked
+
+
+def synthesize_catalog(data_dir, num_items, dim=64, seed=0, traits_per_item=3, concepts_per_item=3):
+    """합성 그래프 스냅샷 / 임베딩 아티팩트 / products.csv 생성 (같은 설정이 이미 있으면 재사용)"""
+    data_dir = Path(data_dir)
+    meta_path = data_dir / "synthetic.json"
+    meta = {
+        'format_version': SYNTHETIC_FORMAT_VERSION,
+        'num_items': num_items,
+        'dim': dim,
+        'seed': seed,
+        'traits_per_item': traits_per_item,
+        'concepts_per_item': concepts_per_item
+    }
+    if meta_path.exists() and json.loads(meta_path.read_text(encoding='utf-8')) == meta:
+        return data_dir
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    features = read_feature_nodes()
+    trait_rows = np.asarray([row for row, feature in enumerate(features) if feature[2] == 'trait'])
+    concept_rows = np.asarray([row for row, feature in enumerate(features) if feature[2] == 'concept'])
+    num_features = len(features)
+
+    # 노드 행 순서: trait/concept(200~315번) → 아이템(1000번~), 스냅샷은 노드 ID 오름차순
+    item_rows = num_features + np.arange(num_items)
+    node_ids = np.concatenate([
+        np.asarray([feature[1] for feature in features], dtype=np.int64),
+        ITEM_NODE_START + np.arange(num_items, dtype=np.int64)
+    ])
+    product_ids = PRODUCT_ID_START + np.arange(num_items)
+    names = np.asarray([feature[0] for feature in features] + product_ids.astype(str).tolist(), dtype=str)
+    node_type_codes = np.concatenate([
+        np.asarray([NODE_TYPES.index(feature[2]) for feature in features], dtype=np.int8),
+        np.full(num_items, NODE_TYPES.index('item'), dtype=np.int8)
+    ])
+
+    # 엣지: 아이템마다 trait/concept 몇 개 + trait-concept 일부 (실제 그래프처럼 음수 가중치 포함)
+    item_traits = trait_rows[_pick_columns(rng, num_items, len(trait_rows), traits_per_item)]
+    item_concepts = concept_rows[_pick_columns(rng, num_items, len(concept_rows), concepts_per_item)]
+    tc_sources, tc_targets = np.meshgrid(trait_rows, concept_rows, indexing='ij')
+    tc_keep = rng.random(tc_sources.shape) < 0.3
+
+    sources = np.concatenate([
+        np.repeat(item_rows, traits_per_item), np.repeat(item_rows, concepts_per_item), tc_sources[tc_keep]
+    ])
+    targets = np.concatenate([item_traits.ravel(), item_concepts.ravel(), tc_targets[tc_keep]])
+    weights = np.concatenate([
+        rng.uniform(0.3, 1.0, num_items * (traits_per_item + concepts_per_item)),
+        rng.uniform(-0.3, 1.0, int(tc_keep.sum()))
+    ]).astype(np.float32)
+    relation_codes = np.concatenate([
+        np.full(num_items * traits_per_item, RELATIONS.index('item_trait'), dtype=np.int8),
+        np.full(num_items * concepts_per_item, RELATIONS.index('item_concept'), dtype=np.int8),
+        np.full(int(tc_keep.sum()), RELATIONS.index('trait_concept'), dtype=np.int8)
+    ])
+
+    # 무방향 그래프이므로 양방향으로 저장 후 (행, 열) 순 정렬
+    all_sources = np.concatenate([sources, targets])
+    all_targets = np.concatenate([targets, sources])
+    order = np.lexsort((all_targets, all_sources))
+    indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(all_sources, minlength=len(node_ids)), out=indptr[1:])
+
+    snapshot = GraphSnapshot(
+        node_ids=node_ids,
+        names=names,
+        node_type_codes=node_type_codes,
+        indptr=indptr,
+        indices=all_targets[order].astype(np.int32),
+        weights=np.concatenate([weights, weights])[order],
+        relation_codes=np.concatenate([relation_codes, relation_codes])[order]
+    )
+    snapshot.save(data_dir / "recommendation_graph.npz")
+
+    # 임베딩: 특성 노드는 무작위, 아이템은 연결된 특성 벡터의 가중합 + 잡음
+    feature_vectors = rng.normal(0, 1, (num_features, dim)).astype(np.float32)
+    vectors = np.empty((len(node_ids), dim), dtype=np.float32)
+    vectors[:num_features] = feature_vectors
+    item_features = np.concatenate([item_traits, item_concepts], axis=1)
+    item_weights = weights[:num_items * (traits_per_item + concepts_per_item)]
+    item_weights = np.concatenate([
+        item_weights[:num_items * traits_per_item].reshape(num_items, traits_per_item),
+        item_weights[num_items * traits_per_item:].reshape(num_items, concepts_per_item)
+    ], axis=1)
+    for start in range(0, num_items, 100_000):
+        end = min(num_items, start + 100_000)
+        mixed = np.einsum('nf,nfd->nd', item_weights[start:end], feature_vectors[item_features[start:end]])
+        vectors[num_features + start:num_features + end] = mixed + rng.normal(0, 0.3, mixed.shape)
+    save_embedding_artifact(
+        data_dir / "embeddings", node_ids, vectors,
+        config={'synthetic': meta}, item_ids=node_ids[num_features:]
+    )
+
+    # 상품 카탈로그 (가격/카테고리/테마 필터와 상세 정보 조회용)
+    prices = (rng.integers(50, 3000, num_items) * 100).tolist()
+    categories = rng.integers(0, NUM_CATEGORIES, num_items).tolist()
+    themes = rng.integers(0, NUM_THEMES, num_items).tolist()
+    with open(data_dir / "products.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['product_id', 'name', 'price', 'image_path', 'features', 'category', 'theme',
+                         'source_url', 'crawled_at', 'description'])
+        for product_id, price, category, theme in zip(product_ids.tolist(), prices, categories, themes):
+            writer.writerow([product_id, f'합성 상품 {product_id}', price, '', '', f'카테고리{category}',
+                             f'테마{theme}', '', '', ''])
+
+    meta_path.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    return data_dir
+
+
+def _current_rss_mb():
+    """현재 RSS(MB), /proc이 없는 플랫폼은 None"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_mb():
+    """프로세스 최대 RSS(MB), resource 모듈이 없는 플랫폼은 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _latency_summary(seconds):
+    """지연 시간 목록 → 밀리초 백분위수"""
+    values = sorted(seconds)
+    summary = {f'p{q}_ms': values[min(len(values) - 1, int(q / 100 * len(values)))] * 1000 for q in (50, 90, 99)}
+    summary['mean_ms'] = statistics.fmean(values) * 1000
+    return summary
+
+
+def _random_user_weights(rng, feature_names, num_users):
+    """설문 결과처럼 trait/concept 3~8개에 가중치를 준 User 가중치 dict 목록"""
+    users = []
+    for _ in range(num_users):
+        chosen = rng.choice(len(feature_names), size=int(rng.integers(3, 9)), replace=False)
+        users.append({feature_names[col]: float(rng.uniform(-1.0, 1.0)) for col in chosen})
+    return users
+
+
+def run_case(case):
+    """(새 프로세스) 합성 카탈로그 하나에 대해 엔진 로드/추천 측정 → 결과 dict"""
+    from recommend.metrics import METRICS
+    from recommend.product_catalog import ProductCatalog
+    from recommend.recommendation_engine import RecommendationEngine
+
+    # 엔진 계측과 요청별 로그는 측정 대상이 아니므로 끔
+    METRICS.enabled = False
+    data_dir = Path(case['data_dir'])
+    rng = np.random.default_rng(case['seed'])
+    feature_names = [feature[0] for feature in read_feature_nodes()]
+
+    rss_before = _current_rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = RecommendationEngine(
+            scoring=case['scoring'], search=case['search'], item_storage=case['item_storage'], cache_results=False
+        )
+        engine.embedding_artifact_path = data_dir / "embeddings"
+        engine.embeddings_path = data_dir / "missing.pkl"
+        engine.graph_snapshot_path = data_dir / "recommendation_graph.npz"
+        engine.catalog = ProductCatalog(data_dir / "products.csv")
+
+        start = time.perf_counter()
+        engine.load_model()
+        load_ms = (time.perf_counter() - start) * 1000
+        rss_after = _current_rss_mb()
+
+        # 단건: recommend(캐시 끔) = add_user_node + get_recommendations
+        users = _random_user_weights(rng, feature_names, case['warmup'] + case['requests'])
+        for weights in users[:case['warmup']]:
+            engine.recommend(weights, top_k=case['top_k'])
+        single = []
+        for weights in users[case['warmup']:]:
+            start = time.perf_counter()
+            engine.recommend(weights, top_k=case['top_k'])
+            single.append(time.perf_counter() - start)
+
+        # 배치: get_batch_recommendations
+        batches = [_random_user_weights(rng, feature_names, case['batch_size']) for _ in range(case['batches'] + 1)]
+        engine.get_batch_recommendations(batches[0], top_k=case['top_k'])
+        batch = []
+        for batch_weights in batches[1:]:
+            start = time.perf_counter()
+            engine.get_batch_recommendations(batch_weights, top_k=case['top_k'])
+            batch.append(time.perf_counter() - start)
+
+    batch_summary = _latency_summary(batch)
+    batch_summary['users_per_second'] = case['batch_size'] * len(batch) / sum(batch)
+    single_summary = _latency_summary(single)
+    single_summary['requests_per_second'] = len(single) / sum(single)
+
+    return {
+        'num_items': case['num_items'],
+        'scoring': case['scoring'],
+        'search': case['search'],
+        'item_storage': case['item_storage'],
+        'load_ms': load_ms,
+        'peak_rss_mb': _peak_rss_mb(),
+        'model_rss_mb': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        'single': single_summary,
+        'batch': {'batch_size': case['batch_size'], **batch_summary}
+    }
+
+
+def _run_in_subprocess(case):
+    """측정마다 새 인터프리터를 써서 메모리/캐시 상태가 섞이지 않도록"""
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), '--worker', json.dumps(case)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"벤치마크 실패 ({case['num_items']}개, {case['scoring']}):\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _environment():
+    """결과 비교용 실행 환경 정보"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare_with_baseline(results, baseline_results, tolerance=0.2):
+    """같은 (아이템 수, 점수/검색/저장 방식) 결과끼리 비교해 느려진 지표 목록 반환"""
+    def case_key(result):
+        return (result['num_items'], result['scoring'], result['search'], result['item_storage'])
+
+    baseline_by_case = {case_key(result): result for result in baseline_results}
+    regressions = []
+    for result in results:
+        baseline = baseline_by_case.get(case_key(result))
+        if baseline is None:
+            continue
+        for path in REGRESSION_METRICS:
+            current, previous = result, baseline
+            for key in path:
+                current, previous = current[key], previous[key]
+            if previous > 0 and current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{result['num_items']}개/{result['scoring']} {'.'.join(path)}: "
+                    f"{previous:.2f} → {current:.2f} (+{(current / previous - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    """메인 실행 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='합성 카탈로그 기반 추천 엔진 확장성 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='아이템 수 목록')
+    parser.add_argument('--scoring', nargs='+', default=['embedding'],
+                        choices=['embedding', 'propagation', 'pagerank'], help='점수 계산 방식 목록')
+    parser.add_argument('--search', default='exact', choices=['exact', 'ivf'], help='임베딩 검색 방식')
+    parser.add_argument('--item-storage', default='float32', help='아이템 행렬 저장 방식 (float32/float16/int8)')
+    parser.add_argument('--dim', type=int, default=64, help='합성 임베딩 차원')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=500, help='단건 추천 측정 횟수')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batches', type=int, default=10, help='배치 추천 측정 횟수')
+    parser.add_argument('--data-dir', default=str(DEFAULT_DATA_DIR), help='합성 데이터 저장 경로 (크기별 하위 폴더)')
+    parser.add_argument('--json', default=None, help='결과를 저장할 JSON 경로')
+    parser.add_argument('--baseline', default=None, help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='회귀로 보지 않는 지연 시간 증가 비율')
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker))))
+        return
+    if args.search == 'ivf' and args.item_storage != 'float32':
+        parser.error("--search ivf는 --item-storage float32만 지원합니다.")
+
+    results = []
+    for num_items in args.sizes:
+        data_dir = Path(args.data_dir) / f"items_{num_items}_dim{args.dim}_seed{args.seed}"
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            synthesize_catalog(data_dir, num_items, dim=args.dim, seed=args.seed)
+        print(f"합성 카탈로그 준비: {num_items:,}개 아이템 ({time.perf_counter() - start:.1f}초)")
+
+        for scoring in args.scoring:
+            case = {
+                'data_dir': str(data_dir),
+                'num_items': num_items,
+                'scoring': scoring,
+                'search': args.search if scoring == 'embedding' else 'exact',
+                'item_storage': args.item_storage if scoring == 'embedding' else 'float32',
+                'seed': args.seed,
+                'top_k': args.top_k,
+                'requests': args.requests,
+                'warmup': args.warmup,
+                'batch_size': args.batch_size,
+                'batches': args.batches
+            }
+            result = _run_in_subprocess(case)
+            results.append(result)
+
+            memory = f", 최대 메모리 {result['peak_rss_mb']:.0f}MB" if result['peak_rss_mb'] is not None else ''
+            print(f"  {scoring}: 로드 {result['load_ms']:.0f}ms{memory}, "
+                  f"단건 p50 {result['single']['p50_ms']:.2f}ms / p99 {result['single']['p99_ms']:.2f}ms, "
+                  f"배치 {result['batch']['users_per_second']:,.0f} users/s")
+
+    report = {'environment': _environment(), 'results': results}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(results, json.load(f)['results'], args.tolerance)
+        report['regressions'] = regressions
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json}")
+
+    if regressions:
+        print("\n성능 회귀:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
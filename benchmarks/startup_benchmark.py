@@ -0,0 +1,154 @@
+"""
+추론 경로 import 시간 / 콜드 스타트 벤치마크
+
+새 파이썬 프로세스에서 모듈을 import해 걸린 시간과 함께 로드된 무거운 라이브러리를 확인한다.
+다음 경우 종료 코드 1로 실패한다.
+  - 추론 모듈 import 시 pandas/torch/sklearn 등 학습용 라이브러리가 함께 로드됨
+  - import 시간에서 numpy import 시간을 뺀 값이 예산(--import-budget-ms)을 넘음
+  - 콜드 스타트(import + 모델 로드 + 첫 추천)가 예산(--cold-start-budget-ms, 지정 시)을 넘음
+
+실행:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --repeat 7 --json startup.json
+"""
+import sys
+import json
+import statistics
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 서빙 워커가 import하는 모듈
+INFERENCE_MODULES = (
+    'recommend.recommendation_engine',
+    'recommend.model_registry',
+    'recommend.service',
+)
+
+# 추론 경로에서 로드되면 안 되는 라이브러리 (학습/분석 전용)
+FORBIDDEN_MODULES = ('pandas', 'torch', 'sklearn', 'node2vec', 'gensim', 'matplotlib', 'seaborn', 'plotly')
+
+IMPORT_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'import_ms': elapsed_ms, 'modules': sorted(sys.modules)}}))
+"""
+
+COLD_START_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from recommend.recommendation_engine import RecommendationEngine
+imported = time.perf_counter()
+engine = RecommendationEngine()
+engine.load_model()
+loaded = time.perf_counter()
+engine.recommend({{'Extraversion': 0.8, 'Openness': 0.6}}, top_k=10)
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'load_ms': (loaded - imported) * 1000,
+    'first_request_ms': (done - loaded) * 1000,
+    'total_ms': (done - start) * 1000
+}}))
+"""
+
+
+def _run(script):
+    """새 인터프리터에서 스크립트 실행 후 마지막 줄의 JSON 결과 반환"""
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_import(module, repeat):
+    """모듈 import 시간 중앙값과 로드된 모듈 목록"""
+    runs = [_run(IMPORT_SCRIPT.format(root=str(PROJECT_ROOT), module=module)) for _ in range(repeat)]
+    return statistics.median(run['import_ms'] for run in runs), runs[-1]['modules']
+
+
+def measure_cold_start(repeat):
+    """import + 모델 로드 + 첫 추천 시간 (각 단계 중앙값)"""
+    runs = [_run(COLD_START_SCRIPT.format(root=str(PROJECT_ROOT))) for _ in range(repeat)]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def run_benchmark(repeat=5, import_budget_ms=150.0, cold_start_budget_ms=None, cold_start=True):
+    """벤치마크 실행 → (결과 dict, 실패 메시지 리스트)"""
+    failures = []
+
+    # 모든 추론 모듈이 공통으로 쓰는 numpy는 기준선으로 따로 측정
+    numpy_ms, _ = measure_import('numpy', repeat)
+    report = {'numpy_import_ms': numpy_ms, 'modules': {}}
+
+    for module in INFERENCE_MODULES:
+        import_ms, loaded = measure_import(module, repeat)
+        heavy = sorted({name.split('.')[0] for name in loaded} & set(FORBIDDEN_MODULES))
+        overhead_ms = import_ms - numpy_ms
+
+        report['modules'][module] = {'import_ms': import_ms, 'overhead_ms': overhead_ms, 'heavy_modules': heavy}
+        if heavy:
+            failures.append(f"{module}: 추론 경로에서 {', '.join(heavy)} 로드됨")
+        if overhead_ms > import_budget_ms:
+            failures.append(f"{module}: import {overhead_ms:.1f}ms (numpy 제외)가 예산 {import_budget_ms:.1f}ms 초과")
+
+    if cold_start:
+        report['cold_start'] = measure_cold_start(repeat)
+        total_ms = report['cold_start']['total_ms']
+        if cold_start_budget_ms is not None and total_ms > cold_start_budget_ms:
+            failures.append(f"콜드 스타트 {total_ms:.1f}ms가 예산 {cold_start_budget_ms:.1f}ms 초과")
+
+    return report, failures
+
+
+def main():
+    """메인 실행 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='추론 경로 import 시간 / 콜드 스타트 벤치마크')
+    parser.add_argument('--repeat', type=int, default=5, help='측정 반복 횟수 (중앙값 사용)')
+    parser.add_argument('--import-budget-ms', type=float, default=150.0,
+                        help='모듈별 import 시간 예산 (numpy import 시간 제외)')
+    parser.add_argument('--cold-start-budget-ms', type=float, default=None,
+                        help='import + 모델 로드 + 첫 추천 시간 예산 (기본: 검사 안 함)')
+    parser.add_argument('--skip-cold-start', action='store_true', help='모델 파일 없이 import만 측정')
+    parser.add_argument('--json', default=None, help='결과를 저장할 JSON 경로')
+
+    args = parser.parse_args()
+
+    report, failures = run_benchmark(
+        repeat=args.repeat,
+        import_budget_ms=args.import_budget_ms,
+        cold_start_budget_ms=args.cold_start_budget_ms,
+        cold_start=not args.skip_cold_start
+    )
+
+    print(f"numpy import: {report['numpy_import_ms']:.1f}ms")
+    for module, result in report['modules'].items():
+        heavy = f"  무거운 모듈: {', '.join(result['heavy_modules'])}" if result['heavy_modules'] else ''
+        print(f"{module}: {result['import_ms']:.1f}ms (numpy 제외 {result['overhead_ms']:.1f}ms){heavy}")
+    if 'cold_start' in report:
+        cold = report['cold_start']
+        print(f"콜드 스타트: {cold['total_ms']:.1f}ms (import {cold['import_ms']:.1f}ms, "
+              f"모델 로드 {cold['load_ms']:.1f}ms, 첫 추천 {cold['first_request_ms']:.1f}ms)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'report': report, 'failures': failures}, f, ensure_ascii=False, indent=2)
+
+    if failures:
+        print("\n시작 시간 회귀:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n시작 시간 검사 통과")
+
+
+if __name__ == "__main__":
+    main()
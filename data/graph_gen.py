@@ -8,6 +8,13 @@ import numpy as np
 import networkx as nx
 import pickle
 import os
+import sys
+from pathlib import Path
+
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data.graph_snapshot import GraphSnapshot
 
 class GraphGenerator:
     def __init__(self):
@@ -175,6 +182,13 @@ class GraphGenerator:
         
         print(f"\n그래프 저장 완료: {save_path}")
     
+    def save_snapshot(self, save_path="./recommendation_graph.npz"):
+        """서빙용 CSR 스냅샷(npz) 저장"""
+        snapshot = GraphSnapshot.from_networkx(self.graph)
+        snapshot.save(save_path)
+        print(f"스냅샷 크기: {snapshot.memory_bytes() / 1024:.1f}KB")
+        return snapshot
+    
     def load_graph(self, load_path="./recommendation_graph.pkl"):
         """pkl 파일에서 그래프 로드"""
         with open(load_path, 'rb') as f:
@@ -196,6 +210,9 @@ def main():
     
     # 그래프 저장
     graph_gen.save_graph("./recommendation_graph.pkl")
+    
+    # 서빙용 경량 스냅샷 저장
+    graph_gen.save_snapshot("./recommendation_graph.npz")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
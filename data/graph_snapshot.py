@@ -0,0 +1,253 @@
+"""
+서빙용 경량 그래프 스냅샷
+networkx.Graph 대신 CSR 배열(offsets/neighbors/weights)과 정수 코드로 그래프를 표현
+
+기존 pkl에서 스냅샷 만들기:
+    python data/graph_snapshot.py --pickle data/recommendation_graph.pkl --output data/recommendation_graph.npz
+"""
+import pickle
+
+import numpy as np
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# 노드 타입 / 엣지 관계 코드 테이블 (배열에는 인덱스만 저장)
+NODE_TYPES = ('item', 'trait', 'concept')
+RELATIONS = ('trait_concept', 'item_concept', 'item_trait')
+
+
+class _NodeView:
+    """networkx의 graph.nodes처럼 쓸 수 있는 읽기 전용 노드 뷰"""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __call__(self):
+        return self
+
+    def __iter__(self):
+        return iter(self._snapshot.node_ids.tolist())
+
+    def __len__(self):
+        return len(self._snapshot.node_ids)
+
+    def __contains__(self, node_id):
+        return node_id in self._snapshot.node_index
+
+    def __getitem__(self, node_id):
+        idx = self._snapshot.node_index[node_id]
+        name = str(self._snapshot.names[idx])
+        return {
+            'name': name,
+            'type': self._snapshot.type_table[self._snapshot.node_type_codes[idx]],
+            'original_id': name
+        }
+
+
+def csr_row_edges(indptr, rows):
+    """CSR 행들의 구간 [indptr[r], indptr[r+1])을 펼쳐 (구간별 행 순번, 엣지 인덱스) 배열로 반환"""
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    row_positions = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return row_positions, np.repeat(starts, counts) + offsets
+
+
+class GraphSnapshot:
+    """CSR 형태의 읽기 전용 지식 그래프"""
+
+    def __init__(self, node_ids, names, node_type_codes, indptr, indices, weights, relation_codes,
+                 type_table=NODE_TYPES, relation_table=RELATIONS):
+        self.node_ids = node_ids                  # (N,) int64, 오름차순
+        self.names = names                        # (N,) 노드 이름 테이블
+        self.node_type_codes = node_type_codes    # (N,) int8
+        self.indptr = indptr                      # (N+1,) int64 CSR 오프셋
+        self.indices = indices                    # (2E,) int32 이웃 노드 인덱스
+        self.weights = weights                    # (2E,) float32 엣지 가중치
+        self.relation_codes = relation_codes      # (2E,) int8 엣지 관계 코드
+        self.type_table = tuple(type_table)
+        self.relation_table = tuple(relation_table)
+
+        self.node_index = {node_id: idx for idx, node_id in enumerate(node_ids.tolist())}
+        self.nodes = _NodeView(self)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """networkx 그래프에서 스냅샷 생성 (노드 속성 name/type, 엣지 속성 relation/weight 사용)"""
+        node_ids = np.array(sorted(graph.nodes()), dtype=np.int64)
+        node_index = {node_id: idx for idx, node_id in enumerate(node_ids.tolist())}
+
+        type_table = list(NODE_TYPES)
+        relation_table = list(RELATIONS)
+
+        names = []
+        node_type_codes = np.zeros(len(node_ids), dtype=np.int8)
+        for idx, node_id in enumerate(node_ids.tolist()):
+            data = graph.nodes[node_id]
+            names.append(str(data.get('name', node_id)))
+            node_type = data.get('type', 'unknown')
+            if node_type not in type_table:
+                type_table.append(node_type)
+            node_type_codes[idx] = type_table.index(node_type)
+
+        # 무방향 그래프이므로 양방향으로 저장
+        sources, targets, weights, relation_codes = [], [], [], []
+        for u, v, data in graph.edges(data=True):
+            relation = data.get('relation', 'unknown')
+            if relation not in relation_table:
+                relation_table.append(relation)
+            code = relation_table.index(relation)
+            weight = data.get('weight', 1.0)
+
+            sources += [node_index[u], node_index[v]]
+            targets += [node_index[v], node_index[u]]
+            weights += [weight, weight]
+            relation_codes += [code, code]
+
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.lexsort((np.asarray(targets, dtype=np.int64), sources))
+
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(node_ids)), out=indptr[1:])
+
+        return cls(
+            node_ids=node_ids,
+            names=np.asarray(names, dtype=str),
+            node_type_codes=node_type_codes,
+            indptr=indptr,
+            indices=np.asarray(targets, dtype=np.int32)[order],
+            weights=np.asarray(weights, dtype=np.float32)[order],
+            relation_codes=np.asarray(relation_codes, dtype=np.int8)[order],
+            type_table=type_table,
+            relation_table=relation_table
+        )
+
+    @classmethod
+    def ensure(cls, graph):
+        """스냅샷이면 그대로, networkx 그래프면 스냅샷으로 변환"""
+        return graph if isinstance(graph, cls) else cls.from_networkx(graph)
+
+    def save(self, save_path):
+        """npz 파일로 저장 (pickle 없이 배열만)"""
+        np.savez(
+            save_path,
+            format_version=np.array(SNAPSHOT_FORMAT_VERSION),
+            node_ids=self.node_ids,
+            names=self.names,
+            node_type_codes=self.node_type_codes,
+            indptr=self.indptr,
+            indices=self.indices,
+            weights=self.weights,
+            relation_codes=self.relation_codes,
+            type_table=np.asarray(self.type_table, dtype=str),
+            relation_table=np.asarray(self.relation_table, dtype=str)
+        )
+        print(f"그래프 스냅샷 저장 완료: {save_path}")
+
+    @classmethod
+    def load(cls, load_path):
+        """npz 파일에서 스냅샷 로드"""
+        with np.load(load_path, allow_pickle=False) as data:
+            if int(data['format_version']) != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 스냅샷 버전입니다: {int(data['format_version'])}")
+
+            return cls(
+                node_ids=data['node_ids'],
+                names=data['names'],
+                node_type_codes=data['node_type_codes'],
+                indptr=data['indptr'],
+                indices=data['indices'],
+                weights=data['weights'],
+                relation_codes=data['relation_codes'],
+                type_table=data['type_table'].tolist(),
+                relation_table=data['relation_table'].tolist()
+            )
+
+    def number_of_nodes(self):
+        return len(self.node_ids)
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def name(self, node_id):
+        """노드 이름"""
+        return str(self.names[self.node_index[node_id]])
+
+    def node_type(self, node_id):
+        """노드 타입 이름"""
+        return self.type_table[self.node_type_codes[self.node_index[node_id]]]
+
+    def neighbors(self, node_id):
+        """이웃 노드 ID, 가중치, 관계 코드 (배열 슬라이스)"""
+        idx = self.node_index[node_id]
+        start, end = self.indptr[idx], self.indptr[idx + 1]
+        return self.node_ids[self.indices[start:end]], self.weights[start:end], self.relation_codes[start:end]
+
+    def degree(self, node_id):
+        idx = self.node_index[node_id]
+        return int(self.indptr[idx + 1] - self.indptr[idx])
+
+    def nodes_of_type(self, node_type):
+        """타입별 노드 ID 배열"""
+        if node_type not in self.type_table:
+            return self.node_ids[:0]
+        return self.node_ids[self.node_type_codes == self.type_table.index(node_type)]
+
+    def node_types(self):
+        """graph_gen과 같은 {타입: [노드 ID]} dict"""
+        return {node_type: self.nodes_of_type(node_type).tolist() for node_type in self.type_table}
+
+    def node_id_mapping(self):
+        """graph_gen과 같은 {이름: {'id', 'type'}} dict"""
+        return {
+            name: {'id': node_id, 'type': self.type_table[code]}
+            for name, node_id, code in zip(self.names.tolist(), self.node_ids.tolist(), self.node_type_codes.tolist())
+        }
+
+    def adjacency_block(self, row_ids, col_ids):
+        """(행 노드 x 열 노드) 엣지 가중치 dense 행렬 (엣지가 없으면 0), 행 노드의 CSR 구간만 읽음"""
+        rows = np.asarray([self.node_index[node_id] for node_id in row_ids], dtype=np.int64)
+        col_position = np.full(len(self.node_ids), -1, dtype=np.int64)
+        col_position[[self.node_index[node_id] for node_id in col_ids]] = np.arange(len(col_ids))
+
+        block_rows, edges = csr_row_edges(self.indptr, rows)
+        cols = col_position[self.indices[edges]]
+        keep = cols >= 0
+        block = np.zeros((len(rows), len(col_ids)), dtype=np.float32)
+        block[block_rows[keep], cols[keep]] = self.weights[edges[keep]]
+        return block
+
+    def memory_bytes(self):
+        """배열이 차지하는 메모리 크기"""
+        arrays = [self.node_ids, self.names, self.node_type_codes, self.indptr,
+                  self.indices, self.weights, self.relation_codes]
+        return sum(array.nbytes for array in arrays)
+
+
+def convert_pickle_to_snapshot(pickle_path, output_path):
+    """graph_gen이 저장한 그래프 pkl({'graph': networkx 그래프, ...}) → 스냅샷 npz"""
+    with open(pickle_path, 'rb') as f:
+        graph_data = pickle.load(f)
+
+    snapshot = GraphSnapshot.from_networkx(graph_data['graph'])
+    snapshot.save(output_path)
+    print(f"노드 {snapshot.number_of_nodes()}개, 엣지 {snapshot.number_of_edges()}개, "
+          f"스냅샷 크기: {snapshot.memory_bytes() / 1024:.1f}KB")
+    return snapshot
+
+
+def main():
+    """recommendation_graph.pkl → 스냅샷 변환 CLI"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='그래프 pkl을 서빙용 CSR 스냅샷(npz)으로 변환')
+    parser.add_argument('--pickle', default='data/recommendation_graph.pkl', help='변환할 그래프 pkl 경로')
+    parser.add_argument('--output', default='data/recommendation_graph.npz', help='스냅샷 npz 경로')
+
+    args = parser.parse_args()
+    convert_pickle_to_snapshot(args.pickle, args.output)
+
+
+if __name__ == "__main__":
+    main()
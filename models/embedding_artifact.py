@@ -0,0 +1,181 @@
+"""
+메모리 매핑 가능한 임베딩 아티팩트 포맷
+
+디렉토리 하나에 다음 파일을 저장:
+  - vectors.npy      : 전체 노드 임베딩 (nodes x dim, float32, C order)
+  - node_ids.npy     : vectors 행 순서의 노드 ID (int64)
+  - item_vectors.npy : (선택) L2 정규화된 아이템 임베딩 (items x dim, float32)
+  - item_ids.npy     : (선택) item_vectors 행 순서의 아이템 노드 ID
+  - meta.json        : 포맷 버전, 크기, 학습 설정
+
+.npy는 np.load(mmap_mode='r')로 열 수 있어 여러 워커 프로세스가
+같은 물리 페이지를 공유하고, 로드 시 역직렬화 비용이 없다.
+"""
+import json
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACT_FORMAT_VERSION = 1
+
+VECTORS_FILE = "vectors.npy"
+NODE_IDS_FILE = "node_ids.npy"
+ITEM_VECTORS_FILE = "item_vectors.npy"
+ITEM_IDS_FILE = "item_ids.npy"
+META_FILE = "meta.json"
+
+
+class EmbeddingArtifact:
+    """열려 있는 임베딩 아티팩트 (읽기 전용)"""
+
+    def __init__(self, node_ids, vectors, meta, item_ids=None, item_vectors=None):
+        self.node_ids = node_ids
+        self.vectors = vectors
+        self.meta = meta
+        self.item_ids = item_ids
+        self.item_vectors = item_vectors
+        self.node_to_row = {int(node_id): row for row, node_id in enumerate(node_ids.tolist())}
+
+    @property
+    def embedding_dim(self):
+        return self.vectors.shape[1]
+
+    def get(self, node_id):
+        """노드 ID의 임베딩 (행 뷰, 복사 없음)"""
+        row = self.node_to_row.get(node_id)
+        return None if row is None else self.vectors[row]
+
+    def as_dict(self):
+        """기존 pickle 포맷과 같은 {노드 ID: 임베딩} dict (값은 행 뷰)"""
+        return {node_id: self.vectors[row] for node_id, row in self.node_to_row.items()}
+
+
+def _atomic_save(path, array):
+    """임시 파일에 쓴 뒤 교체 (이미 매핑 중인 프로세스의 페이지를 덮어쓰지 않도록)"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def is_embedding_artifact(path):
+    """경로가 임베딩 아티팩트 디렉토리인지 확인"""
+    path = Path(path)
+    return path.is_dir() and (path / META_FILE).exists()
+
+
+def save_embedding_artifact(artifact_dir, node_ids, vectors, config=None, item_ids=None):
+    """임베딩 행렬을 아티팩트 디렉토리로 저장
+
+    item_ids를 주면 정규화된 아이템 행렬을 함께 저장해 서빙 시 바로 매핑해 쓸 수 있게 한다.
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    node_ids = np.asarray(node_ids, dtype=np.int64)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2 or vectors.shape[0] != node_ids.shape[0]:
+        raise ValueError(f"임베딩 행렬 크기 {vectors.shape}가 노드 수 {node_ids.shape[0]}와 맞지 않습니다.")
+
+    _atomic_save(artifact_dir / VECTORS_FILE, vectors)
+    _atomic_save(artifact_dir / NODE_IDS_FILE, node_ids)
+
+    meta = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'num_nodes': int(vectors.shape[0]),
+        'embedding_dim': int(vectors.shape[1]),
+        'dtype': 'float32',
+        'has_item_vectors': item_ids is not None,
+        'config': config or {}
+    }
+
+    if item_ids is not None:
+        node_to_row = {int(node_id): row for row, node_id in enumerate(node_ids.tolist())}
+        item_ids = np.asarray([item_id for item_id in item_ids if int(item_id) in node_to_row], dtype=np.int64)
+
+        item_vectors = vectors[[node_to_row[int(item_id)] for item_id in item_ids]]
+        norms = np.linalg.norm(item_vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        item_vectors = np.ascontiguousarray(item_vectors / norms, dtype=np.float32)
+
+        _atomic_save(artifact_dir / ITEM_VECTORS_FILE, item_vectors)
+        _atomic_save(artifact_dir / ITEM_IDS_FILE, item_ids)
+        meta['num_items'] = int(item_ids.shape[0])
+
+    # meta.json은 마지막에 교체해 완성된 아티팩트만 보이도록
+    meta_tmp_path = artifact_dir / (META_FILE + '.tmp')
+    with open(meta_tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_tmp_path, artifact_dir / META_FILE)
+
+    print(f"임베딩 아티팩트 저장 완료: {artifact_dir} ({vectors.shape[0]}개 노드)")
+
+
+def load_embedding_artifact(artifact_dir, mmap=True):
+    """임베딩 아티팩트 열기 (기본은 메모리 매핑, 읽기 전용)"""
+    artifact_dir = Path(artifact_dir)
+    mmap_mode = 'r' if mmap else None
+
+    with open(artifact_dir / META_FILE, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 아티팩트 버전입니다: {meta.get('format_version')}")
+
+    vectors = np.load(artifact_dir / VECTORS_FILE, mmap_mode=mmap_mode)
+    node_ids = np.load(artifact_dir / NODE_IDS_FILE)
+
+    item_ids = None
+    item_vectors = None
+    if meta.get('has_item_vectors'):
+        item_vectors = np.load(artifact_dir / ITEM_VECTORS_FILE, mmap_mode=mmap_mode)
+        item_ids = np.load(artifact_dir / ITEM_IDS_FILE)
+
+    if not mmap:
+        vectors.flags.writeable = False
+        if item_vectors is not None:
+            item_vectors.flags.writeable = False
+
+    return EmbeddingArtifact(node_ids, vectors, meta, item_ids=item_ids, item_vectors=item_vectors)
+
+
+def convert_pickle_to_artifact(pickle_path, artifact_dir, graph_path=None):
+    """기존 embeddings.pkl을 아티팩트 디렉토리로 변환
+
+    graph_path를 주면 그래프의 item 노드로 정규화된 아이템 행렬도 함께 만든다.
+    """
+    with open(pickle_path, 'rb') as f:
+        embedding_data = pickle.load(f)
+
+    embeddings = embedding_data['embeddings']
+    node_ids = sorted(embeddings.keys())
+    vectors = np.vstack([embeddings[node_id] for node_id in node_ids]) if node_ids else np.zeros((0, 0))
+
+    item_ids = None
+    if graph_path is not None:
+        with open(graph_path, 'rb') as f:
+            graph_data = pickle.load(f)
+        item_ids = graph_data.get('node_types', {}).get('item', [])
+
+    save_embedding_artifact(artifact_dir, node_ids, vectors,
+                            config=embedding_data.get('config'), item_ids=item_ids)
+
+
+def main():
+    """embeddings.pkl → 아티팩트 변환 CLI"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='embeddings.pkl을 메모리 매핑 아티팩트로 변환')
+    parser.add_argument('--pickle', default='models/embeddings.pkl', help='변환할 임베딩 pkl 경로')
+    parser.add_argument('--output', default='models/embeddings', help='아티팩트 디렉토리')
+    parser.add_argument('--graph', default='data/recommendation_graph.pkl',
+                        help='아이템 행렬 생성에 쓸 그래프 pkl (빈 문자열이면 생략)')
+
+    args = parser.parse_args()
+    convert_pickle_to_artifact(args.pickle, args.output, graph_path=args.graph or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,19 @@
 """
 그래프 임베딩 모델 구현
 Node2Vec 기반 그래프 임베딩 + 추천 시스템
+
+torch/node2vec(gensim)은 학습할 때만 필요하므로 사용하는 시점에 import한다.
 """
 
-import torch
-import torch.nn as nn
-import torch.nn.functional as F
 import numpy as np
-import networkx as nx
-from sklearn.metrics.pairwise import cosine_similarity
-from node2vec import Node2Vec
 import pickle
 from pathlib import Path
 
+from data.graph_snapshot import GraphSnapshot
+from models.embedding_artifact import (
+    is_embedding_artifact, load_embedding_artifact, save_embedding_artifact
+)
+
 class GraphEmbeddingModel:
     """그래프 임베딩 기반 추천 모델"""
     
@@ -25,13 +26,19 @@ class GraphEmbeddingModel:
         self.idx_to_node = {}
         
     def load_graph(self, graph_path):
-        """그래프 데이터 로드"""
-        with open(graph_path, 'rb') as f:
-            graph_data = pickle.load(f)
-        
-        self.graph = graph_data['graph']
-        self.node_types = graph_data['node_types']
-        self.node_id_mapping = graph_data.get('node_id_mapping', {})
+        """그래프 데이터 로드 (.npz면 읽기 전용 CSR 스냅샷, 학습에는 pkl 필요)"""
+        if Path(graph_path).suffix == '.npz':
+            snapshot = GraphSnapshot.load(graph_path)
+            self.graph = snapshot
+            self.node_types = snapshot.node_types()
+            self.node_id_mapping = snapshot.node_id_mapping()
+        else:
+            with open(graph_path, 'rb') as f:
+                graph_data = pickle.load(f)
+            
+            self.graph = graph_data['graph']
+            self.node_types = graph_data['node_types']
+            self.node_id_mapping = graph_data.get('node_id_mapping', {})
         
         # 노드 인덱스 매핑 생성
         all_nodes = list(self.graph.nodes())
@@ -43,6 +50,7 @@ class GraphEmbeddingModel:
     def train_embeddings(self, dimensions=128, walk_length=30, num_walks=200, workers=4):
         """Node2Vec를 이용한 그래프 임베딩 학습"""
         print("Node2Vec 임베딩 학습 시작...")
+        from node2vec import Node2Vec
         
         # Node2Vec 모델 생성
         node2vec = Node2Vec(
@@ -93,8 +101,26 @@ class GraphEmbeddingModel:
         
         print(f"임베딩 저장 완료: {save_path}")
     
+    def save_embedding_artifact(self, artifact_dir):
+        """임베딩을 메모리 매핑 아티팩트로 저장 (서빙용)"""
+        node_ids = list(self.node_embeddings.keys())
+        vectors = np.vstack([self.node_embeddings[node] for node in node_ids])
+        item_ids = getattr(self, 'node_types', {}).get('item')
+        
+        save_embedding_artifact(artifact_dir, node_ids, vectors, config=self.config, item_ids=item_ids)
+    
     def load_embeddings(self, load_path):
-        """임베딩 로드"""
+        """임베딩 로드 (pkl 파일 또는 메모리 매핑 아티팩트 디렉토리)"""
+        if is_embedding_artifact(load_path):
+            artifact = load_embedding_artifact(load_path, mmap=True)
+            self.node_embeddings = artifact.as_dict()
+            node_ids = artifact.node_ids.tolist()
+            self.node_to_idx = {node: idx for idx, node in enumerate(node_ids)}
+            self.idx_to_node = {idx: node for idx, node in enumerate(node_ids)}
+            
+            print(f"임베딩 아티팩트 로드 완료: {len(self.node_embeddings)}개 노드")
+            return
+        
         with open(load_path, 'rb') as f:
             embedding_data = pickle.load(f)
         
@@ -105,31 +131,47 @@ class GraphEmbeddingModel:
         print(f"임베딩 로드 완료: {len(self.node_embeddings)}개 노드")
 
 
-class SimpleGCN(nn.Module):
-    """간단한 GCN 모델 (선택적 사용)"""
+def _build_simple_gcn():
+    """SimpleGCN 클래스 생성 (torch는 처음 사용할 때 import)"""
+    import torch
+    import torch.nn as nn
     
-    def __init__(self, input_dim, hidden_dims, output_dim, dropout=0.2):
-        super().__init__()
-        
-        layers = []
-        dims = [input_dim] + hidden_dims + [output_dim]
-        
-        for i in range(len(dims) - 1):
-            layers.append(nn.Linear(dims[i], dims[i+1]))
-            if i < len(dims) - 2:  # 마지막 레이어가 아닌 경우
-                layers.append(nn.ReLU())
-                layers.append(nn.Dropout(dropout))
-        
-        self.layers = nn.ModuleList(layers)
-    
-    def forward(self, x, adj_matrix):
-        """순전파"""
-        for i, layer in enumerate(self.layers):
-            if isinstance(layer, nn.Linear):
-                if i == 0:
-                    x = torch.matmul(adj_matrix, x)
-                x = layer(x)
-            else:
-                x = layer(x)
-        
-        return x
\ No newline at end of file
+    class SimpleGCN(nn.Module):
+        """간단한 GCN 모델 (선택적 사용)"""
+        
+        def __init__(self, input_dim, hidden_dims, output_dim, dropout=0.2):
+            super().__init__()
+            
+            layers = []
+            dims = [input_dim] + hidden_dims + [output_dim]
+            
+            for i in range(len(dims) - 1):
+                layers.append(nn.Linear(dims[i], dims[i+1]))
+                if i < len(dims) - 2:  # 마지막 레이어가 아닌 경우
+                    layers.append(nn.ReLU())
+                    layers.append(nn.Dropout(dropout))
+            
+            self.layers = nn.ModuleList(layers)
+        
+        def forward(self, x, adj_matrix):
+            """순전파"""
+            for i, layer in enumerate(self.layers):
+                if isinstance(layer, nn.Linear):
+                    if i == 0:
+                        x = torch.matmul(adj_matrix, x)
+                    x = layer(x)
+                else:
+                    x = layer(x)
+            
+            return x
+        
+    return SimpleGCN
+
+
+def __getattr__(name):
+    """from models.graph_embedding import SimpleGCN 시점에만 torch를 로드"""
+    if name == 'SimpleGCN':
+        simple_gcn = _build_simple_gcn()
+        globals()['SimpleGCN'] = simple_gcn
+        return simple_gcn
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
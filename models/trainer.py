@@ -13,10 +13,12 @@ import numpy as np
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.config import (
-    GRAPH_PKL_PATH, MODEL_CONFIG, PROJECT_ROOT,
+    GRAPH_PKL_PATH, GRAPH_SNAPSHOT_PATH, MODEL_CONFIG, PROJECT_ROOT,
     ensure_directories
 )
 from models.graph_embedding import GraphEmbeddingModel
+from models.embedding_artifact import is_embedding_artifact
+from recommend.ann_index import IVFIndex
 
 class GraphTrainer:
     """그래프 임베딩 모델 학습 관리자"""
@@ -25,21 +27,29 @@ class GraphTrainer:
         self.config = config or MODEL_CONFIG
         self.model = GraphEmbeddingModel(self.config)
         self.embeddings_save_path = PROJECT_ROOT / "models" / "embeddings.pkl"
+        # 서빙용 메모리 매핑 아티팩트 (있으면 로드 시 우선 사용)
+        self.embedding_artifact_path = PROJECT_ROOT / "models" / "embeddings"
+        # 대규모 카탈로그용 ANN 인덱스
+        self.ann_index_path = PROJECT_ROOT / "models" / "embeddings_ivf.npz"
         
         # 디렉토리 생성
         ensure_directories()
         
-    def load_graph_data(self):
-        """그래프 데이터 로드"""
+    def load_graph_data(self, prefer_snapshot=False):
+        """그래프 데이터 로드 (prefer_snapshot이면 학습 없이 쓸 경량 CSR 스냅샷 우선)"""
         print("=== 그래프 데이터 로드 ===")
         
-        if not GRAPH_PKL_PATH.exists():
-            print(f"❌ 그래프 파일이 없습니다: {GRAPH_PKL_PATH}")
+        graph_path = GRAPH_PKL_PATH
+        if prefer_snapshot and GRAPH_SNAPSHOT_PATH.exists():
+            graph_path = GRAPH_SNAPSHOT_PATH
+        
+        if not graph_path.exists():
+            print(f"❌ 그래프 파일이 없습니다: {graph_path}")
             print("먼저 data/graph_gen.py를 실행하여 그래프를 생성하세요.")
             return False
         
         try:
-            self.model.load_graph(GRAPH_PKL_PATH)
+            self.model.load_graph(graph_path)
             return True
         except Exception as e:
             print(f"❌ 그래프 로드 실패: {e}")
@@ -70,27 +80,52 @@ class GraphTrainer:
         
         try:
             self.model.save_embeddings(self.embeddings_save_path)
+            self.model.save_embedding_artifact(self.embedding_artifact_path)
             print(f"✅ 모델 저장 완료: {self.embeddings_save_path}")
             return True
         except Exception as e:
             print(f"❌ 모델 저장 실패: {e}")
             return False
     
+    def build_ann_index(self):
+        """학습된 아이템 임베딩으로 IVF ANN 인덱스 생성 및 저장"""
+        print(f"\n=== ANN 인덱스 생성 ===")
+        
+        try:
+            item_ids = [item_id for item_id in self.model.node_types.get('item', [])
+                        if item_id in self.model.node_embeddings]
+            item_matrix = np.vstack([self.model.node_embeddings[item_id] for item_id in item_ids]).astype(np.float32)
+            norms = np.linalg.norm(item_matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            item_matrix /= norms
+            
+            index = IVFIndex.build(item_matrix, item_ids)
+            index.save(self.ann_index_path)
+            print(f"✅ ANN 인덱스 저장 완료: {self.ann_index_path}")
+            return True
+        except Exception as e:
+            print(f"❌ ANN 인덱스 생성 실패: {e}")
+            return False
+    
     def load_model(self):
         """저장된 모델 로드"""
         print("=== 학습된 모델 로드 ===")
         
-        if not self.embeddings_save_path.exists():
+        if is_embedding_artifact(self.embedding_artifact_path):
+            load_path = self.embedding_artifact_path
+        elif self.embeddings_save_path.exists():
+            load_path = self.embeddings_save_path
+        else:
             print(f"❌ 저장된 모델이 없습니다: {self.embeddings_save_path}")
             return False
         
         try:
-            # 그래프 먼저 로드
-            if not self.load_graph_data():
+            # 그래프 먼저 로드 (평가/유사도 테스트만 하므로 스냅샷으로 충분)
+            if not self.load_graph_data(prefer_snapshot=True):
                 return False
             
             # 임베딩 로드
-            self.model.load_embeddings(self.embeddings_save_path)
+            self.model.load_embeddings(load_path)
             print("✅ 모델 로드 완료!")
             return True
         except Exception as e:
@@ -200,10 +235,13 @@ class GraphTrainer:
         if not self.save_model():
             return False
         
-        # 4. 품질 평가
+        # 4. ANN 인덱스 생성
+        self.build_ann_index()
+        
+        # 5. 품질 평가
         self.evaluate_embeddings()
         
-        # 5. 유사도 테스트
+        # 6. 유사도 테스트
         self.test_similarity()
         
         print("\n" + "=" * 60)
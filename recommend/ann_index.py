@@ -0,0 +1,222 @@
+"""
+근사 최근접 이웃(ANN) 아이템 인덱스 - NumPy로 구현한 IVF(역파일) 인덱스
+
+정규화된 아이템 행렬을 구면 k-means로 num_lists개 파티션으로 나누고,
+검색 시 질의와 가까운 nprobe개 파티션의 아이템만 정확히 점수 계산한다.
+nprobe가 클수록 recall이 오르고 지연 시간이 늘어난다.
+
+인덱스 생성 및 recall 리포트:
+    python recommend/ann_index.py --build --report
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recommend.ranking import top_k_indices
+
+IVF_FORMAT_VERSION = 1
+
+
+class IVFIndex:
+    """정규화된 아이템 행렬 위의 IVF 인덱스 (아이템 행렬은 인덱스 밖에서 주입)"""
+
+    def __init__(self, centroids, list_offsets, list_rows, item_ids, nprobe=8):
+        self.centroids = centroids          # (num_lists, dim) 정규화된 중심
+        self.list_offsets = list_offsets    # (num_lists+1,) CSR 오프셋
+        self.list_rows = list_rows          # (items,) 파티션 순서로 정렬된 아이템 행 번호
+        self.item_ids = item_ids            # 인덱스를 만든 아이템 ID 순서 (정합성 확인용)
+        self.nprobe = nprobe
+
+    @property
+    def num_lists(self):
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, item_matrix, item_ids, num_lists=None, num_iterations=10, sample_size=100000,
+              nprobe=8, seed=0):
+        """구면 k-means로 IVF 인덱스 생성 (item_matrix는 L2 정규화된 행렬)"""
+        num_items = item_matrix.shape[0]
+        if num_lists is None:
+            num_lists = max(1, int(np.sqrt(num_items)))
+        num_lists = max(1, min(num_lists, num_items))
+
+        rng = np.random.default_rng(seed)
+
+        # 학습은 샘플로, 할당은 전체로
+        if num_items > sample_size:
+            sample = np.asarray(item_matrix[np.sort(rng.choice(num_items, sample_size, replace=False))],
+                                dtype=np.float32)
+        else:
+            sample = np.asarray(item_matrix, dtype=np.float32)
+
+        centroids = sample[rng.choice(sample.shape[0], num_lists, replace=False)].copy()
+        for _ in range(num_iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=num_lists)
+
+            # 비어 있는 파티션은 임의의 샘플로 다시 시작
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        assignment = cls._assign(item_matrix, centroids)
+        list_rows = np.argsort(assignment, kind='stable').astype(np.int64)
+        list_offsets = np.zeros(num_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=num_lists), out=list_offsets[1:])
+
+        return cls(centroids, list_offsets, list_rows, np.asarray(item_ids, dtype=np.int64), nprobe=nprobe)
+
+    @staticmethod
+    def _assign(item_matrix, centroids, chunk_size=65536):
+        """전체 아이템을 가장 가까운 중심에 할당 (메모리 제한을 위해 청크 단위)"""
+        assignment = np.empty(item_matrix.shape[0], dtype=np.int64)
+        for start in range(0, item_matrix.shape[0], chunk_size):
+            chunk = np.asarray(item_matrix[start:start + chunk_size], dtype=np.float32)
+            assignment[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignment
+
+    def matches(self, item_ids):
+        """엔진의 아이템 순서와 같은 인덱스인지 확인"""
+        return len(item_ids) == len(self.item_ids) and np.array_equal(self.item_ids, item_ids)
+
+    def candidate_rows(self, query, nprobe=None):
+        """질의와 가까운 nprobe개 파티션의 아이템 행 번호"""
+        nprobe = min(nprobe or self.nprobe, self.num_lists)
+        probe_lists = top_k_indices(self.centroids @ query, nprobe)
+        return np.concatenate([
+            self.list_rows[self.list_offsets[lst]:self.list_offsets[lst + 1]] for lst in probe_lists
+        ])
+
+    def search(self, item_matrix, query, top_k, nprobe=None, mask=None):
+        """질의 하나 검색 → (아이템 행 번호, 점수), mask가 있으면 허용된 행만"""
+        rows = self.candidate_rows(query, nprobe)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        scores = item_matrix[rows] @ query
+        top = top_k_indices(scores, top_k)
+        return rows[top], scores[top]
+
+    def search_batch(self, item_matrix, queries, top_k, nprobe=None, mask=None):
+        """질의 여러 개 검색 → (users x k 행 번호, users x k 점수), 부족한 칸은 -1 / -inf"""
+        num_queries = queries.shape[0]
+        top_k = min(top_k, item_matrix.shape[0])
+        indices = np.full((num_queries, top_k), -1, dtype=np.intp)
+        scores = np.full((num_queries, top_k), -np.inf, dtype=np.float32)
+
+        for row, query in enumerate(queries):
+            found_rows, found_scores = self.search(item_matrix, query, top_k, nprobe, mask)
+            indices[row, :len(found_rows)] = found_rows
+            scores[row, :len(found_scores)] = found_scores
+        return indices, scores
+
+    def save(self, save_path):
+        """npz 파일로 저장"""
+        np.savez(
+            save_path,
+            format_version=np.array(IVF_FORMAT_VERSION),
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_rows=self.list_rows,
+            item_ids=self.item_ids,
+            nprobe=np.array(self.nprobe)
+        )
+        print(f"ANN 인덱스 저장 완료: {save_path} ({self.num_lists}개 파티션)")
+
+    @classmethod
+    def load(cls, load_path):
+        """npz 파일에서 로드"""
+        with np.load(load_path, allow_pickle=False) as data:
+            if int(data['format_version']) != IVF_FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 ANN 인덱스 버전입니다: {int(data['format_version'])}")
+            return cls(
+                centroids=data['centroids'],
+                list_offsets=data['list_offsets'],
+                list_rows=data['list_rows'],
+                item_ids=data['item_ids'],
+                nprobe=int(data['nprobe'])
+            )
+
+
+def recall_report(item_matrix, index, queries, top_k=10, nprobe_values=(1, 2, 4, 8, 16, 32)):
+    """정확 검색 대비 recall@k와 질의당 지연 시간 비교"""
+    # 정확 검색 결과 (기준)
+    start = time.perf_counter()
+    exact = [set(top_k_indices(item_matrix @ query, top_k).tolist()) for query in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    report = []
+    for nprobe in nprobe_values:
+        if nprobe > index.num_lists:
+            break
+        start = time.perf_counter()
+        found = [index.search(item_matrix, query, top_k, nprobe)[0] for query in queries]
+        latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        recall = np.mean([len(truth.intersection(rows.tolist())) / max(1, len(truth))
+                          for truth, rows in zip(exact, found)])
+        report.append({
+            'nprobe': nprobe,
+            f'recall@{top_k}': float(recall),
+            'latency_ms': latency_ms,
+            'exact_latency_ms': exact_ms
+        })
+    return report
+
+
+def main():
+    """엔진의 아이템 임베딩으로 ANN 인덱스 생성 및 recall 리포트"""
+    import argparse
+    from recommend.recommendation_engine import RecommendationEngine
+
+    parser = argparse.ArgumentParser(description='IVF ANN 인덱스 생성 및 recall@k 리포트')
+    parser.add_argument('--build', action='store_true', help='인덱스를 새로 만들어 저장')
+    parser.add_argument('--report', action='store_true', help='정확 검색 대비 recall@k 리포트')
+    parser.add_argument('--num-lists', type=int, default=None, help='파티션 수 (기본: sqrt(아이템 수))')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--num-queries', type=int, default=200)
+
+    args = parser.parse_args()
+
+    engine = RecommendationEngine()
+    engine.load_model()
+    item_matrix = engine.model['item_matrix']
+
+    if args.build or not engine.ann_index_path.exists():
+        index = IVFIndex.build(item_matrix, engine.model['item_ids'], num_lists=args.num_lists)
+        index.save(engine.ann_index_path)
+    else:
+        index = IVFIndex.load(engine.ann_index_path)
+
+    if args.report:
+        # 임의의 trait/concept 가중치로 만든 User 질의
+        rng = np.random.default_rng(0)
+        feature_names = [name for name, node_id in engine.model['name_to_id'].items()
+                         if engine.model['id_to_type'].get(node_id) in ('trait', 'concept')]
+        user_weights = [
+            {name: float(rng.uniform(-1, 1)) for name in rng.choice(feature_names, 8, replace=False)}
+            for _ in range(args.num_queries)
+        ]
+        weights, weight_rows = engine._to_weight_array(user_weights)
+        queries = engine._generate_user_embeddings(weights, weight_rows)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        print(f"\nrecall@{args.top_k} 리포트 ({index.num_lists}개 파티션, 질의 {len(queries)}개)")
+        for row in recall_report(item_matrix, index, queries, top_k=args.top_k):
+            print(f"  nprobe={row['nprobe']:3d}  recall={row[f'recall@{args.top_k}']:.3f}  "
+                  f"{row['latency_ms']:.3f}ms (정확 검색 {row['exact_latency_ms']:.3f}ms)")
+
+
+if __name__ == "__main__":
+    main()
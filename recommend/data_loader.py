@@ -1,25 +1,20 @@
 """
 심리테스트 질문 데이터 로더
 """
-import pandas as pd
-import os
+import sys
 from pathlib import Path
 
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recommend.question_bank import get_question_bank
+
 class PsychologyDataLoader:
-    def __init__(self):
-        # 상대경로 설정
-        self.base_path = Path("data/psychology-question")
-        
-        # 파일 경로들
-        self.trait_questions_path = self.base_path / "trait-question.csv"
-        self.concept_questions_path = self.base_path / "concept-question.csv"
-        self.choice_2_path = self.base_path / "2-choice-question.csv"
-        self.choice_4_path = self.base_path / "4-choice-question.csv"
-        self.choice_5_path = self.base_path / "5-point-question.csv"
-        self.choice_ox_path = self.base_path / "O-X-question.csv"
-        self.emotion_concept_path = self.base_path / "emotion-concept-relation.csv"
+    def __init__(self, question_bank=None):
+        # 질문 은행 (기본: 프로세스 전역 공유 객체, load_all_data 시점에 가져옴)
+        self.question_bank = question_bank
         
-        # 데이터 저장소
+        # 데이터 저장소 (질문 은행의 읽기 전용 행 튜플)
         self.trait_questions = None
         self.concept_questions = None
         self.choice_2_data = None
@@ -32,91 +27,45 @@ class PsychologyDataLoader:
         self.all_questions = []
         
     def load_all_data(self):
-        """모든 CSV 파일 로드"""
+        """질문 은행에서 모든 질문 데이터 가져오기 (CSV 파싱은 프로세스당 1회)"""
         print("📂 심리테스트 데이터 로딩 중...")
         
+        if self.question_bank is None:
+            self.question_bank = get_question_bank()
+        tables = self.question_bank.tables
+        
         # 메인 질문 파일들
-        self.trait_questions = pd.read_csv(self.trait_questions_path)
-        self.concept_questions = pd.read_csv(self.concept_questions_path)
+        self.trait_questions = tables['trait_questions']
+        self.concept_questions = tables['concept_questions']
         
         # 선택지 파일들
-        self.choice_2_data = pd.read_csv(self.choice_2_path)
-        self.choice_4_data = pd.read_csv(self.choice_4_path)
-        self.choice_5_data = pd.read_csv(self.choice_5_path)
-        self.choice_ox_data = pd.read_csv(self.choice_ox_path)
+        self.choice_2_data = tables['choice_2']
+        self.choice_4_data = tables['choice_4']
+        self.choice_5_data = tables['choice_5']
+        self.choice_ox_data = tables['choice_ox']
         
         # 감정-컨셉트 관계 파일
-        self.emotion_concept_data = pd.read_csv(self.emotion_concept_path)
+        self.emotion_concept_data = tables['emotion_concept']
         
         print(f"✅ 데이터 로딩 완료!")
         print(f"   - Trait 질문: {len(self.trait_questions)}개")
         print(f"   - Concept 질문: {len(self.concept_questions)}개")
         
     def create_question_structure(self):
-        """질문을 구조화된 형태로 변환"""
+        """질문을 구조화된 형태로 반환 (질문 은행의 읽기 전용 질문을 세션 간 공유)"""
         if self.trait_questions is None:
             self.load_all_data()
-            
-        self.all_questions = []
         
-        # 1. Trait 질문들 먼저 추가
-        for idx, row in self.trait_questions.iterrows():
-            question_data = {
-                'id': f"trait_{idx}",
-                'category': 'trait',
-                'question_type': row['question_type'],
-                'question': row['question'],
-                'target_node': row['trait_node'],
-                'choices': self._get_choices_for_question(row['question_type'], row['question'])
-            }
-            self.all_questions.append(question_data)
-        
-        # 2. Concept 질문들 추가
-        for idx, row in self.concept_questions.iterrows():
-            question_data = {
-                'id': f"concept_{idx}",
-                'category': 'concept',
-                'question_type': row['question_type'],
-                'question': row['question'],
-                'target_node': row['concept_node'],
-                'choices': self._get_choices_for_question(row['question_type'], row['question'])
-            }
-            self.all_questions.append(question_data)
+        # trait 질문 → concept 질문 순서
+        self.all_questions = list(self.question_bank.questions)
             
         print(f"📋 총 {len(self.all_questions)}개 질문 구조화 완료")
         return self.all_questions
     
-    def _get_choices_for_question(self, question_type, question_text):
-        """질문 타입에 따라 선택지 반환"""
-        if question_type == "5_point_question":
-            return ["1(매우아님)", "2", "3", "4", "5(매우맞음음)"]
-        
-        elif question_type == "2_choice_question":
-            # 2-choice-question.csv에서 해당 질문 찾기
-            match_row = self.choice_2_data[self.choice_2_data['question'] == question_text]
-            if not match_row.empty:
-                row = match_row.iloc[0]
-                return [row['response_1'], row['response_2']]
-            return ["선택지 1", "선택지 2"]
-        
-        elif question_type == "4_choice_question":
-            # 4-choice-question.csv에서 해당 질문 찾기
-            match_row = self.choice_4_data[self.choice_4_data['question'] == question_text]
-            if not match_row.empty:
-                row = match_row.iloc[0]
-                return [row['response_1'], row['response_2'], row['response_3'], row['response_4']]
-            return ["선택지 1", "선택지 2", "선택지 3", "선택지 4"]
-        
-        elif question_type == "O_X_question":
-            return ["O", "X"]
-        
-        return ["기본 선택지"]
-    
     def get_question_by_id(self, question_id):
         """ID로 특정 질문 가져오기"""
-        for q in self.all_questions:
-            if q['id'] == question_id:
-                return q
+        if self.question_bank is not None:
+            return self.question_bank.question_index.get(question_id)
         return None
     
     def get_questions_by_category(self, category):
@@ -0,0 +1,150 @@
+"""
+다양성 재정렬 - 후보 풀(상위 pool_size개) 위에서 MMR / 카테고리 할당량으로 Top-K 재선택
+
+같은 카테고리 상품은 임베딩이 거의 같아 상위 k개가 비슷한 상품으로 채워지기 쉽다.
+MMR은 매 단계 lambda * 관련도 - (1 - lambda) * (이미 고른 아이템과의 최대 유사도)가
+가장 큰 후보를 고르고, 카테고리 할당량은 한 카테고리에서 고를 수 있는 수를 제한한다.
+여러 User를 (users x 후보) 배열로 묶어 k번의 벡터 연산으로 처리한다.
+
+다양성 옵션 dict 키:
+    mmr_lambda       : 관련도 비중 (0~1, 1이면 원래 순위, None이면 MMR 사용 안 함)
+    max_per_category : 카테고리당 최대 아이템 수 (None이면 제한 없음)
+    pool_size        : 재정렬할 후보 수 (기본 200)
+"""
+import numpy as np
+
+DIVERSITY_KEYS = ('mmr_lambda', 'max_per_category', 'pool_size')
+DEFAULT_POOL_SIZE = 200
+
+# 아이템 수가 이 이하이면 아이템 x 아이템 유사도 전체를 로드 시 미리 계산 (4096개면 64MB)
+PRECOMPUTE_MAX_ITEMS = 4096
+
+# 미리 계산하지 않을 때 한 번에 만드는 (users x c x c) 후보 유사도 블록의 최대 크기
+SIMILARITY_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def diversity_key(diversity):
+    """다양성 옵션 검증 후 해시 가능한 정규형 반환 (옵션이 없으면 None)"""
+    if not diversity:
+        return None
+
+    unknown = set(diversity) - set(DIVERSITY_KEYS)
+    if unknown:
+        raise ValueError(f"지원하지 않는 다양성 옵션입니다: {sorted(unknown)}")
+
+    mmr_lambda = diversity.get('mmr_lambda')
+    if mmr_lambda is not None:
+        mmr_lambda = float(mmr_lambda)
+        if not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError(f"mmr_lambda는 0~1 사이여야 합니다: {mmr_lambda}")
+
+    max_per_category = diversity.get('max_per_category')
+    if max_per_category is not None:
+        max_per_category = int(max_per_category)
+        if max_per_category < 1:
+            raise ValueError(f"max_per_category는 1 이상이어야 합니다: {max_per_category}")
+
+    pool_size = int(diversity.get('pool_size') or DEFAULT_POOL_SIZE)
+    if pool_size < 1:
+        raise ValueError(f"pool_size는 1 이상이어야 합니다: {pool_size}")
+
+    if mmr_lambda is None and max_per_category is None:
+        return None
+    return (mmr_lambda, max_per_category, pool_size)
+
+
+class DiversityReranker:
+    """후보 풀 MMR / 카테고리 할당량 재정렬기"""
+
+    def __init__(self, item_vectors, category_codes):
+        self.item_vectors = item_vectors            # (items x dim) L2 정규화 벡터 (유사도 계산용)
+        self.category_codes = np.asarray(category_codes, dtype=np.int64)    # (items,) -1은 카테고리 없음
+        self.num_categories = int(self.category_codes.max()) + 1 if len(self.category_codes) else 0
+
+        self.similarity = None
+        if item_vectors.shape[0] <= PRECOMPUTE_MAX_ITEMS:
+            similarity = np.asarray(item_vectors, dtype=np.float32) @ np.asarray(item_vectors, dtype=np.float32).T
+            similarity.flags.writeable = False
+            self.similarity = similarity
+
+    def _similarity_block(self, candidates):
+        """(users x c) 후보 → (users x c x c) 후보 간 유사도"""
+        safe = np.maximum(candidates, 0)
+        if self.similarity is not None:
+            return self.similarity[safe[:, :, None], safe[:, None, :]]
+        vectors = np.asarray(self.item_vectors[safe.ravel()], dtype=np.float32).reshape(
+            safe.shape + (self.item_vectors.shape[1],)
+        )
+        return np.einsum('ucd,ued->uce', vectors, vectors)
+
+    def rerank(self, candidates, scores, top_k, mmr_lambda=None, max_per_category=None):
+        """(users x c) 후보 행 번호/점수 → (users x k) 재선택 결과 (-1은 빈칸)
+
+        반환 점수는 원래 관련도 점수이며, 순서는 선택 순서다.
+        """
+        num_users, num_candidates = candidates.shape
+        top_k = min(top_k, num_candidates)
+
+        # 후보 유사도 블록이 메모리 상한을 넘지 않도록 User를 나눠 처리
+        chunk_users = max(1, SIMILARITY_BLOCK_BYTES // (4 * max(1, num_candidates) ** 2))
+        if mmr_lambda is not None and num_users > chunk_users:
+            parts = [
+                self.rerank(candidates[start:start + chunk_users], scores[start:start + chunk_users],
+                            top_k, mmr_lambda, max_per_category)
+                for start in range(0, num_users, chunk_users)
+            ]
+            return np.vstack([part[0] for part in parts]), np.vstack([part[1] for part in parts])
+
+        rows = np.arange(num_users)
+
+        available = (candidates >= 0) & np.isfinite(scores)
+        selected = np.full((num_users, top_k), -1, dtype=np.intp)
+        selected_scores = np.full((num_users, top_k), -np.inf, dtype=np.float32)
+        if top_k == 0:
+            return selected, selected_scores
+
+        # 관련도는 User별로 0~1로 맞춰 유사도와 같은 척도에서 비교
+        low = np.where(available, scores, np.inf).min(axis=1, keepdims=True)
+        high = np.where(available, scores, -np.inf).max(axis=1, keepdims=True)
+        span = np.where(high > low, high - low, 1.0)
+        relevance = np.where(available, (scores - np.where(np.isfinite(low), low, 0.0)) / span, 0.0)
+
+        if mmr_lambda is not None:
+            similarity = self._similarity_block(candidates)
+            max_similarity = np.zeros((num_users, num_candidates), dtype=np.float32)
+
+        if max_per_category is not None:
+            codes = self.category_codes[np.maximum(candidates, 0)]
+            has_category = codes >= 0
+            codes = np.where(has_category, codes, self.num_categories)
+            category_counts = np.zeros((num_users, self.num_categories + 1), dtype=np.int64)
+
+        for step in range(top_k):
+            if mmr_lambda is None:
+                objective = relevance.copy()
+            else:
+                objective = mmr_lambda * relevance - (1.0 - mmr_lambda) * max_similarity
+
+            allowed = available
+            if max_per_category is not None:
+                full = np.take_along_axis(category_counts, codes, axis=1) >= max_per_category
+                allowed = allowed & ~(full & has_category)
+
+            objective = np.where(allowed, objective, -np.inf)
+            pick = np.argmax(objective, axis=1)
+            found = np.isfinite(objective[rows, pick])
+            if not found.any():
+                break
+
+            picked_rows = rows[found]
+            picked = pick[found]
+            selected[picked_rows, step] = candidates[picked_rows, picked]
+            selected_scores[picked_rows, step] = scores[picked_rows, picked]
+            available[picked_rows, picked] = False
+
+            if mmr_lambda is not None:
+                max_similarity[picked_rows] = np.maximum(max_similarity[picked_rows], similarity[picked_rows, picked])
+            if max_per_category is not None:
+                category_counts[picked_rows, codes[picked_rows, picked]] += 1
+
+        return selected, selected_scores
@@ -0,0 +1,122 @@
+"""
+추천 이유 - 아이템별로 점수에 가장 많이 기여한 trait/concept 노드 계산
+
+기여도 = User 가중치 x 아이템-특성 엣지 가중치 (item_trait / item_concept 관계)
+로드 시 (아이템 x 특성) 희소 행렬(CSR 배열)을 한 번 만들어 두고,
+요청마다 추천된 아이템 행만 모아 Top-K 전체의 기여도를 한 번에 계산한다 (그래프 탐색 없음).
+"""
+import numpy as np
+
+from data.graph_snapshot import GraphSnapshot, csr_row_edges
+from recommend.ranking import top_k_indices
+
+
+class ItemExplainer:
+    """(아이템 x 특성) 엣지 가중치 CSR 행렬 기반 추천 이유 계산기"""
+
+    def __init__(self, indptr, indices, weights, feature_names, feature_types, item_ids):
+        self.indptr = indptr                    # (items+1,) CSR 오프셋 (engine의 item_ids 순서)
+        self.indices = indices                  # (nnz,) 특성 열 번호
+        self.weights = weights                  # (nnz,) 아이템-특성 엣지 가중치
+        self.feature_names = feature_names      # 특성(trait/concept) 노드 이름 (열 순서)
+        self.feature_types = feature_types
+        self.feature_index = {name: col for col, name in enumerate(feature_names)}
+        self.item_to_row = {item_id: row for row, item_id in enumerate(item_ids)}
+
+    @classmethod
+    def build(cls, graph, item_ids):
+        """그래프(GraphSnapshot 또는 networkx)에서 아이템의 특성 엣지만 모아 CSR 행렬 생성"""
+        snapshot = GraphSnapshot.ensure(graph)
+
+        # 특성: item이 아닌 노드 (User 가중치가 들어오는 trait/concept)
+        item_code = snapshot.type_table.index('item') if 'item' in snapshot.type_table else -1
+        feature_rows = np.flatnonzero(snapshot.node_type_codes != item_code)
+        feature_position = np.full(snapshot.number_of_nodes(), -1, dtype=np.int64)
+        feature_position[feature_rows] = np.arange(len(feature_rows))
+
+        item_rows = np.asarray([snapshot.node_index[item_id] for item_id in item_ids], dtype=np.int64)
+        row_positions, edges = csr_row_edges(snapshot.indptr, item_rows)
+        cols = feature_position[snapshot.indices[edges]]
+        keep = cols >= 0
+
+        # 스냅샷 엣지는 행 순서로 펼쳐지므로 남은 엣지도 아이템 순서 그대로 CSR이 된다
+        indptr = np.zeros(len(item_rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_positions[keep], minlength=len(item_rows)), out=indptr[1:])
+
+        return cls(
+            indptr=indptr,
+            indices=cols[keep].astype(np.int32),
+            weights=snapshot.weights[edges[keep]].astype(np.float32),
+            feature_names=[str(snapshot.names[row]) for row in feature_rows.tolist()],
+            feature_types=[snapshot.type_table[code] for code in snapshot.node_type_codes[feature_rows].tolist()],
+            item_ids=list(item_ids)
+        )
+
+    def user_vectors(self, user_weights, signed=False):
+        """가중치 dict 리스트 → (users x 특성) 행렬 (signed=False면 절대값, 엔진의 User 노드 연결과 동일)"""
+        vectors = np.zeros((len(user_weights), len(self.feature_names)), dtype=np.float32)
+        for row, weight_dict in enumerate(user_weights):
+            for node_name, weight in weight_dict.items():
+                col = self.feature_index.get(node_name)
+                if col is not None:
+                    vectors[row, col] = weight if signed else abs(weight)
+        return vectors
+
+    def explain(self, user_vectors, item_rows, top_n=3):
+        """(users x 특성) 가중치와 (users x k) 아이템 행 번호 → User/아이템별 상위 top_n 기여 특성
+
+        반환값: (users x k x n) 특성 열 번호, 기여도, 엣지 가중치 (기여가 없으면 열 번호 -1)
+        """
+        item_rows = np.asarray(item_rows, dtype=np.int64)
+        num_users, k = item_rows.shape
+        num_features = len(self.feature_names)
+
+        # 추천된 (User, 아이템) 쌍의 특성 엣지만 펼쳐 (쌍 x 특성) 엣지 가중치 블록 구성
+        flat_rows = item_rows.ravel()
+        valid = flat_rows >= 0
+        pair_positions, edges = csr_row_edges(self.indptr, np.where(valid, flat_rows, 0))
+        keep = valid[pair_positions]
+        edge_block = np.zeros((len(flat_rows), num_features), dtype=np.float32)
+        edge_block[pair_positions[keep], self.indices[edges[keep]]] = self.weights[edges[keep]]
+
+        pair_users = np.repeat(np.arange(num_users), k)
+        contributions = edge_block * user_vectors[pair_users]
+
+        top_n = min(top_n, num_features)
+        features = top_k_indices(contributions, top_n)
+        top_contributions = np.take_along_axis(contributions, features, axis=1)
+        top_edges = np.take_along_axis(edge_block, features, axis=1)
+        # 양의 기여만 추천 이유로 사용
+        features = np.where(top_contributions > 0, features, -1)
+
+        shape = (num_users, k, top_n)
+        return features.reshape(shape), top_contributions.reshape(shape), top_edges.reshape(shape)
+
+    def explain_recommendations(self, user_weights, recommendations, top_n=3, signed=False):
+        """User별 추천 결과 리스트에 'reasons' 추가 (모든 User의 Top-K를 한 번에 계산)"""
+        user_vectors = self.user_vectors(user_weights, signed=signed)
+
+        k = max((len(recs) for recs in recommendations), default=0)
+        item_rows = np.full((len(recommendations), k), -1, dtype=np.int64)
+        for row, recs in enumerate(recommendations):
+            item_rows[row, :len(recs)] = [self.item_to_row.get(rec['item_id'], -1) for rec in recs]
+
+        features, contributions, edge_weights = self.explain(user_vectors, item_rows, top_n)
+
+        for row, recs in enumerate(recommendations):
+            for col, rec in enumerate(recs):
+                rec['reasons'] = [
+                    {
+                        'node': self.feature_names[feature],
+                        'type': self.feature_types[feature],
+                        'user_weight': float(user_vectors[row, feature]),
+                        'edge_weight': edge_weight,
+                        'contribution': contribution
+                    }
+                    for feature, contribution, edge_weight in zip(
+                        features[row, col].tolist(), contributions[row, col].tolist(),
+                        edge_weights[row, col].tolist()
+                    )
+                    if feature >= 0
+                ]
+        return recommendations
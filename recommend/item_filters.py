@@ -0,0 +1,141 @@
+"""
+아이템 필터 - 가격/카테고리/테마/제외 조건을 아이템 행렬 행 순서의 boolean 마스크로 변환
+
+로드 시 가격 정렬 순서와 카테고리/테마별 마스크를 미리 만들어 두고,
+요청마다 배열 연산만으로 마스크를 조합해 Top-K 선택 전에 적용한다.
+
+필터 dict 키:
+    min_price, max_price : 가격 범위 (원, 양끝 포함, 가격 정보가 없는 상품은 제외)
+    categories           : 허용할 카테고리 목록 (products.csv의 category)
+    themes               : 허용할 테마 목록 (products.csv의 theme)
+    exclude              : 제외할 상품 ID(product_id) 목록 (예: 이미 선물한 상품)
+    exclude_items        : 제외할 아이템 노드 ID 목록
+"""
+import numpy as np
+
+FILTER_KEYS = ('min_price', 'max_price', 'categories', 'themes', 'exclude', 'exclude_items')
+
+
+def _as_list(value):
+    """값 하나 또는 목록을 목록으로 (문자열이 글자 단위로 쪼개지지 않도록)"""
+    if value is None:
+        return []
+    if isinstance(value, (str, int)):
+        return [value]
+    return value
+
+
+def filter_key(filters):
+    """필터 dict를 해시 가능한 정규형으로 변환 (결과 캐시 키/배치 묶음용, 필터가 없으면 None)"""
+    if not filters:
+        return None
+
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"지원하지 않는 필터입니다: {sorted(unknown)}")
+
+    key = []
+    for name in FILTER_KEYS:
+        value = filters.get(name)
+        if value is None:
+            continue
+        if name in ('min_price', 'max_price'):
+            key.append((name, float(value)))
+        elif name == 'exclude_items':
+            key.append((name, frozenset(int(item) for item in _as_list(value))))
+        else:
+            key.append((name, frozenset(str(item) for item in _as_list(value))))
+    return tuple(key) or None
+
+
+class ItemFilterIndex:
+    """아이템 행렬 행 순서에 맞춘 가격/카테고리/테마 인덱스"""
+
+    def __init__(self, item_ids, product_ids, prices, categories, themes):
+        self.num_items = len(item_ids)
+
+        # 가격이 있는 행만 가격 오름차순으로 정렬해 두고 범위는 이진 탐색으로 자른다
+        prices = np.asarray(prices, dtype=np.float64)
+        priced_rows = np.flatnonzero(~np.isnan(prices))
+        order = np.argsort(prices[priced_rows], kind='stable')
+        self.price_rows = priced_rows[order]
+        self.sorted_prices = prices[self.price_rows]
+
+        # 카테고리 코드는 다양성 재정렬의 카테고리 할당량에도 사용
+        self.category_codes, self.category_masks = self._value_masks(categories)
+        _, self.theme_masks = self._value_masks(themes)
+
+        self.item_to_row = {item_id: row for row, item_id in enumerate(item_ids)}
+        self.product_to_row = {
+            str(product_id): row for row, product_id in enumerate(product_ids) if product_id is not None
+        }
+
+    @classmethod
+    def build(cls, item_ids, id_to_product, catalog):
+        """엔진의 아이템 순서와 상품 카탈로그로 인덱스 생성 (로드 시 1회)"""
+        product_ids, prices, categories, themes = [], [], [], []
+        for item_id in item_ids:
+            product_id = id_to_product.get(item_id)
+            product = catalog.get(product_id) if product_id is not None else None
+            product_ids.append(product_id)
+            if product is None:
+                prices.append(np.nan)
+                categories.append(None)
+                themes.append(None)
+            else:
+                prices.append(np.nan if product['price'] is None else product['price'])
+                categories.append(product['category'])
+                themes.append(product['theme'])
+        return cls(item_ids, product_ids, prices, categories, themes)
+
+    def _value_masks(self, values):
+        """행별 값 코드 (items,)와 값별 boolean 마스크 {값: (items,) bool} (값이 없으면 코드 -1)"""
+        codes = {}
+        row_codes = np.array([codes.setdefault(value, len(codes)) if value is not None else -1
+                              for value in values], dtype=np.int32)
+        return row_codes, {value: row_codes == code for value, code in codes.items()}
+
+    def _any_of(self, value_masks, wanted):
+        """허용 값 중 하나라도 해당하는 행 (목록에 없는 값은 아무 행도 허용하지 않음)"""
+        masks = [value_masks[str(value)] for value in _as_list(wanted) if str(value) in value_masks]
+        if not masks:
+            return np.zeros(self.num_items, dtype=bool)
+        return np.logical_or.reduce(masks)
+
+    def mask(self, filters):
+        """필터 dict → (items,) bool 마스크 (필터가 없으면 None)"""
+        if filter_key(filters) is None:
+            return None
+
+        mask = np.ones(self.num_items, dtype=bool)
+
+        min_price = filters.get('min_price')
+        max_price = filters.get('max_price')
+        if min_price is not None or max_price is not None:
+            start = 0 if min_price is None else np.searchsorted(self.sorted_prices, float(min_price), side='left')
+            end = (len(self.sorted_prices) if max_price is None
+                   else np.searchsorted(self.sorted_prices, float(max_price), side='right'))
+            price_mask = np.zeros(self.num_items, dtype=bool)
+            price_mask[self.price_rows[start:end]] = True
+            mask &= price_mask
+
+        if filters.get('categories') is not None:
+            mask &= self._any_of(self.category_masks, filters['categories'])
+
+        if filters.get('themes') is not None:
+            mask &= self._any_of(self.theme_masks, filters['themes'])
+
+        # 제외 목록은 아이템 전체가 아니라 목록 길이만큼만 조회
+        excluded_rows = []
+        for product_id in _as_list(filters.get('exclude')):
+            row = self.product_to_row.get(str(product_id))
+            if row is not None:
+                excluded_rows.append(row)
+        for item_id in _as_list(filters.get('exclude_items')):
+            row = self.item_to_row.get(int(item_id))
+            if row is not None:
+                excluded_rows.append(row)
+        if excluded_rows:
+            mask[excluded_rows] = False
+
+        return mask
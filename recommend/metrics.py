@@ -0,0 +1,170 @@
+"""
+추천 경로 계측 - 단계별 지연 시간 히스토그램(p50/p99)과 카운터
+
+    from recommend.metrics import METRICS, timed
+
+    @timed('get_recommendations')
+    def get_recommendations(...): ...
+
+    METRICS.snapshot()                 # JSON으로 내보낼 dict
+    METRICS.to_prometheus()            # Prometheus 텍스트 형식
+    METRICS.write('metrics.prom')      # 확장자가 .json이면 JSON, 아니면 Prometheus 텍스트
+
+METRICS.enabled = False(또는 환경 변수 RECOMMEND_METRICS=0)이면 timed는 플래그 확인 한 번 후
+원래 함수를 그대로 호출한다. 표준 라이브러리만 사용해 어떤 추론 모듈에서도 import할 수 있다.
+"""
+import os
+import json
+import time
+import threading
+import functools
+from pathlib import Path
+
+# 단계별로 보관하는 최근 측정값 수 (백분위수는 이 구간에서 계산)
+HISTOGRAM_WINDOW = 4096
+
+# 스냅샷/내보내기에 포함하는 백분위수
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    """누적 횟수/합계와 최근 window개 측정값(링 버퍼)으로 백분위수를 계산하는 히스토그램"""
+
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples = [0.0] * window
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples[self.count % self.window] = seconds
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self):
+        """{'count', 'sum', 'max', 'p50', 'p90', 'p99'} (초 단위)"""
+        with self._lock:
+            samples = sorted(self._samples[:min(self.count, self.window)])
+            result = {'count': self.count, 'sum': self.total, 'max': self.max}
+
+        for quantile in QUANTILES:
+            # nearest-rank 백분위수
+            value = samples[min(len(samples) - 1, int(quantile * len(samples)))] if samples else 0.0
+            result[f'p{int(quantile * 100)}'] = value
+        return result
+
+
+class MetricsRegistry:
+    """단계별 히스토그램과 카운터 모음 (프로세스 전역 METRICS로 사용)"""
+
+    def __init__(self, enabled=True, window=HISTOGRAM_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, stage):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram(self.window))
+        return histogram
+
+    def observe(self, stage, seconds):
+        """단계 소요 시간 기록"""
+        if self.enabled:
+            self._histogram(stage).observe(seconds)
+
+    def increment(self, name, value=1):
+        """카운터 증가"""
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def snapshot(self):
+        """{'stages': {단계: 히스토그램 스냅샷}, 'counters': {...}} (시간은 밀리초)"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+
+        stages = {}
+        for stage, histogram in sorted(histograms.items()):
+            snapshot = histogram.snapshot()
+            stages[stage] = {
+                'count': snapshot.pop('count'),
+                **{f'{key}_ms': value * 1000 for key, value in snapshot.items()}
+            }
+        return {'enabled': self.enabled, 'stages': stages, 'counters': counters}
+
+    def to_prometheus(self, prefix='recommend'):
+        """Prometheus 텍스트 형식 (단계별 summary + 카운터)"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+
+        lines = []
+        if histograms:
+            name = f'{prefix}_stage_duration_seconds'
+            lines.append(f'# HELP {name} Recommendation stage latency in seconds.')
+            lines.append(f'# TYPE {name} summary')
+            for stage, histogram in sorted(histograms.items()):
+                snapshot = histogram.snapshot()
+                for quantile in QUANTILES:
+                    value = snapshot[f'p{int(quantile * 100)}']
+                    lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {value:.9f}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {snapshot["sum"]:.9f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {snapshot["count"]}')
+
+        for counter, value in sorted(counters.items()):
+            name = f'{prefix}_{counter}_total'
+            lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """확장자가 .json이면 JSON 스냅샷, 아니면 Prometheus 텍스트로 저장 (node_exporter textfile 등)"""
+        path = Path(path)
+        if path.suffix == '.json':
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            content = self.to_prometheus()
+
+        # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get('RECOMMEND_METRICS', '1') != '0')
+
+
+def timed(stage, registry=None):
+    """함수 실행 시간을 stage 히스토그램에 기록하는 데코레이터 (예외는 '{stage}_errors' 카운터)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = registry or METRICS
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.increment(f'{stage}_errors')
+                raise
+            finally:
+                metrics.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
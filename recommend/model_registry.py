@@ -0,0 +1,137 @@
+"""
+모델 레지스트리 - 프로세스 전역에서 추천 엔진을 1회 로드해 공유하고 파일 변경 시 교체
+"""
+import sys
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recommend.recommendation_engine import RecommendationEngine
+
+
+class ModelRegistry:
+    """읽기 전용으로 공유되는 추천 엔진 보관소 (핫 리로드 지원)"""
+
+    def __init__(self, engine_factory=RecommendationEngine, check_interval=5.0, verify_hash=True):
+        self.engine_factory = engine_factory
+        # 파일 변경 확인 최소 간격(초)
+        self.check_interval = check_interval
+        # mtime이 바뀌어도 내용이 같으면 리로드하지 않음
+        self.verify_hash = verify_hash
+
+        self._engine = None
+        self._signature = None
+        self._content_hash = None
+        # 마지막으로 로드에 실패한 파일 시그니처 (같은 파일을 매번 다시 로드하지 않도록)
+        self._failed_signature = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def get_engine(self):
+        """현재 엔진 반환 (필요하면 변경 확인 후 새 버전으로 교체)"""
+        engine = self._engine
+        if engine is not None and time.monotonic() - self._last_check < self.check_interval:
+            return engine
+
+        # 이미 다른 스레드가 확인/리로드 중이면 기존 엔진으로 바로 응답
+        if not self._lock.acquire(blocking=engine is None):
+            return engine
+
+        try:
+            if self._engine is None or self._files_changed(self._engine):
+                try:
+                    self._load_new_engine()
+                except Exception as e:
+                    # 처음 로드가 아니면 기존 엔진으로 계속 응답 (파일이 다시 바뀌면 재시도)
+                    if self._engine is None:
+                        raise
+                    print(f"모델 레지스트리: 새 버전 로드 실패, 버전 {self.version} 유지 ({e})")
+            self._last_check = time.monotonic()
+            return self._engine
+        finally:
+            self._lock.release()
+
+    @property
+    def current_engine(self):
+        """변경 확인 없이 현재 엔진 참조만 반환 (아직 로드 전이면 None)"""
+        return self._engine
+
+    def reload(self):
+        """파일 변경 여부와 상관없이 강제로 다시 로드"""
+        with self._lock:
+            self._load_new_engine()
+            self._last_check = time.monotonic()
+            return self._engine
+
+    def _load_new_engine(self):
+        """새 엔진을 완전히 로드한 뒤 참조만 교체 (진행 중인 요청은 기존 엔진 사용)"""
+        engine = self.engine_factory()
+        signature = self._file_signature(engine)
+        content_hash = self._file_hash(engine) if self.verify_hash else None
+        try:
+            engine.load_model()
+        except Exception:
+            self._failed_signature = signature
+            raise
+
+        self._engine = engine
+        self._signature = signature
+        self._content_hash = content_hash
+        self._failed_signature = None
+        self.version += 1
+        print(f"모델 레지스트리: 버전 {self.version} 적용")
+
+    def _files_changed(self, engine):
+        """모델 파일의 mtime/크기(및 해시) 변경 여부"""
+        signature = self._file_signature(engine)
+        if signature == self._signature or signature == self._failed_signature:
+            return False
+
+        if self.verify_hash and self._file_hash(engine) == self._content_hash:
+            # 내용은 같으므로 시그니처만 갱신
+            self._signature = signature
+            return False
+        return True
+
+    @staticmethod
+    def _file_signature(engine):
+        signature = []
+        for path in engine.source_files():
+            try:
+                stat = Path(path).stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    @staticmethod
+    def _file_hash(engine):
+        digest = hashlib.sha256()
+        for path in engine.source_files():
+            digest.update(str(path).encode('utf-8'))
+            try:
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(block)
+            except FileNotFoundError:
+                digest.update(b'<missing>')
+        return digest.hexdigest()
+
+
+# 프로세스 전역 레지스트리
+_default_registry = ModelRegistry()
+
+
+def get_registry():
+    """프로세스 전역 모델 레지스트리"""
+    return _default_registry
+
+
+def get_engine():
+    """프로세스 전역에서 공유하는 추천 엔진"""
+    return _default_registry.get_engine()
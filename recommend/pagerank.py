@@ -0,0 +1,133 @@
+"""
+개인화 PageRank(재시작 랜덤 워크) 추천 점수
+
+User가 가중치를 준 trait/concept 노드에 재시작 확률을 두고
+CSR 전이 행렬로 거듭제곱 반복(power iteration)해 아이템 노드의 정상 확률로 순위를 매긴다.
+여러 User의 시작 벡터를 (users x nodes) 행렬로 묶어 한 번에 반복한다.
+
+    x_{t+1} = alpha * s + (1 - alpha) * (x_t P + 끊긴 노드 질량 * s)
+
+랜덤 워크의 전이 확률은 음수가 될 수 없으므로 양수 가중치 엣지만 사용하고,
+User 가중치는 add_user_node의 User 노드 연결과 같이 절대값을 쓴다.
+
+끊긴 노드가 없으면 정상 확률은 재시작 분포에 선형이므로, 로드 시 시작 노드마다의
+정상 확률(one-hot 시작 벡터 배치)을 한 번 계산해 두고 요청은 행렬곱 한 번으로 처리한다.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from data.graph_snapshot import GraphSnapshot
+
+
+class PersonalizedPageRank:
+    """CSR 전이 행렬 위의 배치 개인화 PageRank"""
+
+    def __init__(self, transition_t, dangling, source_rows, source_names, item_rows, item_ids,
+                 alpha=0.15, tol=1e-6, max_iter=100, precompute=True):
+        self.transition_t = transition_t    # (N x N) CSR, 전이 행렬의 전치 (x P = (P^T x^T)^T)
+        self.dangling = dangling            # (N,) bool, 나가는 엣지가 없는 노드
+        self.source_rows = source_rows      # 시작 노드(trait/concept)의 행 번호
+        self.source_names = source_names
+        self.source_index = {name: idx for idx, name in enumerate(source_names)}
+        self.item_rows = item_rows          # 아이템 노드의 행 번호 (engine의 item_ids 순서)
+        self.item_ids = item_ids
+        self.alpha = alpha
+        self.tol = tol
+        self.max_iter = max_iter
+
+        # 마지막 stationary 호출의 반복 횟수 (수렴 확인용)
+        self.last_iterations = 0
+
+        # (sources x items) 시작 노드별 아이템 정상 확률 (선형성이 성립할 때만)
+        self.item_basis = None
+        if precompute and not dangling.any():
+            self.item_basis = self._item_scores(np.eye(len(source_names)))
+
+    @classmethod
+    def build(cls, graph, item_ids, alpha=0.15, tol=1e-6, max_iter=100, precompute=True):
+        """그래프(GraphSnapshot 또는 networkx)에서 전이 행렬 생성"""
+        snapshot = GraphSnapshot.ensure(graph)
+        num_nodes = snapshot.number_of_nodes()
+
+        weights = np.maximum(snapshot.weights.astype(np.float64), 0.0)
+        adjacency = sp.csr_matrix((weights, snapshot.indices, snapshot.indptr), shape=(num_nodes, num_nodes))
+        adjacency.eliminate_zeros()
+
+        # 행 정규화 → 행 확률 행렬 P
+        out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        inv_out = np.zeros_like(out_weight)
+        inv_out[~dangling] = 1.0 / out_weight[~dangling]
+        transition = sp.diags(inv_out) @ adjacency
+
+        item_code = snapshot.type_table.index('item') if 'item' in snapshot.type_table else -1
+        source_rows = np.flatnonzero(snapshot.node_type_codes != item_code)
+        item_rows = np.asarray([snapshot.node_index[item_id] for item_id in item_ids], dtype=np.int64)
+
+        return cls(
+            transition_t=transition.T.tocsr(),
+            dangling=dangling,
+            source_rows=source_rows,
+            source_names=[str(snapshot.names[row]) for row in source_rows.tolist()],
+            item_rows=item_rows,
+            item_ids=list(item_ids),
+            alpha=alpha,
+            tol=tol,
+            max_iter=max_iter,
+            precompute=precompute
+        )
+
+    def user_vectors(self, user_weights):
+        """가중치 dict 리스트 → (users x sources) 재시작 분포"""
+        vectors = np.zeros((len(user_weights), len(self.source_names)), dtype=np.float64)
+        for row, weight_dict in enumerate(user_weights):
+            for node_name, weight in weight_dict.items():
+                source_row = self.source_index.get(node_name)
+                if source_row is not None:
+                    vectors[row, source_row] = weight
+        return self.normalize(vectors)
+
+    @staticmethod
+    def normalize(vectors):
+        """절대값을 합이 1인 확률 분포로 (가중치가 없으면 시작 노드 전체에 균등 분포)"""
+        vectors = np.abs(np.asarray(vectors, dtype=np.float64))
+        totals = vectors.sum(axis=1, keepdims=True)
+        empty = totals[:, 0] == 0
+        vectors[empty] = 1.0
+        totals[empty] = vectors.shape[1]
+        return vectors / totals
+
+    def stationary(self, user_vectors):
+        """(users x sources) 재시작 분포 → (users x N) 정상 확률 (노드 행 순서)"""
+        num_users = user_vectors.shape[0]
+        num_nodes = self.transition_t.shape[0]
+
+        # 노드 x users로 두고 반복해야 CSR 행렬곱 한 번으로 모든 User를 진행
+        restart = np.zeros((num_nodes, num_users), dtype=np.float64)
+        restart[self.source_rows] = user_vectors.T
+        rank = restart.copy()
+
+        self.last_iterations = 0
+        for iteration in range(1, self.max_iter + 1):
+            dangling_mass = rank[self.dangling].sum(axis=0)
+            new_rank = (1.0 - self.alpha) * (self.transition_t @ rank + restart * dangling_mass)
+            new_rank += self.alpha * restart
+
+            # 모든 User의 L1 변화량이 tol 이하면 조기 종료
+            delta = np.abs(new_rank - rank).sum(axis=0).max() if num_users else 0.0
+            rank = new_rank
+            self.last_iterations = iteration
+            if delta < self.tol:
+                break
+
+        return rank.T
+
+    def _item_scores(self, user_vectors):
+        """거듭제곱 반복으로 아이템 노드의 정상 확률만 추출"""
+        return np.ascontiguousarray(self.stationary(user_vectors)[:, self.item_rows], dtype=np.float32)
+
+    def score(self, user_vectors):
+        """(users x sources) → (users x items) 정상 확률"""
+        if self.item_basis is not None:
+            return np.asarray(user_vectors, dtype=np.float32) @ self.item_basis
+        return self._item_scores(user_vectors)
@@ -0,0 +1,117 @@
+"""
+상품 카탈로그 - products.csv를 한 번만 로드해 product_id로 바로 조회
+
+서빙 워커의 시작 시간을 줄이기 위해 pandas 대신 표준 csv 모듈로 읽는다.
+"""
+import csv
+import sys
+from pathlib import Path
+
+# 상세 정보에 표시할 설명 최대 길이
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+# 상품 설명이 긴 경우를 위해 필드 크기 제한 완화
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def _read_rows(path):
+    """products.csv 행을 dict로 순회 (BOM 제거, 빈 값은 None)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key: (value if value != '' else None) for key, value in row.items()}
+
+
+def _parse_price(value):
+    """가격 문자열 → int (숫자가 아니면 None)"""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(price) if price == price else None
+
+
+class ProductCatalog:
+    """product_id 키로 인덱싱된 인메모리 상품 카탈로그"""
+
+    def __init__(self, products_path=Path("data/product/products.csv"), lazy_description=True):
+        self.products_path = Path(products_path)
+        self.image_base_path = self.products_path.parent
+        self.lazy_description = lazy_description
+
+        # product_id(str) -> 상품 정보 dict
+        self.products = {}
+        # product_id(str) -> 설명 미리보기 (lazy_description이면 첫 조회 시 로드)
+        self.descriptions = None
+        self.loaded = False
+
+    def load(self):
+        """products.csv 로드 및 표시용 필드 미리 계산"""
+        self.products = {}
+        self.descriptions = None
+
+        if not self.products_path.exists():
+            print(f"상품 파일이 없습니다: {self.products_path}")
+            self.loaded = True
+            return
+
+        descriptions = {}
+        for row in _read_rows(self.products_path):
+            product_id = row['product_id']
+            price = _parse_price(row['price'])
+            # 표시 형식: 가격은 정수 원 단위("189,000원"), 빈 카테고리/설명은 'N/A'
+            # (이전 pandas 경로는 빈 칸이 있는 열이 float가 되어 "189,000.0원", 빈 값은 NaN으로 표시됐다)
+            self.products[product_id] = {
+                'product_id': product_id,
+                'name': row['name'],
+                'price': price,
+                'price_display': f"{price:,}원" if price is not None else 'N/A',
+                'category': row['category'] or 'N/A',
+                'theme': row['theme'],
+                'image_path': str(self.image_base_path / row['image_path']) if row['image_path'] else None
+            }
+            if not self.lazy_description:
+                descriptions[product_id] = self._format_description(row.get('description'))
+
+        if not self.lazy_description:
+            self.descriptions = descriptions
+
+        self.loaded = True
+        print(f"상품 카탈로그 로드 완료: {len(self.products)}개 상품")
+
+    def _load_descriptions(self):
+        """긴 설명 텍스트만 별도로 로드"""
+        self.descriptions = {
+            row['product_id']: self._format_description(row.get('description'))
+            for row in _read_rows(self.products_path)
+        }
+
+    @staticmethod
+    def _format_description(description):
+        """설명 미리보기 문자열 생성"""
+        if description is None:
+            return 'N/A'
+        if len(description) > DESCRIPTION_PREVIEW_LENGTH:
+            return description[:DESCRIPTION_PREVIEW_LENGTH] + '...'
+        return description
+
+    def get(self, product_id):
+        """상품 ID로 상품 정보 조회 (없으면 None)"""
+        if not self.loaded:
+            self.load()
+        return self.products.get(str(product_id))
+
+    def get_description(self, product_id):
+        """상품 ID로 설명 미리보기 조회"""
+        if not self.loaded:
+            self.load()
+        if self.descriptions is None:
+            if not self.products_path.exists():
+                return 'N/A'
+            self._load_descriptions()
+        return self.descriptions.get(str(product_id), 'N/A')
+
+    def __len__(self):
+        return len(self.products)
+
+    def __contains__(self, product_id):
+        return str(product_id) in self.products
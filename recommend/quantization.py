@@ -0,0 +1,74 @@
+"""
+아이템 임베딩 양자화 - float16 / int8(벡터별 스케일) 저장과 근사 점수 계산
+
+근사 점수로 후보를 고른 뒤 float32 원본으로 정확히 재정렬하는 용도.
+NumPy에는 int8/float16 전용 행렬곱이 없어 청크 단위로 float32로 복원해 계산하므로,
+이득은 주로 메모리(상주 바이트 1/2~1/4)에서 나오고 점수 계산 시간은 float32와 비슷하다
+(int8이 float16보다 복원 비용이 훨씬 작다). 단, 메모리 절감은 float32 원본이 메모리에
+상주하지 않을 때(메모리 매핑 아티팩트에서 재정렬 후보 행만 읽을 때)만 생긴다.
+"""
+import numpy as np
+
+QUANTIZATION_MODES = ('float16', 'int8')
+
+# 근사 점수 계산 시 한 번에 float32로 복원하는 행 수 (복원된 청크가 캐시에 머무를 크기)
+SCORE_CHUNK_ROWS = 2048
+
+
+class QuantizedMatrix:
+    """양자화된 아이템 행렬 (items x dim)"""
+
+    def __init__(self, codes, scales, mode):
+        self.codes = codes      # float16 또는 int8 행렬
+        self.scales = scales    # int8: 행별 스케일 (items,), float16: None
+        self.mode = mode
+
+    @classmethod
+    def quantize(cls, matrix, mode='int8', chunk_rows=65536):
+        """float32 행렬 양자화"""
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {mode}")
+
+        num_rows = matrix.shape[0]
+        if mode == 'float16':
+            codes = np.empty(matrix.shape, dtype=np.float16)
+            for start in range(0, num_rows, chunk_rows):
+                codes[start:start + chunk_rows] = matrix[start:start + chunk_rows]
+            codes.flags.writeable = False
+            return cls(codes, None, mode)
+
+        # int8: 행마다 최대 절대값을 127에 맞추는 대칭 양자화
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(num_rows, dtype=np.float32)
+        for start in range(0, num_rows, chunk_rows):
+            chunk = np.asarray(matrix[start:start + chunk_rows], dtype=np.float32)
+            chunk_scales = np.abs(chunk).max(axis=1) / 127.0
+            chunk_scales[chunk_scales == 0] = 1.0
+            codes[start:start + chunk_rows] = np.rint(chunk / chunk_scales[:, None])
+            scales[start:start + chunk_rows] = chunk_scales
+
+        codes.flags.writeable = False
+        scales.flags.writeable = False
+        return cls(codes, scales, mode)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def score(self, queries, chunk_rows=SCORE_CHUNK_ROWS):
+        """근사 점수 (users x items) - 청크 단위로 복원해 행렬곱"""
+        queries = np.asarray(queries, dtype=np.float32)
+        num_rows = self.codes.shape[0]
+        scores = np.empty((queries.shape[0], num_rows), dtype=np.float32)
+
+        for start in range(0, num_rows, chunk_rows):
+            chunk = self.codes[start:start + chunk_rows].astype(np.float32)
+            chunk_scores = chunk @ queries.T
+            if self.scales is not None:
+                chunk_scores *= self.scales[start:start + chunk_rows, None]
+            scores[:, start:start + chunk_rows] = chunk_scores.T
+        return scores
@@ -0,0 +1,345 @@
+"""
+질문 은행 - 심리테스트 질문 CSV를 프로세스당 1회 읽어 로더/계산기/모든 세션이 공유하는 읽기 전용 객체
+
+    bank = get_question_bank()        # 최초 1회 로드 후 같은 객체 반환
+    bank.questions                    # create_question_structure 형식의 질문 목록 (튜플)
+    bank.choice_weights               # {질문 타입: {질문 문장: 선택지별 부호 포함 가중치}}
+    bank.pref_emotions, bank.pref_matrix   # Pref_ emotion → concept 전파 행렬
+    reload_question_bank()            # CSV를 다시 읽어 새 객체로 교체
+
+객체는 만든 뒤 바꾸지 않고 통째로 교체하므로, 이미 받아 둔 객체는 리로드 후에도 그대로 유효하다.
+pandas 없이 표준 csv 모듈로 읽는다 (빈 칸은 None).
+
+파싱/컴파일 결과는 CSV 폴더의 바이너리 캐시(question_bank_cache.pkl)에 저장해 두고,
+원본 CSV의 mtime/크기(다르면 sha256 해시)가 같으면 캐시에서 바로 복원한다.
+"""
+import os
+import csv
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+DEFAULT_BASE_PATH = Path("data/psychology-question")
+
+# 테이블 이름 → CSV 파일 이름
+QUESTION_FILES = {
+    'trait_questions': "trait-question.csv",
+    'concept_questions': "concept-question.csv",
+    'choice_2': "2-choice-question.csv",
+    'choice_4': "4-choice-question.csv",
+    'choice_5': "5-point-question.csv",
+    'choice_ox': "O-X-question.csv",
+    'emotion_concept': "emotion-concept-relation.csv",
+}
+
+# 5-point 응답별 기본 가중치: 1->0.2, 2->0.4, 3->0.6, 4->0.8, 5->1.0
+FIVE_POINT_WEIGHTS = tuple((choice_index + 1) * 0.2 for choice_index in range(5))
+
+# 2-choice / 4-choice / O-X 응답의 가중치 크기 (부호는 pn_response_X)
+CHOICE_WEIGHT = 0.7
+
+# Pref_ 노드가 영향을 주는 concept 열 (emotion-concept-relation.csv)
+PREF_CONCEPT_COLUMNS = (
+    'Texture_Softness', 'Texture_Smoothness', 'Brand',
+    'Color_Brightness', 'Color_Saturation', 'Simple',
+    'Glossiness', 'Color_Temperature'
+)
+
+# Pref_ 가중치가 관련 concept에 더해지는 비율 (최대 0.25)
+PREF_PROPAGATION = 0.25
+
+FIVE_POINT_CHOICES = ("1(매우아님)", "2", "3", "4", "5(매우맞음음)")
+
+# 바이너리 캐시 파일 이름 (CSV 폴더 안) 과 형식 버전 (저장 구조가 바뀌면 올림)
+CACHE_FILE_NAME = "question_bank_cache.pkl"
+CACHE_FORMAT_VERSION = 1
+
+
+def _read_rows(path):
+    """CSV 행을 dict 리스트로 (BOM 제거, 빈 값은 None)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return [{key: (value if value != '' else None) for key, value in row.items()} for row in csv.DictReader(f)]
+
+
+def _first_by_question(rows):
+    """{질문 문장: 첫 행} (같은 질문이 여러 번 있으면 첫 행 사용)"""
+    by_question = {}
+    for row in rows:
+        by_question.setdefault(row['question'], row)
+    return by_question
+
+
+def compile_choice_weights(tables):
+    """질문 CSV → {질문 타입: {질문 문장: 선택지별 부호 포함 가중치 튜플}}"""
+    def signed(relation):
+        return CHOICE_WEIGHT if relation == '+' else -CHOICE_WEIGHT
+
+    five_point = {}
+    for question, row in _first_by_question(tables['choice_5']).items():
+        sign = -1 if row['positive_negative_relation'] == '-' else 1
+        five_point[question] = tuple(sign * weight for weight in FIVE_POINT_WEIGHTS)
+
+    return {
+        '5_point_question': five_point,
+        '2_choice_question': {
+            question: (signed(row['pn_response_1']), signed(row['pn_response_2']))
+            for question, row in _first_by_question(tables['choice_2']).items()
+        },
+        '4_choice_question': {
+            question: tuple(signed(row[f'pn_response_{choice}']) for choice in range(1, 5))
+            for question, row in _first_by_question(tables['choice_4']).items()
+        },
+        'O_X_question': {
+            question: (signed(row['pn_response_1']), signed(row['pn_response_2']))
+            for question, row in _first_by_question(tables['choice_ox']).items()
+        },
+    }
+
+
+def compile_pref_matrix(tables):
+    """emotion-concept-relation.csv → (emotion 이름 목록, (emotion x concept) 부호 포함 전파 행렬)
+
+    Emotion 열이 정확히 '[이름]'인 행만 사용하고, 같은 이름이 여러 번 있으면 첫 행 사용
+    """
+    emotions = []
+    rows = []
+    for row in tables['emotion_concept']:
+        emotion = row['Emotion']
+        if not (isinstance(emotion, str) and emotion.startswith('[') and emotion.endswith(']')):
+            continue
+        if emotion[1:-1] in emotions:
+            continue
+        emotions.append(emotion[1:-1])
+        rows.append([
+            PREF_PROPAGATION if row.get(concept) == '+' else -PREF_PROPAGATION if row.get(concept) == '-' else 0.0
+            for concept in PREF_CONCEPT_COLUMNS
+        ])
+
+    pref_matrix = np.asarray(rows, dtype=np.float64).reshape(len(emotions), len(PREF_CONCEPT_COLUMNS))
+    pref_matrix.flags.writeable = False
+    return tuple(emotions), pref_matrix
+
+
+def build_questions(tables):
+    """trait → concept 순서의 질문 목록 (id, category, question_type, question, target_node, choices)"""
+    choice_2 = _first_by_question(tables['choice_2'])
+    choice_4 = _first_by_question(tables['choice_4'])
+
+    def choices_for(question_type, question):
+        if question_type == "5_point_question":
+            return FIVE_POINT_CHOICES
+        if question_type == "2_choice_question":
+            row = choice_2.get(question)
+            return (row['response_1'], row['response_2']) if row else ("선택지 1", "선택지 2")
+        if question_type == "4_choice_question":
+            row = choice_4.get(question)
+            if row:
+                return tuple(row[f'response_{choice}'] for choice in range(1, 5))
+            return ("선택지 1", "선택지 2", "선택지 3", "선택지 4")
+        if question_type == "O_X_question":
+            return ("O", "X")
+        return ("기본 선택지",)
+
+    questions = []
+    for category, table, node_column in (('trait', 'trait_questions', 'trait_node'),
+                                         ('concept', 'concept_questions', 'concept_node')):
+        for idx, row in enumerate(tables[table]):
+            questions.append({
+                'id': f"{category}_{idx}",
+                'category': category,
+                'question_type': row['question_type'],
+                'question': row['question'],
+                'target_node': row[node_column],
+                'choices': choices_for(row['question_type'], row['question'])
+            })
+    return questions
+
+
+class QuestionBank:
+    """파싱된 질문 CSV와 구조화된 질문 / 채점 표 (읽기 전용)"""
+
+    def __init__(self, tables, questions, choice_weights, pref_emotions, pref_matrix, base_path=DEFAULT_BASE_PATH):
+        self.base_path = Path(base_path)
+        # 테이블 이름 → 행(읽기 전용 dict) 튜플
+        self.tables = MappingProxyType({
+            name: tuple(MappingProxyType(row) for row in rows) for name, rows in tables.items()
+        })
+        self.questions = tuple(MappingProxyType(question) for question in questions)
+        self.question_index = MappingProxyType({question['id']: question for question in self.questions})
+        self.choice_weights = MappingProxyType({
+            question_type: MappingProxyType(table) for question_type, table in choice_weights.items()
+        })
+        self.pref_emotions = tuple(pref_emotions)
+        self.pref_matrix = pref_matrix
+        self.pref_matrix.flags.writeable = False
+        self.pref_index = MappingProxyType({emotion: row for row, emotion in enumerate(self.pref_emotions)})
+
+    @classmethod
+    def from_tables(cls, tables, base_path=DEFAULT_BASE_PATH):
+        """테이블 이름 → 행 dict 리스트에서 구조화된 질문과 채점 표를 만들어 생성"""
+        pref_emotions, pref_matrix = compile_pref_matrix(tables)
+        return cls(
+            tables=tables,
+            questions=build_questions(tables),
+            choice_weights=compile_choice_weights(tables),
+            pref_emotions=pref_emotions,
+            pref_matrix=pref_matrix,
+            base_path=base_path
+        )
+
+    @classmethod
+    def load(cls, base_path=DEFAULT_BASE_PATH, cache_path=CACHE_FILE_NAME):
+        """질문 CSV 7개를 읽어 생성 (cache_path가 유효하면 캐시에서 복원, None이면 캐시 미사용)
+
+        cache_path가 상대 경로면 base_path 기준
+        """
+        base_path = Path(base_path)
+        source_files = [base_path / file_name for file_name in QUESTION_FILES.values()]
+        if cache_path is None:
+            return cls._parse(base_path)
+
+        cache_path = base_path / cache_path
+        signature = _file_signature(source_files)
+        cache = _read_cache(cache_path)
+        if cache is not None:
+            if cache['signature'] == signature:
+                return cls._from_cache(cache, base_path)
+            # mtime만 바뀐 경우 (git checkout 등): 내용 해시가 같으면 서명만 갱신
+            if cache['content_hash'] == _file_hash(source_files):
+                cache['signature'] = signature
+                _write_cache(cache_path, cache)
+                return cls._from_cache(cache, base_path)
+
+        bank = cls._parse(base_path)
+        _write_cache(cache_path, bank._cache_state(signature, _file_hash(source_files)))
+        return bank
+
+    @classmethod
+    def _parse(cls, base_path):
+        tables = {name: _read_rows(base_path / file_name) for name, file_name in QUESTION_FILES.items()}
+        return cls.from_tables(tables, base_path)
+
+    @classmethod
+    def _from_cache(cls, cache, base_path):
+        return cls(
+            tables=cache['tables'],
+            questions=cache['questions'],
+            choice_weights=cache['choice_weights'],
+            pref_emotions=cache['pref_emotions'],
+            pref_matrix=cache['pref_matrix'],
+            base_path=base_path
+        )
+
+    def _cache_state(self, signature, content_hash):
+        """캐시에 저장할 plain dict/tuple 상태 (MappingProxyType은 pickle되지 않음)"""
+        return {
+            'format_version': CACHE_FORMAT_VERSION,
+            'scoring_constants': _scoring_constants(),
+            'signature': signature,
+            'content_hash': content_hash,
+            'tables': {name: [dict(row) for row in rows] for name, rows in self.tables.items()},
+            'questions': [dict(question) for question in self.questions],
+            'choice_weights': {question_type: dict(table) for question_type, table in self.choice_weights.items()},
+            'pref_emotions': self.pref_emotions,
+            'pref_matrix': np.array(self.pref_matrix)
+        }
+
+    def source_files(self):
+        """질문 은행이 읽는 파일 목록"""
+        return [self.base_path / file_name for file_name in QUESTION_FILES.values()]
+
+
+def _scoring_constants():
+    """컴파일된 채점 표에 반영되는 상수 (코드에서 바뀌면 캐시 무효)"""
+    return (FIVE_POINT_WEIGHTS, CHOICE_WEIGHT, PREF_CONCEPT_COLUMNS, PREF_PROPAGATION, FIVE_POINT_CHOICES)
+
+
+def _file_signature(paths):
+    """(파일 이름, mtime_ns, 크기) 튜플 (파일이 없으면 None)"""
+    signature = []
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+            signature.append((Path(path).name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((Path(path).name, None, None))
+    return tuple(signature)
+
+
+def _file_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).name.encode('utf-8'))
+        try:
+            digest.update(Path(path).read_bytes())
+        except FileNotFoundError:
+            digest.update(b'<missing>')
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path):
+    """유효한 캐시 dict (없거나 깨졌거나 버전/상수가 다르면 None)"""
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️  질문 은행 캐시를 읽지 못해 CSV에서 다시 만듭니다: {e}")
+        return None
+
+    if not isinstance(cache, dict) or cache.get('format_version') != CACHE_FORMAT_VERSION:
+        return None
+    if cache.get('scoring_constants') != _scoring_constants():
+        return None
+    return cache
+
+
+def _write_cache(cache_path, state):
+    """임시 파일에 쓴 뒤 교체 (다른 프로세스가 쓰다 만 캐시를 읽지 않도록), 실패해도 로드는 계속"""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️  질문 은행 캐시 저장 실패: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# 프로세스 전역 질문 은행
+_question_bank = None
+_question_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    """프로세스 전역에서 공유하는 질문 은행 (최초 호출 시 1회 로드)"""
+    bank = _question_bank
+    if bank is not None:
+        return bank
+    with _question_bank_lock:
+        if _question_bank is None:
+            _set_question_bank(QuestionBank.load())
+        return _question_bank
+
+
+def reload_question_bank(base_path=DEFAULT_BASE_PATH, cache_path=CACHE_FILE_NAME):
+    """CSV를 다시 읽어 새 질문 은행으로 교체 (이미 받아 둔 객체는 그대로 유효)
+
+    CSV가 바뀌지 않았으면 캐시에서 복원하고, cache_path=None이면 항상 CSV를 파싱
+    """
+    with _question_bank_lock:
+        _set_question_bank(QuestionBank.load(base_path, cache_path))
+        return _question_bank
+
+
+def _set_question_bank(bank):
+    global _question_bank
+    _question_bank = bank
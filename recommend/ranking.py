@@ -0,0 +1,22 @@
+"""
+Top-K 선택 유틸리티
+"""
+import numpy as np
+
+
+def top_k_indices(scores, top_k):
+    """부분 선택(argpartition)으로 상위 k개 인덱스를 점수 내림차순으로 반환 (마지막 축 기준)"""
+    num_items = scores.shape[-1]
+    top_k = min(top_k, num_items)
+    if top_k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    
+    if top_k < num_items:
+        candidates = np.argpartition(-scores, top_k - 1, axis=-1)[..., :top_k]
+    else:
+        candidates = np.broadcast_to(np.arange(num_items), scores.shape).copy()
+    
+    # 후보 k개만 정렬
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=-1)
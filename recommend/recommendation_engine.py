@@ -1,53 +1,370 @@
 """
 추천 엔진 - 그래프에 User 노드 추가 및 추천 생성
 """
+import sys
 import pickle
+import threading
 import numpy as np
-import pandas as pd
+from collections.abc import Mapping
 from pathlib import Path
-from sklearn.metrics.pairwise import cosine_similarity
+
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data.graph_snapshot import GraphSnapshot
+from models.embedding_artifact import is_embedding_artifact, load_embedding_artifact
+from recommend.ann_index import IVFIndex
+from recommend.diversity import DiversityReranker, diversity_key
+from recommend.explanations import ItemExplainer
+from recommend.item_filters import ItemFilterIndex, filter_key
+from recommend.metrics import METRICS, timed
+from recommend.product_catalog import ProductCatalog
+from recommend.quantization import QUANTIZATION_MODES, QuantizedMatrix
+from recommend.ranking import top_k_indices
+from recommend.result_cache import RecommendationCache, quantize_weights
+from recommend.user_store import UserEmbeddingStore
+
+
+# 배치 추천 시 한 번에 만드는 점수 행렬(users x items)의 최대 크기
+BATCH_SCORE_BYTES = 64 * 1024 * 1024
+
+# 임베딩 없이 그래프만으로 점수를 계산하는 방식
+GRAPH_SCORING_MODES = ('propagation', 'pagerank')
+
+# 필터로 허용된 아이템이 이 비율 이하이면 허용된 행만 모아 정확 검색
+FILTER_GATHER_FRACTION = 0.5
+
+
+class _EmbeddingRows(Mapping):
+    """임베딩 행렬을 {노드 ID: 임베딩} 형태로 보여주는 읽기 전용 뷰 (복사 없음)"""
+    
+    def __init__(self, node_to_row, vectors):
+        self._node_to_row = node_to_row
+        self._vectors = vectors
+    
+    def __getitem__(self, node_id):
+        return self._vectors[self._node_to_row[node_id]]
+    
+    def __contains__(self, node_id):
+        return node_id in self._node_to_row
+    
+    def __iter__(self):
+        return iter(self._node_to_row)
+    
+    def __len__(self):
+        return len(self._node_to_row)
+
 
 class RecommendationEngine:
-    def __init__(self):
+    def __init__(self, user_store=None, search='exact', nprobe=8, item_storage='float32', rerank_factor=4,
+                 result_cache=None, cache_results=True, scoring='embedding', hops=2, decay=0.5,
+                 alpha=0.15, tol=1e-6, max_iter=100):
         self.model = None
+        self.model_version = 0
         self.embeddings_path = Path("models/embeddings.pkl")
+        # 메모리 매핑 아티팩트가 있으면 pkl 대신 사용
+        self.embedding_artifact_path = Path("models/embeddings")
         self.graph_path = Path("data/recommendation_graph.pkl")
+        # CSR 스냅샷이 있으면 networkx pkl 대신 사용
+        self.graph_snapshot_path = Path("data/recommendation_graph.npz")
+        self.catalog = ProductCatalog(Path("data/product/products.csv"))
+        
+        # 아이템 검색 방식: 'exact'(전체 정확 검색) 또는 'ivf'(ANN, nprobe로 recall/지연 조절)
+        if search not in ('exact', 'ivf'):
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {search}")
+        self.search = search
+        self.nprobe = nprobe
+        self.ann_index_path = Path("models/embeddings_ivf.npz")
+        
+        # 정확 검색의 1차 점수를 양자화 행렬(float16/int8)로 계산하고 상위 k*rerank_factor개를 float32로 재정렬
+        if item_storage != 'float32' and item_storage not in QUANTIZATION_MODES:
+            raise ValueError(f"지원하지 않는 아이템 저장 방식입니다: {item_storage}")
+        # IVF 검색은 후보를 float32 행렬로 직접 채점하므로 양자화 행렬을 쓰지 않는다
+        if search == 'ivf' and item_storage != 'float32':
+            raise ValueError("search='ivf'는 item_storage='float32'만 지원합니다.")
+        self.item_storage = item_storage
+        self.rerank_factor = rerank_factor
+        
+        # 점수 계산 방식: 'embedding'(Node2Vec 임베딩 유사도), 학습 없이 그래프만 쓰는
+        # 'propagation'(가중치 전파, hops/decay) 또는 'pagerank'(개인화 PageRank, alpha/tol/max_iter)
+        if scoring != 'embedding' and scoring not in GRAPH_SCORING_MODES:
+            raise ValueError(f"지원하지 않는 점수 계산 방식입니다: {scoring}")
+        if scoring in GRAPH_SCORING_MODES and (search != 'exact' or item_storage != 'float32'):
+            raise ValueError("그래프 점수 방식은 search='exact', item_storage='float32'만 지원합니다.")
+        self.scoring = scoring
+        self.hops = hops
+        self.decay = decay
+        self.alpha = alpha
+        self.tol = tol
+        self.max_iter = max_iter
         self.user_id_counter = 2000
+        self._user_id_lock = threading.Lock()
+        # 세션성 User 임베딩은 카탈로그 임베딩과 분리해 크기 제한 저장소에 보관
+        self.user_store = user_store if user_store is not None else UserEmbeddingStore()
+        # 같은(양자화 기준) 가중치의 추천 결과를 재사용하는 캐시, 모델을 다시 로드하면 무효화
+        self.result_cache = result_cache if result_cache is not None else RecommendationCache()
+        self.cache_results = cache_results
         
+    def source_files(self):
+        """load_model이 읽는 파일 목록 (모델 레지스트리의 변경 감지용)"""
+        graph_source = self.graph_snapshot_path if self.graph_snapshot_path.exists() else self.graph_path
+        if self.scoring in GRAPH_SCORING_MODES:
+            return [graph_source, self.catalog.products_path]
+        
+        if is_embedding_artifact(self.embedding_artifact_path):
+            # 아티팩트는 meta.json을 마지막에 교체하므로 이것만 보면 충분
+            embedding_source = self.embedding_artifact_path / "meta.json"
+        else:
+            embedding_source = self.embeddings_path
+        return [embedding_source, graph_source, self.catalog.products_path]
+    
+    @timed('load_model')
     def load_model(self):
         """학습된 모델과 그래프 로드"""
         print("모델 로딩 중...")
         
         try:
-            # 임베딩 로드
-            with open(self.embeddings_path, 'rb') as f:
-                embedding_data = pickle.load(f)
+            if self.scoring in GRAPH_SCORING_MODES:
+                self._load_graph_scoring_model()
+            else:
+                self._load_embedding_model()
             
-            # 그래프 로드
-            with open(self.graph_path, 'rb') as f:
-                graph_data = pickle.load(f)
+            # 상품 카탈로그도 함께 1회 로드하고, 아이템 순서에 맞춘 필터 인덱스 생성
+            self.catalog.load()
+            self.model['item_filters'] = ItemFilterIndex.build(
+                self.model['item_ids'], self.model['id_to_product'], self.catalog
+            )
+            # 다양성 재정렬용 아이템 유사도와 카테고리 코드
+            self.model['diversity'] = DiversityReranker(
+                self._diversity_vectors(), self.model['item_filters'].category_codes
+            )
+            # 추천 이유용 (아이템 x trait/concept) 엣지 가중치 행렬
+            self.model['explainer'] = ItemExplainer.build(self.model['graph'], self.model['item_ids'])
             
-            self.model = {
-                'graph': graph_data['graph'],
-                'node_types': graph_data.get('node_types', {}),
-                'node_id_mapping': graph_data.get('node_id_mapping', {}),
-                'node_embeddings': embedding_data.get('embeddings', {}),
-                'embedding_dim': len(list(embedding_data.get('embeddings', {}).values())[0]) if embedding_data.get('embeddings') else 128
-            }
+            # 이전 모델로 계산한 추천 결과는 더 이상 유효하지 않음
+            self.model_version += 1
+            self.result_cache.invalidate(self.model_version)
             
-            print(f"모델 로드 완료: {len(self.model['node_embeddings'])}개 노드 임베딩")
+            if self.scoring in GRAPH_SCORING_MODES:
+                print(f"모델 로드 완료: 그래프 점수 {self.scoring} ({len(self.model['item_ids'])}개 아이템)")
+            else:
+                print(f"모델 로드 완료: {len(self.model['node_embeddings'])}개 노드 임베딩")
             
         except Exception as e:
             print(f"모델 로드 실패: {e}")
             raise e
+    
+    def _load_embedding_model(self):
+        """임베딩 모드: 임베딩 + 그래프 로드 후 아이템/가중치 행렬 구성"""
+        # 임베딩 로드 (노드 ID 목록 + 읽기 전용 행렬)
+        node_ids, node_vectors, item_block = self._load_embeddings()
+        
+        # 그래프 로드
+        graph_data = self._load_graph()
+        
+        node_to_row = {node_id: row for row, node_id in enumerate(node_ids)}
+        
+        self.model = {
+            'graph': graph_data['graph'],
+            'node_types': graph_data.get('node_types', {}),
+            'node_id_mapping': graph_data.get('node_id_mapping', {}),
+            'node_ids': node_ids,
+            'node_vectors': node_vectors,
+            'node_embeddings': _EmbeddingRows(node_to_row, node_vectors),
+            'embedding_dim': node_vectors.shape[1] if node_ids else 128
+        }
+        self._build_lookup_indexes()
+        self._build_item_matrix(item_block)
+        self._build_weight_matrix()
+        if self.search == 'ivf':
+            self._load_ann_index()
+        if self.item_storage != 'float32':
+            self.model['item_codes'] = QuantizedMatrix.quantize(self.model['item_matrix'], self.item_storage)
+    
+    def _load_graph_scoring_model(self):
+        """그래프 점수 모드: 그래프만 로드해 전파 행렬 또는 PageRank 전이 행렬 구성 (임베딩 불필요)"""
+        # scipy는 그래프 점수 모드에서만 필요하므로 여기서 import
+        from recommend.graph_propagation import GraphPropagationScorer
+        from recommend.pagerank import PersonalizedPageRank
+        
+        graph_data = self._load_graph()
+        # 전파/PageRank/다양성 벡터가 같은 CSR 스냅샷을 공유하도록 한 번만 변환
+        graph = GraphSnapshot.ensure(graph_data['graph'])
+        self.model = {
+            'graph': graph,
+            'node_types': graph_data.get('node_types', {}),
+            'node_id_mapping': graph_data.get('node_id_mapping', {})
+        }
+        self._build_lookup_indexes()
+        
+        item_ids = list(self.model['node_types'].get('item', []))
+        if self.scoring == 'pagerank':
+            scorer = PersonalizedPageRank.build(graph, item_ids, alpha=self.alpha, tol=self.tol,
+                                                max_iter=self.max_iter)
+        else:
+            scorer = GraphPropagationScorer.build(graph, item_ids, hops=self.hops, decay=self.decay)
         
+        self.model['item_ids'] = item_ids
+        self.model['item_names'] = [graph.nodes[item_id].get('name', f'item_{item_id}') for item_id in item_ids]
+        self.model['graph_scorer'] = scorer
+        # 캐시 키/행렬 입력은 시작 노드(trait/concept) 순서를 사용
+        self.model['weight_index'] = scorer.source_index
+        
+    def _diversity_vectors(self):
+        """다양성 재정렬의 아이템 간 유사도에 쓸 (items x dim) L2 정규화 벡터
+        
+        임베딩 모드는 아이템 행렬을 그대로 쓰고, 그래프 점수 모드는 아이템의
+        trait/concept 엣지 가중치 행(시작 노드 순서)을 벡터로 쓴다.
+        """
+        if self.scoring not in GRAPH_SCORING_MODES:
+            return self.model['item_matrix']
+        
+        name_to_id = self.model['name_to_id']
+        source_ids = [name_to_id[name] for name in self.model['graph_scorer'].source_names]
+        vectors = self.model['graph'].adjacency_block(self.model['item_ids'], source_ids)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _build_lookup_indexes(self):
+        """이름/ID/상품 조회용 해시 인덱스 구성 (로드 시 1회)"""
+        name_to_id = {}
+        id_to_type = {}
+        id_to_product = {}
+        
+        for name, data in self.model['node_id_mapping'].items():
+            node_id = data['id']
+            node_type = data.get('type')
+            name_to_id[name] = node_id
+            id_to_type[node_id] = node_type
+            # item 노드의 이름은 상품 ID
+            if node_type == 'item':
+                id_to_product[node_id] = name
+        
+        self.model['name_to_id'] = name_to_id
+        self.model['id_to_type'] = id_to_type
+        self.model['id_to_product'] = id_to_product
+    
+    def _load_embeddings(self):
+        """임베딩 로드: 아티팩트는 메모리 매핑, 없으면 embeddings.pkl
+        
+        반환값: (노드 ID 리스트, nodes x dim 행렬, (아이템 ID, 정규화 아이템 행렬) 또는 None)
+        """
+        if is_embedding_artifact(self.embedding_artifact_path):
+            artifact = load_embedding_artifact(self.embedding_artifact_path, mmap=True)
+            item_block = None
+            if artifact.item_vectors is not None:
+                item_block = (artifact.item_ids.tolist(), artifact.item_vectors)
+            print(f"임베딩 아티팩트 매핑: {self.embedding_artifact_path}")
+            return artifact.node_ids.tolist(), artifact.vectors, item_block
+        
+        with open(self.embeddings_path, 'rb') as f:
+            embedding_data = pickle.load(f)
+        
+        embeddings = embedding_data.get('embeddings', {})
+        node_ids = list(embeddings.keys())
+        if node_ids:
+            node_vectors = np.vstack([embeddings[node_id] for node_id in node_ids]).astype(np.float32)
+        else:
+            node_vectors = np.zeros((0, 128), dtype=np.float32)
+        
+        # 카탈로그 임베딩은 읽기 전용
+        node_vectors.flags.writeable = False
+        return node_ids, node_vectors, None
+    
+    def _load_graph(self):
+        """그래프 로드: CSR 스냅샷이 있으면 사용, 없으면 networkx pkl"""
+        if self.graph_snapshot_path.exists():
+            snapshot = GraphSnapshot.load(self.graph_snapshot_path)
+            return {
+                'graph': snapshot,
+                'node_types': snapshot.node_types(),
+                'node_id_mapping': snapshot.node_id_mapping()
+            }
+        
+        with open(self.graph_path, 'rb') as f:
+            return pickle.load(f)
+    
+    def _build_item_matrix(self, item_block=None):
+        """아이템 임베딩을 L2 정규화된 연속 float32 행렬로 구성 (로드 시 1회)"""
+        node_embeddings = self.model['node_embeddings']
+        graph = self.model['graph']
+        
+        item_ids = [item_id for item_id in self.model['node_types'].get('item', [])
+                    if item_id in node_embeddings]
+        
+        if item_block is not None and item_block[0] == item_ids:
+            # 아티팩트에 미리 정규화된 아이템 행렬이 있으면 매핑된 그대로 사용
+            item_matrix = item_block[1]
+        else:
+            if item_ids:
+                item_matrix = np.vstack([node_embeddings[item_id] for item_id in item_ids]).astype(np.float32)
+            else:
+                item_matrix = np.zeros((0, self.model['embedding_dim']), dtype=np.float32)
+            
+            # 미리 정규화해 두면 코사인 유사도 = 내적
+            norms = np.linalg.norm(item_matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            item_matrix /= norms
+            item_matrix = np.ascontiguousarray(item_matrix)
+            item_matrix.flags.writeable = False
+        
+        self.model['item_ids'] = item_ids
+        self.model['item_names'] = [graph.nodes[item_id].get('name', f'item_{item_id}') for item_id in item_ids]
+        self.model['item_matrix'] = item_matrix
+    
+    def _build_weight_matrix(self):
+        """가중치를 줄 수 있는 노드(이름)별 임베딩 행렬 구성 (배치 User 임베딩용)"""
+        node_ids = self.model['node_ids']
+        node_vectors = self.model['node_vectors']
+        id_to_name = {node_id: name for name, node_id in self.model['name_to_id'].items()}
+        
+        # 임베딩 행 순서대로 이름을 붙여, 모든 행에 이름이 있으면 행렬을 복사 없이 그대로 사용
+        rows = [row for row, node_id in enumerate(node_ids) if node_id in id_to_name]
+        weight_names = [id_to_name[node_ids[row]] for row in rows]
+        
+        if len(rows) == len(node_ids):
+            weight_matrix = node_vectors
+        else:
+            weight_matrix = np.ascontiguousarray(node_vectors[rows])
+            weight_matrix.flags.writeable = False
+        
+        self.model['weight_names'] = weight_names
+        self.model['weight_index'] = {name: idx for idx, name in enumerate(weight_names)}
+        self.model['weight_matrix'] = weight_matrix
+    
+    def _load_ann_index(self):
+        """저장된 IVF 인덱스 로드 (없거나 아이템 구성이 다르면 메모리에서 새로 생성)"""
+        item_ids = self.model['item_ids']
+        
+        index = None
+        if self.ann_index_path.exists():
+            index = IVFIndex.load(self.ann_index_path)
+            if not index.matches(item_ids):
+                print(f"ANN 인덱스가 현재 아이템과 맞지 않아 다시 생성합니다: {self.ann_index_path}")
+                index = None
+        
+        if index is None:
+            index = IVFIndex.build(self.model['item_matrix'], item_ids)
+        
+        self.model['ann_index'] = index
+    
+    @timed('add_user_node')
     def add_user_node(self, user_weights):
         """User 노드를 그래프에 추가하고 임베딩 생성"""
         if self.model is None:
             self.load_model()
         
-        user_id = self.user_id_counter
-        self.user_id_counter += 1
+        # 여러 세션/스레드가 엔진을 공유하므로 ID 발급은 잠금 안에서
+        with self._user_id_lock:
+            user_id = self.user_id_counter
+            self.user_id_counter += 1
+        
+        if self.scoring in GRAPH_SCORING_MODES:
+            # 그래프 점수 모드는 임베딩 대신 정규화된 시작 노드 가중치 벡터를 보관
+            self.user_store.put(user_id, self.model['graph_scorer'].user_vectors([user_weights])[0])
+            print(f"User 노드 추가 완료: {user_id}")
+            return user_id
         
         # 그래프에 User 노드 추가 (임시로 추가하지 않고 임베딩만 생성)
         user_edges = []
@@ -59,24 +376,19 @@ class RecommendationEngine:
         
         # User 임베딩 생성 (연결된 노드들의 가중평균)
         user_embedding = self._generate_user_embedding(user_edges)
-        self.model['node_embeddings'][user_id] = user_embedding
+        self.user_store.put(user_id, user_embedding)
         
         print(f"User 노드 추가 완료: {user_id}, 연결된 노드: {len(user_edges)}개")
         return user_id
     
     def _get_node_id_by_name(self, node_name):
         """노드 이름으로 ID 찾기"""
-        for name, data in self.model['node_id_mapping'].items():
-            if name == node_name:
-                return data['id']
-        return None
+        return self.model['name_to_id'].get(node_name)
     
     def _is_trait_node(self, node_name):
         """Trait 노드인지 확인"""
-        trait_nodes = ['Openness', 'Conscientiousness', 'Extraversion', 'Agreeableness', 'Neuroticism',
-                      'Elegant', 'Cute', 'Modern', 'Luxurious', 'Warm', 'Vivid', 'Sharp',
-                      'OSL', 'CNFU', 'MVS', 'CVPA']
-        return node_name in trait_nodes
+        node_id = self.model['name_to_id'].get(node_name)
+        return self.model['id_to_type'].get(node_id) == 'trait'
     
     def _generate_user_embedding(self, user_edges):
         """User 임베딩 생성 (연결된 노드들의 가중평균)"""
@@ -98,73 +410,365 @@ class RecommendationEngine:
         
         return user_embedding
     
-    def get_recommendations(self, user_id, top_k=10):
-        """User에게 아이템 추천"""
-        if user_id not in self.model['node_embeddings']:
+    @timed('get_recommendations')
+    def get_recommendations(self, user_id, top_k=10, filters=None, diversity=None):
+        """User에게 아이템 추천
+        
+        filters: 가격/카테고리/테마/제외 조건 (item_filters.py 참고)
+        diversity: MMR/카테고리 할당량 재정렬 옵션 (diversity.py 참고)
+        """
+        mask = self._item_mask(filters)
+        diversity = diversity_key(diversity)
+        user_embedding = self.user_store.get(user_id)
+        if user_embedding is None:
             raise ValueError(f"User {user_id}의 임베딩이 없습니다.")
         
-        user_embedding = self.model['node_embeddings'][user_id]
-        
-        # 아이템 노드들과 유사도 계산
-        item_similarities = []
-        for item_id in self.model['node_types'].get('item', []):
-            if item_id in self.model['node_embeddings']:
-                item_embedding = self.model['node_embeddings'][item_id]
-                similarity = cosine_similarity(
-                    user_embedding.reshape(1, -1),
-                    item_embedding.reshape(1, -1)
-                )[0][0]
-                
-                item_data = self.model['graph'].nodes[item_id]
-                item_similarities.append({
-                    'item_id': item_id,
-                    'item_name': item_data.get('name', f'item_{item_id}'),
-                    'similarity': similarity
-                })
+        pool_k = self._pool_size(top_k, diversity)
+        if self.scoring in GRAPH_SCORING_MODES:
+            scores = self.model['graph_scorer'].score(user_embedding[None, :])
+            top_indices, top_scores = self._top_items(scores, pool_k, mask)
+        else:
+            user_norm = np.linalg.norm(user_embedding)
+            if user_norm > 0:
+                user_embedding = user_embedding / user_norm
+            top_indices, top_scores = self._search_items(user_embedding[None, :], pool_k, mask)
+        
+        top_indices, top_scores = self._rerank(top_indices, top_scores, top_k, diversity)
+        return self._format_recommendations(top_indices[0], top_scores[0])
+    
+    @timed('recommend')
+    def recommend(self, user_weights, top_k=10, filters=None, diversity=None):
+        """가중치 dict로 바로 추천 (결과 캐시 → add_user_node/get_recommendations)"""
+        if self.model is None:
+            self.load_model()
+        
+        options_key = (filter_key(filters), diversity_key(diversity))
+        key = self._cache_key(user_weights, options_key) if self.cache_results else None
+        if key is not None:
+            cached = self.result_cache.get(key, top_k)
+            if cached is not None:
+                METRICS.increment('recommend_cache_hits')
+                return cached
+        
+        METRICS.increment('recommend_computed')
+        user_id = self.add_user_node(user_weights)
+        recommendations = self.get_recommendations(user_id, top_k=top_k, filters=filters, diversity=diversity)
+        # 결과만 필요하므로 임시 User 임베딩은 바로 정리
+        self.user_store.discard(user_id)
+        
+        if key is not None:
+            self.result_cache.put(key, top_k, recommendations)
+        return recommendations
+    
+    def _cache_key(self, user_weights, options_key=None):
+        """모델에 있는 노드의 가중치만 정규화·양자화한 캐시 키 (연결 노드가 없으면 None)
+        
+        options_key: (필터 키, 다양성 키)처럼 결과에 영향을 주는 요청 옵션
+        """
+        weight_index = self.model['weight_index']
+        weight_rows, weights = [], []
+        for node_name, weight in user_weights.items():
+            weight_row = weight_index.get(node_name)
+            if weight_row is not None:
+                weight_rows.append(weight_row)
+                weights.append(weight)
+        # 가중치 전파는 부호가 점수에 반영되므로 부호까지 키에 포함 (임베딩/PageRank는 절대값 사용)
+        weights_key = quantize_weights(weight_rows, weights, signed=self.scoring == 'propagation')
+        return None if weights_key is None else (weights_key, options_key)
+    
+    def _item_mask(self, filters):
+        """필터 dict → 아이템 행렬 행 순서의 bool 마스크 (필터가 없으면 None)"""
+        if self.model is None:
+            self.load_model()
+        return self.model['item_filters'].mask(filters) if filters else None
+    
+    def _search_items(self, user_embeddings, top_k, mask=None):
+        """정규화된 User 임베딩 행렬로 상위 k개 아이템 검색 → (users x k 행 번호, 점수)
+        
+        mask가 있으면 허용된 아이템 안에서만 Top-K를 고른다 (선택 후 걸러내지 않음)
+        """
+        item_matrix = self.model['item_matrix']
+        
+        num_allowed = item_matrix.shape[0]
+        if mask is not None:
+            allowed_rows = np.flatnonzero(mask)
+            num_allowed = len(allowed_rows)
+            top_k = min(top_k, num_allowed)
+            
+            # 허용된 아이템이 적으면 그 행만 모아 점수를 계산하는 쪽이 가장 싸다
+            if num_allowed <= item_matrix.shape[0] * FILTER_GATHER_FRACTION:
+                scores = user_embeddings @ item_matrix[allowed_rows].T
+                top_indices = top_k_indices(scores, top_k)
+                return allowed_rows[top_indices], np.take_along_axis(scores, top_indices, axis=1)
+        
+        if self.search == 'ivf':
+            return self.model['ann_index'].search_batch(item_matrix, user_embeddings, top_k, self.nprobe, mask)
+        
+        item_codes = self.model.get('item_codes')
+        if item_codes is not None:
+            # 1차: 양자화 행렬로 근사 점수를 내 후보 k*rerank_factor개 선택
+            approx_scores = item_codes.score(user_embeddings)
+            if mask is not None:
+                approx_scores[:, ~mask] = -np.inf
+            candidates = top_k_indices(approx_scores, min(top_k * self.rerank_factor, num_allowed))
+            
+            # 2차: 후보만 float32 원본으로 정확히 계산해 재정렬
+            exact_scores = np.einsum('ucd,ud->uc', item_matrix[candidates], user_embeddings)
+            order = top_k_indices(exact_scores, top_k)
+            return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(exact_scores, order, axis=1)
+        
+        # 아이템 전체와의 코사인 유사도를 행렬곱 한 번으로 계산하고 부분 선택으로 상위 k개만 추출
+        return self._top_items(user_embeddings @ item_matrix.T, top_k, mask)
+    
+    def _pool_size(self, top_k, diversity):
+        """다양성 재정렬을 하면 top_k보다 넓은 후보 풀을 먼저 검색"""
+        return top_k if diversity is None else max(top_k, diversity[2])
+    
+    def _rerank(self, top_indices, top_scores, top_k, diversity):
+        """후보 풀(users x pool)을 MMR/카테고리 할당량으로 재선택 (옵션이 없으면 그대로)"""
+        if diversity is None:
+            return top_indices, top_scores
+        mmr_lambda, max_per_category, _ = diversity
+        return self.model['diversity'].rerank(top_indices, top_scores, top_k, mmr_lambda, max_per_category)
+    
+    def _top_items(self, scores, top_k, mask=None):
+        """(users x items) 점수에서 허용된 아이템만 상위 k개 → (행 번호, 점수)"""
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+            top_k = min(top_k, int(mask.sum()))
+        top_indices = top_k_indices(scores, top_k)
+        return top_indices, np.take_along_axis(scores, top_indices, axis=1)
+    
+    def _format_recommendations(self, top_indices, top_scores):
+        """행 번호/점수를 추천 결과 dict 리스트로 변환"""
+        item_ids = self.model['item_ids']
+        item_names = self.model['item_names']
+        return [
+            {
+                'item_id': item_ids[idx],
+                'item_name': item_names[idx],
+                'similarity': score
+            }
+            for idx, score in zip(top_indices.tolist(), top_scores.tolist())
+            if idx >= 0
+        ]
+    
+    def _to_weight_array(self, user_weights, node_names=None):
+        """User 가중치 dict 리스트 또는 (users x nodes) 행렬을 절대값 가중치 행렬로 변환
+        
+        반환값: (users x 사용된 노드 수 가중치 행렬, 각 열의 weight_matrix 행 번호)
+        """
+        weight_index = self.model['weight_index']
+        
+        if node_names is not None:
+            # 행렬 입력: 모델에 있는 노드 열만 골라 사용
+            matrix = np.asarray(user_weights, dtype=np.float32)
+            if matrix.ndim != 2 or matrix.shape[1] != len(node_names):
+                raise ValueError(f"가중치 행렬 크기 {matrix.shape}가 노드 수 {len(node_names)}와 맞지 않습니다.")
+            
+            src_cols = [col for col, name in enumerate(node_names) if name in weight_index]
+            weight_rows = np.asarray([weight_index[node_names[col]] for col in src_cols], dtype=np.intp)
+            return np.abs(matrix[:, src_cols]), weight_rows
+        
+        # dict 입력: 한 명이라도 사용한 노드만 열로 만든다 (노드 수가 많아도 행렬이 작게 유지됨)
+        used_columns = {}
+        rows, cols, values = [], [], []
+        for row, weight_dict in enumerate(user_weights):
+            for node_name, weight in weight_dict.items():
+                weight_row = weight_index.get(node_name)
+                if weight_row is not None:
+                    rows.append(row)
+                    cols.append(used_columns.setdefault(weight_row, len(used_columns)))
+                    values.append(abs(weight))
         
-        # 유사도 기준 정렬
-        item_similarities.sort(key=lambda x: x['similarity'], reverse=True)
-        return item_similarities[:top_k]
+        weights = np.zeros((len(user_weights), len(used_columns)), dtype=np.float32)
+        weights[rows, cols] = values
+        return weights, np.fromiter(used_columns, dtype=np.intp, count=len(used_columns))
     
+    def _generate_user_embeddings(self, weights, weight_rows):
+        """절대값 가중치 행렬로 User 임베딩 행렬 생성 (행마다 연결 노드 가중평균)"""
+        user_embeddings = weights @ self.model['weight_matrix'][weight_rows]
+        total_weights = weights.sum(axis=1)
+        
+        connected = total_weights > 0
+        user_embeddings[connected] /= total_weights[connected, None]
+        
+        # 연결된 노드가 없는 User는 단건 경로와 동일하게 랜덤 임베딩
+        num_unconnected = int((~connected).sum())
+        if num_unconnected:
+            user_embeddings[~connected] = np.random.normal(
+                0, 0.1, (num_unconnected, self.model['embedding_dim'])
+            )
+        return user_embeddings
+    
+    @timed('get_batch_recommendations')
+    def get_batch_recommendations(self, user_weights, top_k=10, node_names=None, chunk_size=None, filters=None,
+                                  diversity=None):
+        """여러 User의 가중치를 한 번에 받아 User별 상위 k개 아이템 추천
+        
+        user_weights: 가중치 dict 리스트, 또는 node_names 열 순서의 (users x nodes) 행렬
+        chunk_size: 한 번에 점수를 계산할 User 수 (기본값은 BATCH_SCORE_BYTES 기준)
+        filters: 모든 User에게 공통으로 적용할 필터 dict
+        diversity: 모든 User에게 공통으로 적용할 다양성 재정렬 옵션 dict
+        """
+        if self.model is None:
+            self.load_model()
+        
+        METRICS.increment('batch_users', len(user_weights))
+        diversity = diversity_key(diversity)
+        options_key = (filter_key(filters), diversity)
+        mask = self._item_mask(filters)
+        if node_names is None and self.cache_results:
+            return self._cached_batch_recommendations(user_weights, top_k, chunk_size, mask, diversity, options_key)
+        return self._compute_batch_recommendations(user_weights, top_k, node_names, chunk_size, mask, diversity)
+    
+    def _cached_batch_recommendations(self, user_weights, top_k, chunk_size, mask=None, diversity=None,
+                                      options_key=None):
+        """캐시에 있는 User는 바로 응답하고, 나머지는 같은 키끼리 한 번만 계산"""
+        results = [None] * len(user_weights)
+        pending = {}       # 키 -> 같은 키를 가진 행 번호들
+        uncached_rows = []  # 연결된 노드가 없어 캐시하지 않는 행
+        
+        for row, weight_dict in enumerate(user_weights):
+            key = self._cache_key(weight_dict, options_key)
+            if key is None:
+                uncached_rows.append(row)
+            elif key in pending:
+                pending[key].append(row)
+            else:
+                cached = self.result_cache.get(key, top_k)
+                if cached is None:
+                    pending[key] = [row]
+                else:
+                    results[row] = cached
+        
+        compute_rows = [rows[0] for rows in pending.values()] + uncached_rows
+        if compute_rows:
+            computed = self._compute_batch_recommendations(
+                [user_weights[row] for row in compute_rows], top_k, None, chunk_size, mask, diversity
+            )
+            for (key, rows), recommendations in zip(pending.items(), computed):
+                self.result_cache.put(key, top_k, recommendations)
+                results[rows[0]] = recommendations
+                for row in rows[1:]:
+                    results[row] = [dict(rec) for rec in recommendations]
+            for row, recommendations in zip(uncached_rows, computed[len(pending):]):
+                results[row] = recommendations
+        
+        return results
+    
+    def _compute_batch_recommendations(self, user_weights, top_k, node_names, chunk_size, mask=None,
+                                       diversity=None):
+        """가중치 → User 임베딩 행렬 → 청크 단위 검색 (캐시 없이)"""
+        if self.scoring in GRAPH_SCORING_MODES:
+            return self._compute_graph_recommendations(user_weights, top_k, node_names, chunk_size, mask,
+                                                       diversity)
+        
+        weights, weight_rows = self._to_weight_array(user_weights, node_names)
+        num_users = weights.shape[0]
+        
+        item_matrix = self.model['item_matrix']
+        if chunk_size is None:
+            chunk_size = max(1, BATCH_SCORE_BYTES // (4 * max(1, item_matrix.shape[0])))
+        
+        results = []
+        for start in range(0, num_users, chunk_size):
+            user_embeddings = self._generate_user_embeddings(weights[start:start + chunk_size], weight_rows)
+            
+            norms = np.linalg.norm(user_embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            user_embeddings /= norms
+            
+            # 청크 단위로 (chunk x dim) @ (dim x items) 검색
+            top_indices, top_scores = self._search_items(user_embeddings, self._pool_size(top_k, diversity), mask)
+            top_indices, top_scores = self._rerank(top_indices, top_scores, top_k, diversity)
+            for row_indices, row_scores in zip(top_indices, top_scores):
+                results.append(self._format_recommendations(row_indices, row_scores))
+        
+        return results
+    
+    def _compute_graph_recommendations(self, user_weights, top_k, node_names, chunk_size, mask=None,
+                                       diversity=None):
+        """그래프 점수 모드 배치 추천: (users x sources) 시작 벡터를 한 번에 점수 계산"""
+        scorer = self.model['graph_scorer']
+        
+        if node_names is None:
+            user_vectors = scorer.user_vectors(user_weights)
+        else:
+            matrix = np.asarray(user_weights, dtype=np.float32)
+            if matrix.ndim != 2 or matrix.shape[1] != len(node_names):
+                raise ValueError(f"가중치 행렬 크기 {matrix.shape}가 노드 수 {len(node_names)}와 맞지 않습니다.")
+            src_cols = [col for col, name in enumerate(node_names) if name in scorer.source_index]
+            user_vectors = np.zeros((matrix.shape[0], len(scorer.source_names)), dtype=np.float32)
+            user_vectors[:, [scorer.source_index[node_names[col]] for col in src_cols]] = matrix[:, src_cols]
+            user_vectors = scorer.normalize(user_vectors)
+        
+        if chunk_size is None:
+            chunk_size = max(1, BATCH_SCORE_BYTES // (4 * max(1, len(self.model['item_ids']))))
+        
+        results = []
+        for start in range(0, user_vectors.shape[0], chunk_size):
+            scores = scorer.score(user_vectors[start:start + chunk_size])
+            top_indices, top_scores = self._top_items(scores, self._pool_size(top_k, diversity), mask)
+            top_indices, top_scores = self._rerank(top_indices, top_scores, top_k, diversity)
+            for row_indices, row_scores in zip(top_indices, top_scores):
+                results.append(self._format_recommendations(row_indices, row_scores))
+        
+        return results
+    
+    def explain_recommendations(self, user_weights, recommendations, top_n=3):
+        """추천 결과에 아이템별 추천 이유(기여도 상위 trait/concept) 'reasons' 추가
+        
+        기여도 = User 가중치 x 아이템-특성 엣지 가중치, Top-K 전체를 한 번에 계산
+        """
+        return self.explain_batch_recommendations([user_weights], [recommendations], top_n)[0]
+    
+    @timed('explain_batch_recommendations')
+    def explain_batch_recommendations(self, user_weights, recommendations, top_n=3):
+        """여러 User의 추천 결과에 추천 이유 추가 (user_weights와 recommendations는 같은 순서)"""
+        if self.model is None:
+            self.load_model()
+        # 가중치 전파는 부호를 점수에 반영하므로 기여도도 부호 유지
+        return self.model['explainer'].explain_recommendations(
+            user_weights, recommendations, top_n, signed=self.scoring == 'propagation'
+        )
+    
+    @timed('get_item_details')
     def get_item_details(self, recommendations):
         """추천 아이템의 상세 정보 추가"""
         try:
-            # products.csv에서 상품 정보 로드
-            products_csv_path = Path("data/product/products.csv")
-            if products_csv_path.exists():
-                products_df = pd.read_csv(products_csv_path)
+            if not self.catalog.loaded:
+                self.catalog.load()
+            
+            for rec in recommendations:
+                node_id = rec['item_id']  # 이것은 노드 ID (1000번대)
+                
+                # 노드 ID → 상품 ID 매핑
+                product_id = self._get_product_id_by_node_id(node_id)
                 
-                for rec in recommendations:
-                    node_id = rec['item_id']  # 이것은 노드 ID (1000번대)
-                    
-                    # 노드 ID → 상품 ID 매핑
-                    product_id = self._get_product_id_by_node_id(node_id)
-                    
-                    if product_id:
-                        # 상품 ID → 상품 정보 매핑
-                        product_row = products_df[products_df['product_id'].astype(str) == str(product_id)]
-                        if not product_row.empty:
-                            row = product_row.iloc[0]
-                            rec['product_id'] = product_id
-                            rec['name'] = row.get('name', rec['item_name'])
-                            rec['price'] = f"{row.get('price', 0):,}원" if pd.notna(row.get('price')) else 'N/A'
-                            rec['category'] = row.get('category', 'N/A')
-                            rec['description'] = row.get('description', 'N/A')[:200] + '...' if pd.notna(row.get('description')) and len(str(row.get('description'))) > 200 else row.get('description', 'N/A')
-                            rec['image_path'] = f"data/product/{row.get('image_path', '')}" if pd.notna(row.get('image_path')) else None
-                        else:
-                            rec['product_id'] = product_id
-                            rec['name'] = f'상품 {product_id}'
-                            rec['price'] = 'N/A'
-                            rec['category'] = 'N/A'
-                            rec['description'] = 'N/A'
-                            rec['image_path'] = None
+                if product_id:
+                    # 상품 ID → 상품 정보 (해시 조회)
+                    product = self.catalog.get(product_id)
+                    rec['product_id'] = product_id
+                    if product:
+                        rec['name'] = product['name'] or rec['item_name']
+                        rec['price'] = product['price_display']
+                        rec['category'] = product['category']
+                        rec['description'] = self.catalog.get_description(product_id)
+                        rec['image_path'] = product['image_path']
                     else:
-                        rec['product_id'] = None
-                        rec['name'] = f'노드 {node_id}'
+                        rec['name'] = f'상품 {product_id}'
                         rec['price'] = 'N/A'
                         rec['category'] = 'N/A'
                         rec['description'] = 'N/A'
                         rec['image_path'] = None
+                else:
+                    rec['product_id'] = None
+                    rec['name'] = f'노드 {node_id}'
+                    rec['price'] = 'N/A'
+                    rec['category'] = 'N/A'
+                    rec['description'] = 'N/A'
+                    rec['image_path'] = None
         except Exception as e:
             print(f"상품 정보 로드 실패: {e}")
         
@@ -172,10 +776,7 @@ class RecommendationEngine:
     
     def _get_product_id_by_node_id(self, node_id):
         """노드 ID로 실제 상품 ID 찾기"""
-        for product_id, data in self.model['node_id_mapping'].items():
-            if data.get('id') == node_id:
-                return product_id
-        return None
+        return self.model['id_to_product'].get(node_id)
 
 # 테스트 코드
 if __name__ == "__main__":
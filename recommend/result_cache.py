@@ -0,0 +1,105 @@
+"""
+추천 결과 캐시 - 양자화된 User 가중치 벡터를 키로 추천 결과를 LRU로 보관
+
+설문 답변은 몇 가지 고정 단계(±0.2~1.0, ±0.7 등)의 가중치만 만들기 때문에
+같은(또는 거의 같은) 가중치 dict가 자주 반복된다.
+"""
+import math
+import threading
+from collections import OrderedDict
+
+
+def quantize_weights(weight_rows, weights, quantum=1e-3, signed=False):
+    """(노드 행 번호, 가중치)를 정규화·양자화한 정렬 튜플 (캐시 키)
+
+    User 임베딩은 절대값 가중치의 가중평균이라 전체 배율에 무관하므로
+    절대값 합이 1이 되도록 나눈 뒤 quantum 단위로 반올림한다.
+    signed=True면 부호를 유지한다 (그래프 전파처럼 부호가 점수에 반영되는 경우).
+    연결된 노드가 없거나(랜덤 임베딩이라 캐시하면 안 됨) NaN/inf 가중치가 있으면 None (캐시 없이 계산).
+    """
+    # User 한 명의 가중치는 수십 개 이하라 numpy 배열보다 순수 파이썬이 빠르다
+    weights = [float(weight) if signed else abs(float(weight)) for weight in weights]
+    if not all(math.isfinite(weight) for weight in weights):
+        return None
+    total = sum(abs(weight) for weight in weights)
+    if total <= 0:
+        return None
+
+    scale = 1.0 / (total * quantum)
+    steps = [(int(row), round(weight * scale)) for row, weight in zip(weight_rows, weights)]
+    return tuple(sorted(step for step in steps if step[1])) or None
+
+
+class RecommendationCache:
+    """LRU + 개수 상한 추천 결과 캐시 (모델 버전이 바뀌면 전체 무효화)"""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+
+        # 키 -> (계산한 top_k, 추천 결과 리스트), 가장 오래 안 쓴 항목이 앞쪽
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.model_version = None
+
+        # 통계 카운터
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, top_k):
+        """캐시된 추천 결과의 사본 (없거나 요청한 top_k보다 적게 계산됐으면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < top_k:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # 호출한 쪽이 get_item_details로 dict를 수정하므로 사본으로 반환
+            return [dict(rec) for rec in entry[1][:top_k]]
+
+    def put(self, key, top_k, recommendations):
+        """추천 결과 저장"""
+        recommendations = [dict(rec) for rec in recommendations]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= top_k:
+                return
+
+            self._entries[key] = (top_k, recommendations)
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_version=None):
+        """모델이 다시 로드되면 전체 무효화"""
+        with self._lock:
+            self._entries.clear()
+            self.model_version = model_version
+            self.invalidations += 1
+
+    def clear(self):
+        """전체 삭제 (통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """히트율 등 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'model_version': self.model_version
+            }
+
+    def __len__(self):
+        return len(self._entries)
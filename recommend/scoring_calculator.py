@@ -1,45 +1,53 @@
 """
 심리테스트 응답을 가중치로 변환하는 계산기
 """
-import pandas as pd
+import sys
+import numpy as np
 from pathlib import Path
 
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recommend.metrics import timed
+# 채점 상수는 질문 은행 모듈에서 정의 (기존 import 경로 유지를 위해 다시 노출)
+from recommend.question_bank import (
+    FIVE_POINT_WEIGHTS, CHOICE_WEIGHT, PREF_CONCEPT_COLUMNS, PREF_PROPAGATION, get_question_bank
+)
+
+# 질문 하나의 최대 선택지 수 (5-point)
+MAX_CHOICES = 5
+
+# 배치 채점 시 한 번에 처리하는 응답자 수 (응답자 x 질문 중간 행렬 크기 제한)
+BATCH_SCORE_ROWS = 65536
+
 class ScoringCalculator:
-    def __init__(self):
-        # 상대경로 설정
-        self.base_path = Path("data/psychology-question")
+    def __init__(self, question_bank=None):
+        # 프로세스 전역 질문 은행 공유 (CSV 파싱/채점 표 컴파일은 프로세스당 1회)
+        self.question_bank = question_bank or get_question_bank()
+        self.base_path = self.question_bank.base_path
         
-        # 참조 파일들 로드
-        self.choice_2_data = pd.read_csv(self.base_path / "2-choice-question.csv")
-        self.choice_4_data = pd.read_csv(self.base_path / "4-choice-question.csv")
-        self.choice_5_data = pd.read_csv(self.base_path / "5-point-question.csv")
-        self.choice_ox_data = pd.read_csv(self.base_path / "O-X-question.csv")
-        self.emotion_concept_data = pd.read_csv(self.base_path / "emotion-concept-relation.csv")
+        # {질문 타입: {질문 문장: 선택지별 부호 포함 가중치 튜플}} (응답 하나 = 해시 조회 한 번)
+        self.choice_weights = self.question_bank.choice_weights
         
+        # Pref_ 전파 행렬 (emotion x PREF_CONCEPT_COLUMNS, ±0.25), 단건/배치 채점이 공유
+        self.pref_emotions = self.question_bank.pref_emotions
+        self.pref_matrix = self.question_bank.pref_matrix
+        self.pref_index = self.question_bank.pref_index
+    
+    @timed('calculate_user_weights')
     def calculate_user_weights(self, answers):
         """사용자 답변을 기반으로 노드별 가중치 계산"""
         user_weights = {}
         
         for answer_id, answer_data in answers.items():
-            question_type = answer_data['question_type']
-            target_node = answer_data['target_node']
-            selected_choice = answer_data['selected_choice']
-            choice_index = answer_data['choice_index']
-            question = answer_data['question']
-            
-            # 질문 타입별 가중치 계산
-            if question_type == "5_point_question":
-                weight = self._calculate_5point_weight(question, selected_choice, choice_index, target_node)
-            elif question_type == "2_choice_question":
-                weight = self._calculate_2choice_weight(question, choice_index)
-            elif question_type == "4_choice_question":
-                weight = self._calculate_4choice_weight(question, choice_index)
-            elif question_type == "O_X_question":
-                weight = self._calculate_ox_weight(question, choice_index)
-            else:
+            weight = self._answer_weight(
+                answer_data['question_type'], answer_data['question'], answer_data['choice_index']
+            )
+            if weight is None:
                 continue
-                
+            
             # 가중치 저장
+            target_node = answer_data['target_node']
             if target_node not in user_weights:
                 user_weights[target_node] = []
             user_weights[target_node].append(weight)
@@ -58,94 +66,219 @@ class ScoringCalculator:
             
         return final_weights
     
-    def _calculate_5point_weight(self, question, selected_choice, choice_index, target_node):
-        """5-point 질문 가중치 계산"""
-        # 1->0.2, 2->0.4, 3->0.6, 4->0.8, 5->1.0
-        base_weight = (choice_index + 1) * 0.2
-        
-        # positive_negative_relation 확인
-        relation_row = self.choice_5_data[self.choice_5_data['question'] == question]
-        if not relation_row.empty:
-            relation = relation_row.iloc[0]['positive_negative_relation']
-            if relation == '-':
-                base_weight = -base_weight
-        
-        return base_weight
-    
-    def _calculate_2choice_weight(self, question, choice_index):
-        """2-choice 질문 가중치 계산"""
-        relation_row = self.choice_2_data[self.choice_2_data['question'] == question]
-        if not relation_row.empty:
-            row = relation_row.iloc[0]
-            if choice_index == 0:  # response_1
-                return 0.7 if row['pn_response_1'] == '+' else -0.7
-            else:  # response_2
-                return 0.7 if row['pn_response_2'] == '+' else -0.7
-        return 0.0
+    def _answer_weight(self, question_type, question, choice_index):
+        """응답 하나의 가중치 (지원하지 않는 질문 타입이면 None)"""
+        table = self.choice_weights.get(question_type)
+        if table is None:
+            return None
+        
+        weights = table.get(question)
+        if question_type == '5_point_question':
+            # CSV에 없는 질문은 양의 관계로 취급
+            if weights is None:
+                weights = FIVE_POINT_WEIGHTS
+            if 0 <= choice_index < len(weights):
+                return weights[choice_index]
+            return (choice_index + 1) * 0.2 * (1 if weights[0] > 0 else -1)
+        
+        if weights is None:
+            return 0.0
+        if question_type in ('2_choice_question', 'O_X_question'):
+            # 첫 번째 선택지(response_1, O)가 아니면 두 번째 선택지
+            return weights[0] if choice_index == 0 else weights[1]
+        return weights[choice_index] if 0 <= choice_index < len(weights) else 0.0
     
-    def _calculate_4choice_weight(self, question, choice_index):
-        """4-choice 질문 가중치 계산"""
-        relation_row = self.choice_4_data[self.choice_4_data['question'] == question]
-        if not relation_row.empty:
-            row = relation_row.iloc[0]
-            pn_col = f'pn_response_{choice_index + 1}'
-            if pn_col in row:
-                return 0.7 if row[pn_col] == '+' else -0.7
-        return 0.0
+    @timed('calculate_batch_user_weights')
+    def calculate_batch_user_weights(self, answers_list):
+        """여러 사용자의 답변 dict를 calculate_batch_weights 한 번으로 채점
+        
+        반환값: 사용자별 calculate_user_weights와 같은 가중치 dict 리스트 (노드 순서 포함)
+        choice_index는 0 ~ MAX_CHOICES-1 정수여야 한다 (서비스 요청 검증 후 사용).
+        """
+        # 답변 (질문 타입, 질문, 대상 노드, 같은 답변 안에서 몇 번째인지)마다 열 하나
+        columns = {}
+        questions = []
+        cells = []
+        for answers in answers_list:
+            seen = {}
+            row_cells = []
+            for answer in answers.values():
+                key = (answer['question_type'], answer['question'], answer['target_node'])
+                occurrence = seen.get(key, 0)
+                seen[key] = occurrence + 1
+                col = columns.get(key + (occurrence,))
+                if col is None:
+                    col = columns[key + (occurrence,)] = len(questions)
+                    questions.append({'question_type': key[0], 'question': key[1], 'target_node': key[2]})
+                choice_index = answer['choice_index']
+                if not isinstance(choice_index, (int, np.integer)) or not 0 <= choice_index < MAX_CHOICES:
+                    raise ValueError(f"선택지 번호는 0~{MAX_CHOICES - 1} 정수여야 합니다: {choice_index!r}")
+                row_cells.append((col, choice_index))
+            cells.append(row_cells)
+        
+        choice_indices = np.full((len(answers_list), len(questions)), -1, dtype=np.int64)
+        for row, row_cells in enumerate(cells):
+            for col, choice_index in row_cells:
+                choice_indices[row, col] = choice_index
+        matrix, node_names = self.calculate_batch_weights(choice_indices, questions, dtype=np.float64)
+        node_index = {node: col for col, node in enumerate(node_names)}
+        
+        results = []
+        for row, row_cells in enumerate(cells):
+            nodes = self._weight_nodes([questions[col] for col, _ in row_cells])
+            results.append({node: float(matrix[row, node_index[node]]) for node in nodes})
+        return results
     
-    def _calculate_ox_weight(self, question, choice_index):
-        """O-X 질문 가중치 계산"""
-        relation_row = self.choice_ox_data[self.choice_ox_data['question'] == question]
-        if not relation_row.empty:
-            row = relation_row.iloc[0]
-            if choice_index == 0:  # O
-                return 0.7 if row['pn_response_1'] == '+' else -0.7
-            else:  # X
-                return 0.7 if row['pn_response_2'] == '+' else -0.7
-        return 0.0
+    def _weight_nodes(self, answered_questions):
+        """calculate_user_weights 결과의 노드 순서 (응답 노드 → Pref_ 관련 concept 추가 → emotion 이름 변경)"""
+        nodes = dict.fromkeys(
+            question['target_node'] for question in answered_questions
+            if question['question_type'] in self.choice_weights
+        )
+        for pref_node in [node for node in nodes if node.startswith('Pref_')]:
+            pref_row = self.pref_index.get(pref_node[len('Pref_'):])
+            if pref_row is not None:
+                for col in np.flatnonzero(self.pref_matrix[pref_row]).tolist():
+                    nodes.setdefault(PREF_CONCEPT_COLUMNS[col], None)
+            del nodes[pref_node]
+            nodes[pref_node[len('Pref_'):]] = None
+        return list(nodes)
     
-    def _process_pref_nodes(self, weights):
-        """Pref_ 노드 처리 및 다른 concept 노드에 영향 적용"""
-        pref_nodes = [node for node in weights.keys() if node.startswith('Pref_')]
+    def calculate_batch_weights(self, choice_indices, questions=None, dtype=np.float32):
+        """여러 응답자의 선택지 번호 행렬을 한 번에 채점 → ((응답자 x 노드) 가중치 행렬, 노드 이름 목록)
+        
+        choice_indices: (응답자 x 질문) 정수 행렬, 열 순서는 questions, 미응답은 -1
+        questions: PsychologyDataLoader.create_question_structure() 형식의 질문 목록 (기본: 질문 은행의 전체 질문)
+        
+        응답자마다 calculate_user_weights와 같은 규칙(노드별 평균 → Pref_ 전파 → 클리핑)이며,
+        응답하지 않은 노드는 0이다. 결과는 engine.get_batch_recommendations(matrix, node_names=nodes)에 바로 넣을 수 있다.
+        """
+        if questions is None:
+            questions = self.question_bank.questions
+        
+        choice_indices = np.asarray(choice_indices)
+        if choice_indices.ndim != 2 or choice_indices.shape[1] != len(questions):
+            raise ValueError(f"선택지 행렬 크기 {choice_indices.shape}가 질문 수 {len(questions)}와 맞지 않습니다.")
+        if choice_indices.size and (choice_indices.min() < -1 or choice_indices.max() >= MAX_CHOICES):
+            raise ValueError(f"선택지 번호는 -1(미응답) 또는 0~{MAX_CHOICES - 1}이어야 합니다.")
         
-        for pref_node in pref_nodes:
-            # Pref_Elegant -> Elegant
-            emotion_name = pref_node.replace('Pref_', '')
-            pref_weight = weights[pref_node]
+        # 질문 x 선택지 가중치 표, 지원하지 않는 질문 타입은 평균에서 제외
+        supported = np.zeros(len(questions), dtype=bool)
+        choice_table = np.zeros((len(questions), MAX_CHOICES), dtype=np.float64)
+        for col, question in enumerate(questions):
+            for choice_index in range(MAX_CHOICES):
+                weight = self._answer_weight(question['question_type'], question['question'], choice_index)
+                if weight is None:
+                    break
+                supported[col] = True
+                choice_table[col, choice_index] = weight
+        
+        # 질문 → 대상 노드 one-hot (질문 x 노드): 합/개수를 행렬곱으로 집계
+        target_nodes = list(dict.fromkeys(question['target_node'] for question in questions))
+        target_index = {node: col for col, node in enumerate(target_nodes)}
+        assignment = np.zeros((len(questions), len(target_nodes)), dtype=np.float64)
+        assignment[np.arange(len(questions)), [target_index[q['target_node']] for q in questions]] = 1.0
+        assignment[~supported] = 0.0
+        
+        # Pref_ 노드: emotion 이름으로 바뀌고, 관계가 있는 concept에 ±0.25배를 더함
+        pref_nodes = [node for node in target_nodes if node.startswith('Pref_')]
+        pref_rows = [self.pref_index.get(node[len('Pref_'):]) for node in pref_nodes]
+        relation = np.zeros((len(pref_nodes), len(PREF_CONCEPT_COLUMNS)), dtype=np.float64)
+        for row, pref_row in enumerate(pref_rows):
+            if pref_row is not None:
+                relation[row] = self.pref_matrix[pref_row]
+        concept_cols = np.flatnonzero(np.any(relation != 0, axis=0))
+        concept_nodes = [PREF_CONCEPT_COLUMNS[col] for col in concept_cols.tolist()]
+        
+        node_names = [node for node in target_nodes if not node.startswith('Pref_')]
+        for node in [node[len('Pref_'):] for node in pref_nodes] + concept_nodes:
+            if node not in node_names:
+                node_names.append(node)
+        node_index = {node: col for col, node in enumerate(node_names)}
+        
+        plain_cols = [col for col, node in enumerate(target_nodes) if not node.startswith('Pref_')]
+        plain_out = [node_index[target_nodes[col]] for col in plain_cols]
+        pref_cols = [target_index[node] for node in pref_nodes]
+        emotion_out = [node_index[node[len('Pref_'):]] for node in pref_nodes]
+        # 응답에 나오는 Pref_ 행과 concept 열만 출력 노드 순서로 옮긴 전파 행렬
+        pref_matrix = np.zeros((len(pref_nodes), len(node_names)), dtype=np.float64)
+        pref_matrix[:, [node_index[concept] for concept in concept_nodes]] = relation[:, concept_cols]
+        
+        question_rows = np.arange(len(questions))
+        result = np.zeros((choice_indices.shape[0], len(node_names)), dtype=dtype)
+        for start in range(0, choice_indices.shape[0], BATCH_SCORE_ROWS):
+            chunk = choice_indices[start:start + BATCH_SCORE_ROWS]
+            answered = (chunk >= 0).astype(np.float64)
+            values = choice_table[question_rows, np.maximum(chunk, 0)] * answered
             
-            # emotion-concept-relation.csv에서 관계 확인
-            emotion_row = self.emotion_concept_data[
-                self.emotion_concept_data['Emotion'] == f'[{emotion_name}]'
-            ]
+            # 동일 노드의 다중 질문은 평균값 사용
+            counts = answered @ assignment
+            means = (values @ assignment) / np.maximum(counts, 1.0)
             
-            if not emotion_row.empty:
-                row = emotion_row.iloc[0]
-                
-                # 각 concept에 대해 관계 확인
-                concept_columns = [
-                    'Texture_Softness', 'Texture_Smoothness', 'Brand', 
-                    'Color_Brightness', 'Color_Saturation', 'Simple', 
-                    'Glossiness', 'Color_Temperature'
-                ]
-                
-                for concept in concept_columns:
-                    if concept in row and pd.notna(row[concept]):
-                        relation = row[concept]
-                        if relation in ['+', '-']:
-                            # 1->0.05, 2->0.1, 3->0.15, 4->0.2, 5->0.25
-                            # pref_weight는 이미 0.2~1.0 범위이므로 이를 기반으로 계산
-                            additional_weight = pref_weight * 0.25  # 최대 0.25
-                            if relation == '-':
-                                additional_weight = -additional_weight
-                            
-                            # 기존 가중치에 추가
-                            if concept in weights:
-                                weights[concept] += additional_weight
-                            else:
-                                weights[concept] = additional_weight
+            weights = np.zeros((chunk.shape[0], len(node_names)), dtype=np.float64)
+            weights[:, plain_out] = means[:, plain_cols]
+            if pref_nodes:
+                pref_weights = means[:, pref_cols]
+                weights += pref_weights @ pref_matrix
+                # Pref_ 노드를 실제 노드명으로 변경 (응답한 경우에만 기존 값을 덮어씀)
+                weights[:, emotion_out] = np.where(counts[:, pref_cols] > 0, pref_weights, weights[:, emotion_out])
             
-            # Pref_ 노드를 실제 노드명으로 변경
-            weights[emotion_name] = weights.pop(pref_node)
+            # 가중치 범위 클리핑 (-1 ~ 1)
+            result[start:start + BATCH_SCORE_ROWS] = np.clip(weights, -1.0, 1.0)
+        
+        return result, node_names
+    
+    def calculate_batch_weights_long(self, responses, questions=None, dtype=np.float32):
+        """long 형식 응답표(respondent_id, question_id, choice_index 열)를 채점
+        
+        반환값: ((응답자 x 노드) 가중치 행렬, 노드 이름 목록, 행 순서의 respondent_id 배열)
+        """
+        if questions is None:
+            questions = self.question_bank.questions
+        
+        import pandas as pd
+        
+        question_codes = responses['question_id'].map({q['id']: col for col, q in enumerate(questions)})
+        known = question_codes.notna().to_numpy()
+        respondent_codes, respondent_ids = pd.factorize(responses['respondent_id'])
+        
+        # int8로 바꾸기 전에 범위 검사 (255 → -1처럼 조용히 넘치지 않도록, NaN/소수도 거부)
+        choices = np.asarray(responses['choice_index'].to_numpy()[known], dtype=np.float64)
+        if choices.size and not np.all((choices >= -1) & (choices < MAX_CHOICES) & (choices == np.round(choices))):
+            raise ValueError(f"선택지 번호는 -1(미응답) 또는 0~{MAX_CHOICES - 1} 정수여야 합니다.")
+        
+        # 같은 응답자가 같은 질문에 여러 번 답하면 마지막 응답 사용 (answers dict와 동일)
+        choice_indices = np.full((len(respondent_ids), len(questions)), -1, dtype=np.int8)
+        choice_indices[respondent_codes[known], question_codes[known].astype(np.int64).to_numpy()] = choices
+        
+        matrix, node_names = self.calculate_batch_weights(choice_indices, questions, dtype=dtype)
+        return matrix, node_names, np.asarray(respondent_ids)
+    
+    def _process_pref_nodes(self, weights):
+        """Pref_ 노드 처리: Pref_ 가중치 벡터 @ 전파 행렬을 관련 concept에 더하고 emotion 이름으로 변경"""
+        pref_nodes = [node for node in weights if node.startswith('Pref_')]
+        if not pref_nodes:
+            return
+        
+        # Pref_Elegant -> Elegant, 관계 행이 없는 emotion은 이름만 변경
+        rows = [self.pref_index.get(node[len('Pref_'):]) for node in pref_nodes]
+        known = [row is not None for row in rows]
+        if any(known):
+            relation = self.pref_matrix[[row for row in rows if row is not None]]
+            pref_weights = np.asarray([weights[node] for node, ok in zip(pref_nodes, known) if ok])
+            contributions = pref_weights @ relation
+        
+        # 노드 순서는 Pref_ 노드별로 관련 concept 생성 → 이름 변경 순서를 유지
+        for pref_node, row in zip(pref_nodes, rows):
+            if row is not None:
+                for col in np.flatnonzero(self.pref_matrix[row]).tolist():
+                    weights.setdefault(PREF_CONCEPT_COLUMNS[col], 0.0)
+            weights[pref_node[len('Pref_'):]] = weights.pop(pref_node)
+        
+        # 관계가 있는 concept에 전파 가중치 추가
+        if any(known):
+            for col in np.flatnonzero(np.any(relation != 0, axis=0)).tolist():
+                weights[PREF_CONCEPT_COLUMNS[col]] += float(contributions[col])
 
 # 테스트 코드
 if __name__ == "__main__":
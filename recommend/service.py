@@ -0,0 +1,471 @@
+"""
+추천 HTTP 서비스 - asyncio 기반, 동시 요청을 짧은 구간 단위로 모아 배치 추천
+
+실행:
+    python recommend/service.py --port 8000 --workers 4
+
+API:
+    POST /recommend  {"weights": {...}} 또는 {"answers": {...}}, "top_k": 10, "details": true,
+                     "filters": {"max_price": 50000, "categories": [...], "exclude": [...]},
+                     "diversity": {"mmr_lambda": 0.7, "max_per_category": 2}, "explain": true
+                     answers는 {질문 ID: {"question", "question_type", "target_node", "choice_index"(0~4)}}이며
+                     한 배치의 답변 요청은 calculate_batch_user_weights 한 번으로 채점
+    GET  /health
+    GET  /stats
+    GET  /metrics    단계별 지연 시간(p50/p90/p99)과 카운터 (Prometheus 텍스트)
+"""
+import os
+import sys
+import math
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 프로젝트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from recommend.diversity import diversity_key
+from recommend.item_filters import filter_key
+from recommend.metrics import METRICS, timed
+from recommend.model_registry import get_engine, get_registry
+
+# 요청 본문 최대 크기
+MAX_BODY_BYTES = 1024 * 1024
+
+# --metrics-file 저장 주기(초)
+METRICS_WRITE_INTERVAL = 15.0
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class BadRequest(Exception):
+    """잘못된 요청 (400)"""
+
+
+class RecommendationBatcher:
+    """window_ms 안에 들어온 요청들을 모아 한 번의 배치 추천으로 처리"""
+
+    def __init__(self, window_ms=5.0, max_batch=256, executor=None):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        # numpy 행렬곱은 GIL을 풀기 때문에 스레드 풀에서 실행
+        self.executor = executor or ThreadPoolExecutor(max_workers=2)
+        self.calculator = None
+
+        self._pending = []
+        self._flush_handle = None
+
+        # 통계
+        self.requests = 0
+        self.batches = 0
+        self.max_seen_batch = 0
+
+    def submit(self, request):
+        """요청 하나를 대기열에 넣고 결과 future 반환"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return future
+
+    def _flush(self):
+        """대기 중인 요청을 배치 하나로 실행"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        requests = [request for request, _ in batch]
+        try:
+            results = await loop.run_in_executor(self.executor, self._recommend_batch, requests)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        # 요청별 실패(예외)는 해당 future에만 전달
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @timed('service_batch')
+    def _recommend_batch(self, requests):
+        """(워커 스레드) 가중치 계산 → 배치 추천 → 상세 정보"""
+        engine = get_engine()
+
+        results = [None] * len(requests)
+        user_weights = {idx: request['weights'] for idx, request in enumerate(requests)
+                        if request.get('weights') is not None}
+        user_weights.update(self._score_answers(requests, results))
+
+        # 같은 필터/다양성 옵션끼리 묶어 옵션마다 배치 추천 한 번 (필터 마스크는 Top-K 전에 적용)
+        groups = {}
+        for idx, weights in sorted(user_weights.items()):
+            group_key = (requests[idx]['filters_key'], requests[idx]['diversity_key'])
+            groups.setdefault(group_key, []).append((idx, weights))
+
+        for group in groups.values():
+            try:
+                self._recommend_group(engine, requests, group, results)
+            except Exception as e:
+                if len(group) == 1:
+                    results[group[0][0]] = e
+                    continue
+                # 그룹 배치가 실패하면 요청별로 다시 실행해 실패한 요청만 에러로 응답
+                for member in group:
+                    try:
+                        self._recommend_group(engine, requests, [member], results)
+                    except Exception as member_error:
+                        results[member[0]] = member_error
+        return results
+
+    def _score_answers(self, requests, results):
+        """답변 요청을 calculate_batch_user_weights 한 번으로 채점 → {요청 번호: 가중치 dict}
+
+        배치 채점이 실패하면 요청별로 다시 채점해 형식이 잘못된 요청만 에러로 응답
+        """
+        answer_indices = [idx for idx, request in enumerate(requests) if request.get('weights') is None]
+        if not answer_indices:
+            return {}
+
+        if self.calculator is None:
+            # 답변 요청이 처음 올 때만 계산기(질문 은행)를 로드
+            from recommend.scoring_calculator import ScoringCalculator
+            self.calculator = ScoringCalculator()
+
+        answers_list = [requests[idx]['answers'] for idx in answer_indices]
+        try:
+            return dict(zip(answer_indices, self.calculator.calculate_batch_user_weights(answers_list)))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            pass
+
+        scored = {}
+        for idx in answer_indices:
+            try:
+                scored[idx] = self.calculator.calculate_batch_user_weights([requests[idx]['answers']])[0]
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                results[idx] = {'error': f'답변 형식이 올바르지 않습니다: {e}'}
+        return scored
+
+    @staticmethod
+    def _recommend_group(engine, requests, group, results):
+        """같은 필터/다양성 옵션의 (요청 번호, 가중치) 목록을 배치 추천 한 번으로 처리해 results에 기록"""
+        first = requests[group[0][0]]
+        max_top_k = max(requests[idx]['top_k'] for idx, _ in group)
+        batch_recommendations = engine.get_batch_recommendations(
+            [weights for _, weights in group], top_k=max_top_k,
+            filters=first['filters'], diversity=first['diversity']
+        )
+
+        batch_recommendations = [
+            recommendations[:requests[idx]['top_k']]
+            for (idx, _), recommendations in zip(group, batch_recommendations)
+        ]
+        # 추천 이유가 필요한 요청은 그룹 전체를 한 번에 계산
+        explain_rows = [row for row, (idx, _) in enumerate(group) if requests[idx]['explain']]
+        if explain_rows:
+            engine.explain_batch_recommendations(
+                [group[row][1] for row in explain_rows], [batch_recommendations[row] for row in explain_rows]
+            )
+
+        for (idx, weights), recommendations in zip(group, batch_recommendations):
+            request = requests[idx]
+            if request['details']:
+                recommendations = engine.get_item_details(recommendations)
+            results[idx] = {'weights': weights, 'recommendations': recommendations}
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'avg_batch_size': self.requests / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_seen_batch,
+            'pending': len(self._pending)
+        }
+
+
+class RecommendationService:
+    """최소한의 HTTP/1.1 (keep-alive 지원) 추천 서버"""
+
+    def __init__(self, batcher=None, default_top_k=10):
+        self.batcher = batcher or RecommendationBatcher()
+        self.default_top_k = default_top_k
+        self.started_at = time.time()
+
+    def parse_request(self, body):
+        """요청 JSON 검증 및 정규화"""
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise BadRequest("JSON 형식이 올바르지 않습니다.")
+
+        if not isinstance(payload, dict):
+            raise BadRequest("요청 본문은 JSON 객체여야 합니다.")
+
+        weights = payload.get('weights')
+        answers = payload.get('answers')
+        if weights is None and answers is None:
+            raise BadRequest("'weights' 또는 'answers'가 필요합니다.")
+        if weights is not None and not isinstance(weights, dict):
+            raise BadRequest("'weights'는 {노드 이름: 가중치} 객체여야 합니다.")
+        if answers is not None and not isinstance(answers, dict):
+            raise BadRequest("'answers'는 {질문 ID: 답변} 객체여야 합니다.")
+
+        try:
+            top_k = int(payload.get('top_k', self.default_top_k))
+        except (TypeError, ValueError):
+            raise BadRequest("'top_k'는 정수여야 합니다.")
+        if top_k <= 0:
+            raise BadRequest("'top_k'는 1 이상이어야 합니다.")
+
+        if weights is not None:
+            try:
+                weights = {str(name): float(weight) for name, weight in weights.items()}
+            except (TypeError, ValueError):
+                raise BadRequest("가중치 값은 숫자여야 합니다.")
+            if not all(math.isfinite(weight) for weight in weights.values()):
+                raise BadRequest("가중치 값은 유한한 숫자여야 합니다 (NaN/Infinity 불가).")
+
+        filters = payload.get('filters')
+        if filters is not None and not isinstance(filters, dict):
+            raise BadRequest("'filters'는 객체여야 합니다.")
+        try:
+            filters_key = filter_key(filters)
+        except (TypeError, ValueError) as e:
+            raise BadRequest(f"필터 형식이 올바르지 않습니다: {e}")
+
+        diversity = payload.get('diversity')
+        if diversity is not None and not isinstance(diversity, dict):
+            raise BadRequest("'diversity'는 객체여야 합니다.")
+        try:
+            normalized_diversity = diversity_key(diversity)
+        except (TypeError, ValueError) as e:
+            raise BadRequest(f"다양성 옵션 형식이 올바르지 않습니다: {e}")
+
+        return {
+            'weights': weights,
+            'answers': answers,
+            'top_k': top_k,
+            'filters': filters,
+            'filters_key': filters_key,
+            'diversity': diversity,
+            'diversity_key': normalized_diversity,
+            'details': bool(payload.get('details', True)),
+            'explain': bool(payload.get('explain', False))
+        }
+
+    async def dispatch(self, method, path, body):
+        """라우팅 → (상태 코드, 응답 객체)"""
+        path = path.split('?', 1)[0]
+
+        if path == '/health':
+            return 200, {'status': 'ok', 'uptime_seconds': time.time() - self.started_at}
+
+        if path == '/stats':
+            # 이벤트 루프에서 파일 확인/리로드를 하지 않도록 현재 엔진 참조만 사용
+            engine = get_registry().current_engine
+            return 200, {
+                'batcher': self.batcher.stats(),
+                'result_cache': engine.result_cache.stats() if engine is not None else None,
+                'user_store': engine.user_store.stats() if engine is not None else None,
+                'latency': METRICS.snapshot()
+            }
+
+        if path == '/metrics':
+            return 200, METRICS.to_prometheus()
+
+        if path == '/recommend':
+            if method != 'POST':
+                return 405, {'error': 'POST만 지원합니다.'}
+            try:
+                request = self.parse_request(body)
+            except BadRequest as e:
+                return 400, {'error': str(e)}
+            result = await self.batcher.submit(request)
+            if 'error' in result:
+                return 400, result
+            return 200, result
+
+        return 404, {'error': f'알 수 없는 경로: {path}'}
+
+    async def handle_connection(self, reader, writer):
+        """연결 하나에서 요청을 반복 처리 (keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write_response(writer, 400, {'error': '잘못된 요청 라인'}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    content_length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    await self._write_response(writer, 400, {'error': '잘못된 Content-Length'}, keep_alive=False)
+                    break
+                if content_length > MAX_BODY_BYTES:
+                    await self._write_response(writer, 413, {'error': '요청 본문이 너무 큽니다.'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(content_length) if content_length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {'error': f'추천 생성 실패: {e}'}
+
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer, status, payload, keep_alive):
+        # 문자열 응답은 Prometheus 텍스트 형식, 나머지는 JSON
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        ).encode('latin-1')
+        writer.write(head + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8000, reuse_port=False, metrics_file=None):
+        # 첫 요청이 모델 로드를 기다리지 않도록 미리 로드
+        await asyncio.get_running_loop().run_in_executor(self.batcher.executor, get_engine)
+
+        if metrics_file:
+            asyncio.get_running_loop().create_task(self._write_metrics_periodically(metrics_file))
+
+        server = await asyncio.start_server(self.handle_connection, host, port, reuse_port=reuse_port)
+        print(f"추천 서비스 시작: http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    @staticmethod
+    async def _write_metrics_periodically(metrics_file, interval=METRICS_WRITE_INTERVAL):
+        """계측 스냅샷을 주기적으로 파일에 저장 (.json이면 JSON, 아니면 Prometheus 텍스트)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                METRICS.write(metrics_file)
+            except OSError as e:
+                print(f"계측 파일 저장 실패: {e}")
+
+
+def run_worker(host, port, window_ms, max_batch, reuse_port, metrics_file=None):
+    """워커 프로세스 하나 실행"""
+    service = RecommendationService(RecommendationBatcher(window_ms=window_ms, max_batch=max_batch))
+    try:
+        asyncio.run(service.serve(host, port, reuse_port=reuse_port, metrics_file=metrics_file))
+    except KeyboardInterrupt:
+        pass
+
+
+def _worker_metrics_file(metrics_file, worker):
+    """워커별 계측 파일 경로 (metrics.prom → metrics.worker0.prom)"""
+    if not metrics_file:
+        return None
+    path = Path(metrics_file)
+    return str(path.with_name(f"{path.stem}.worker{worker}{path.suffix}"))
+
+
+def main():
+    """메인 실행 함수"""
+    import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description='추천 HTTP 서비스')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--window-ms', type=float, default=5.0, help='요청을 모으는 시간(ms)')
+    parser.add_argument('--max-batch', type=int, default=256, help='배치 하나의 최대 요청 수')
+    parser.add_argument('--workers', type=int, default=1, help='워커 프로세스 수 (SO_REUSEPORT로 포트 공유)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='단계별 지연 시간을 주기적으로 저장할 파일 (.json 또는 Prometheus 텍스트)')
+    parser.add_argument('--no-metrics', action='store_true', help='단계별 지연 시간 계측 끄기')
+
+    args = parser.parse_args()
+
+    # spawn으로 시작한 워커도 같은 설정을 쓰도록 환경 변수도 함께 설정
+    if args.no_metrics:
+        METRICS.enabled = False
+        os.environ['RECOMMEND_METRICS'] = '0'
+
+    if args.workers <= 1:
+        run_worker(args.host, args.port, args.window_ms, args.max_batch, reuse_port=False,
+                   metrics_file=args.metrics_file)
+        return
+
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(args.host, args.port, args.window_ms, args.max_batch, True,
+                  _worker_metrics_file(args.metrics_file, worker))
+        )
+        for worker in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ sys.path.append(str(current_dir))
 
 from data_loader import PsychologyDataLoader
 from scoring_calculator import ScoringCalculator
-from recommendation_engine import RecommendationEngine
+from model_registry import get_engine
 from pathlib import Path
 
 def initialize_session_state():
@@ -160,13 +160,14 @@ def display_results():
     if st.button("추천 받기"):
         with st.spinner("추천을 생성하는 중..."):
             try:
-                engine = RecommendationEngine()
-                user_id = engine.add_user_node(st.session_state.user_weights)
-                recommendations = engine.get_recommendations(user_id, top_k=10)
+                # 프로세스 전역에서 공유하는 엔진 (모델 파일은 1회만 로드)
+                engine = get_engine()
+                # 같은 가중치의 추천은 결과 캐시에서 바로 응답
+                recommendations = engine.recommend(st.session_state.user_weights, top_k=10)
+                recommendations = engine.explain_recommendations(st.session_state.user_weights, recommendations)
                 recommendations = engine.get_item_details(recommendations)
                 
                 st.session_state.recommendations = recommendations
-                st.session_state.user_id = user_id
                 
             except Exception as e:
                 st.error(f"추천 생성 실패: {e}")
@@ -180,6 +181,10 @@ def display_results():
                 product_name = rec.get('name', f'상품 {rec["item_id"]}')
                 st.subheader(f"{i}. {product_name}")
                 st.write(f"**유사도**: {rec['similarity']:.3f}")
+                if rec.get('reasons'):
+                    st.write("**추천 이유**: " + ", ".join(
+                        f"{reason['node']} ({reason['contribution']:.2f})" for reason in rec['reasons']
+                    ))
                 
                 # 상품 상세 정보를 접기/펼치기로 표시
                 with st.expander("상품 상세 정보"):
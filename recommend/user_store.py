@@ -0,0 +1,119 @@
+"""
+User 임베딩 저장소 - 세션성 User 임베딩을 LRU/TTL/메모리 상한으로 관리
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class UserEmbeddingStore:
+    """LRU + TTL 기반으로 크기가 제한된 User 임베딩 저장소"""
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        # user_id -> (임베딩, 저장 시각), 가장 오래 안 쓴 항목이 앞쪽
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        # 통계 카운터
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, user_id, embedding):
+        """User 임베딩 저장 (읽기 전용 float32 사본으로 보관)"""
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.flags.writeable = False
+
+        with self._lock:
+            if user_id in self._entries:
+                self._remove(user_id)
+
+            self._entries[user_id] = (embedding, time.monotonic())
+            self.current_bytes += embedding.nbytes
+            self._evict_over_limit()
+
+    def get(self, user_id):
+        """User 임베딩 조회 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            embedding, created_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - created_at > self.ttl_seconds:
+                self._remove(user_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return embedding
+
+    def discard(self, user_id):
+        """User 임베딩 삭제"""
+        with self._lock:
+            if user_id in self._entries:
+                self._remove(user_id)
+
+    def clear(self):
+        """전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, user_id):
+        embedding, _ = self._entries.pop(user_id)
+        self.current_bytes -= embedding.nbytes
+
+    def _evict_over_limit(self):
+        """만료 항목 정리 후 개수/메모리 상한을 넘으면 LRU 순으로 제거"""
+        if self.ttl_seconds is not None:
+            now = time.monotonic()
+            # 저장 시각 순서와 LRU 순서가 다를 수 있어 앞에서부터 만료된 것만 정리
+            while self._entries:
+                user_id, (_, created_at) = next(iter(self._entries.items()))
+                if now - created_at <= self.ttl_seconds:
+                    break
+                self._remove(user_id)
+                self.expirations += 1
+
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            _, (embedding, _) = self._entries.popitem(last=False)
+            self.current_bytes -= embedding.nbytes
+            self.evictions += 1
+
+    def stats(self):
+        """히트/미스/제거 통계"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def __contains__(self, user_id):
+        """존재 + 미만료 여부만 확인 (통계 카운터와 LRU 순서는 건드리지 않음)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return False
+            return self.ttl_seconds is None or time.monotonic() - entry[1] <= self.ttl_seconds
+
+    def __len__(self):
+        return len(self._entries)
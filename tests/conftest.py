@@ -0,0 +1,15 @@
+"""
+테스트 공통 설정 - 프로젝트 루트를 import 경로와 작업 디렉토리로 사용 (데이터 경로가 상대경로)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def project_root_cwd(monkeypatch):
+    monkeypatch.chdir(PROJECT_ROOT)
@@ -0,0 +1,97 @@
+"""
+배치 채점 테스트
+
+- calculate_batch_weights / long 형식 == 응답자별 calculate_user_weights
+- 범위 밖 선택지 번호는 int8로 넘치지 않고 ValueError
+"""
+import numpy as np
+import pytest
+
+from recommend.question_bank import QuestionBank
+from recommend.scoring_calculator import ScoringCalculator, MAX_CHOICES
+
+pd = pytest.importorskip('pandas')
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return ScoringCalculator(QuestionBank.load(cache_path=None))
+
+
+def make_answers(questions, choice_indices):
+    return {
+        question['id']: {
+            'question': question['question'],
+            'question_type': question['question_type'],
+            'target_node': question['target_node'],
+            'selected_choice': '',
+            'choice_index': int(choice_index)
+        }
+        for question, choice_index in zip(questions, choice_indices)
+        if choice_index >= 0
+    }
+
+
+def test_batch_weights_match_single(calculator):
+    questions = calculator.question_bank.questions
+    rng = np.random.default_rng(0)
+    num_choices = np.asarray([len(question['choices']) for question in questions])
+    choice_indices = (rng.random((200, len(questions))) * num_choices).astype(np.int64)
+    choice_indices[rng.random(choice_indices.shape) < 0.2] = -1
+    choice_indices[0] = -1
+
+    matrix, node_names = calculator.calculate_batch_weights(choice_indices, dtype=np.float64)
+    assert matrix.shape == (len(choice_indices), len(node_names))
+    for row, indices in enumerate(choice_indices):
+        expected = calculator.calculate_user_weights(make_answers(questions, indices))
+        actual = dict(zip(node_names, matrix[row].tolist()))
+        for node, weight in actual.items():
+            assert weight == pytest.approx(expected.get(node, 0.0), abs=1e-12), (row, node)
+        assert set(expected) <= set(node_names)
+
+
+def test_batch_weights_long_format(calculator):
+    questions = calculator.question_bank.questions
+    rng = np.random.default_rng(1)
+    num_choices = np.asarray([len(question['choices']) for question in questions])
+    choice_indices = (rng.random((20, len(questions))) * num_choices).astype(np.int64)
+    choice_indices[rng.random(choice_indices.shape) < 0.3] = -1
+
+    responses = pd.DataFrame(
+        [(f'u{row}', questions[col]['id'], int(choice_indices[row, col]))
+         for row, col in zip(*np.nonzero(choice_indices >= 0))],
+        columns=['respondent_id', 'question_id', 'choice_index']
+    ).sample(frac=1.0, random_state=0)
+
+    matrix, node_names, respondent_ids = calculator.calculate_batch_weights_long(responses)
+    expected, expected_nodes = calculator.calculate_batch_weights(choice_indices)
+    assert node_names == expected_nodes
+    rows = [int(respondent_id[1:]) for respondent_id in respondent_ids]
+    np.testing.assert_allclose(matrix, expected[rows])
+
+
+@pytest.mark.parametrize('choice_index', [MAX_CHOICES, 255, -2, 1.5, float('nan')])
+def test_long_format_rejects_out_of_range_choice(calculator, choice_index):
+    questions = calculator.question_bank.questions
+    responses = pd.DataFrame({
+        'respondent_id': ['u0', 'u0'],
+        'question_id': [questions[0]['id'], questions[1]['id']],
+        'choice_index': [0, choice_index]
+    })
+    with pytest.raises(ValueError):
+        calculator.calculate_batch_weights_long(responses)
+
+
+def test_long_format_ignores_unknown_question_rows(calculator):
+    # 모르는 질문 행은 범위 검사 대상이 아님 (기존처럼 무시)
+    questions = calculator.question_bank.questions
+    responses = pd.DataFrame({
+        'respondent_id': ['u0', 'u0'],
+        'question_id': [questions[0]['id'], '없는_질문'],
+        'choice_index': [1, 255]
+    })
+    matrix, node_names, _ = calculator.calculate_batch_weights_long(responses)
+    expected = calculator.calculate_user_weights(make_answers(questions[:1], [1]))
+    actual = dict(zip(node_names, matrix[0].tolist()))
+    for node, weight in expected.items():
+        assert actual[node] == pytest.approx(weight, abs=1e-6)
@@ -0,0 +1,84 @@
+"""
+모델 레지스트리 리로드 / 로드 실패 테스트
+"""
+import os
+import pickle
+
+import pytest
+
+from recommend.model_registry import ModelRegistry
+
+
+def make_engine_factory(model_path):
+    """model_path의 pickle을 읽는 최소 엔진 (source_files / load_model만 구현)"""
+    class PickleEngine:
+        loads = 0
+
+        def source_files(self):
+            return [model_path]
+
+        def load_model(self):
+            PickleEngine.loads += 1
+            with open(model_path, 'rb') as f:
+                self.model = pickle.load(f)
+
+    return PickleEngine
+
+
+def write_model(path, value, mtime_ns):
+    path.write_bytes(pickle.dumps(value))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reload_on_change(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    write_model(model_path, {'version': 1}, 1_000_000_000)
+    registry = ModelRegistry(make_engine_factory(model_path), check_interval=0.0)
+
+    first = registry.get_engine()
+    assert first.model == {'version': 1}
+    assert registry.get_engine() is first
+
+    # mtime만 바뀌고 내용이 같으면 그대로
+    os.utime(model_path, ns=(2_000_000_000, 2_000_000_000))
+    assert registry.get_engine() is first
+
+    write_model(model_path, {'version': 2}, 3_000_000_000)
+    second = registry.get_engine()
+    assert second is not first
+    assert second.model == {'version': 2}
+    assert registry.version == 2
+
+
+def test_corrupt_file_keeps_current_engine(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    write_model(model_path, {'version': 1}, 1_000_000_000)
+    factory = make_engine_factory(model_path)
+    registry = ModelRegistry(factory, check_interval=0.0)
+    engine = registry.get_engine()
+
+    # 쓰다 만 파일
+    model_path.write_bytes(pickle.dumps({'version': 2})[:10])
+    os.utime(model_path, ns=(2_000_000_000, 2_000_000_000))
+    assert registry.get_engine() is engine
+    assert registry.current_engine is engine
+    loads = factory.loads
+
+    # 같은 깨진 파일은 다시 로드하지 않음
+    assert registry.get_engine() is engine
+    assert factory.loads == loads
+
+    # 파일이 고쳐지면 새 버전 적용
+    write_model(model_path, {'version': 2}, 3_000_000_000)
+    assert registry.get_engine().model == {'version': 2}
+    assert registry.version == 2
+
+
+def test_first_load_failure_raises(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b'not a pickle')
+    registry = ModelRegistry(make_engine_factory(model_path), check_interval=0.0)
+
+    with pytest.raises(Exception):
+        registry.get_engine()
+    assert registry.current_engine is None
@@ -0,0 +1,46 @@
+"""
+개인화 PageRank 동등성 테스트 (networkx pagerank와 비교)
+"""
+import numpy as np
+import pytest
+
+
+def _random_graph(seed=0, num_features=12, num_items=40):
+    """trait/concept/item 노드와 양수 가중치 엣지를 가진 작은 networkx 그래프 (가중치는 float32로 정확히 표현되는 값)"""
+    nx = pytest.importorskip('networkx')
+    rng = np.random.default_rng(seed)
+    graph = nx.Graph()
+    for node_id in range(num_features):
+        graph.add_node(node_id, name=f'F{node_id}', type='trait' if node_id % 2 else 'concept')
+    for item in range(num_items):
+        node_id = 1000 + item
+        graph.add_node(node_id, name=str(node_id), type='item')
+        for feature in rng.choice(num_features, size=3, replace=False).tolist():
+            graph.add_edge(node_id, feature, weight=int(rng.integers(1, 9)) / 8, relation='item_trait')
+    for u, v in rng.choice(num_features, size=(10, 2)).tolist():
+        if u != v:
+            graph.add_edge(u, v, weight=int(rng.integers(1, 9)) / 8, relation='trait_concept')
+    return graph
+
+
+@pytest.mark.parametrize('precompute', [True, False])
+def test_pagerank_matches_networkx(precompute):
+    nx = pytest.importorskip('networkx')
+    pytest.importorskip('scipy')
+    from recommend.pagerank import PersonalizedPageRank
+
+    graph = _random_graph()
+    item_ids = [node for node, data in graph.nodes(data=True) if data['type'] == 'item']
+    scorer = PersonalizedPageRank.build(graph, item_ids, alpha=0.15, tol=1e-13, max_iter=1000,
+                                        precompute=precompute)
+
+    user_weights = [{'F1': 0.8, 'F4': -0.5}, {'F0': 1.0}, {'F2': 0.2, 'F3': 0.3, 'F7': 0.5}]
+    scores = scorer.score(scorer.user_vectors(user_weights))
+
+    for row, weights in enumerate(user_weights):
+        personalization = {node: 0.0 for node in graph.nodes()}
+        for name, weight in weights.items():
+            personalization[int(name[1:])] = abs(weight)
+        expected = nx.pagerank(graph, alpha=0.85, personalization=personalization, weight='weight',
+                               tol=1e-14, max_iter=1000)
+        np.testing.assert_allclose(scores[row], [expected[item] for item in item_ids], rtol=1e-5, atol=1e-9)
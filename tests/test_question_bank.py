@@ -0,0 +1,97 @@
+"""
+질문 은행 바이너리 캐시 테스트 (캐시 복원 == CSV 파싱, 적중 시 CSV 미파싱, mtime만 변경/내용 변경/버전 변경/깨진 캐시 처리)
+"""
+import os
+import shutil
+
+import pytest
+
+from recommend.question_bank import QuestionBank, CACHE_FILE_NAME, CACHE_FORMAT_VERSION, DEFAULT_BASE_PATH
+
+
+def bank_state(bank):
+    return (
+        [dict(question) for question in bank.questions],
+        {name: [dict(row) for row in rows] for name, rows in bank.tables.items()},
+        {question_type: dict(table) for question_type, table in bank.choice_weights.items()},
+        bank.pref_emotions,
+        bank.pref_matrix.tolist()
+    )
+
+
+@pytest.fixture
+def question_dir(tmp_path):
+    path = tmp_path / "psychology-question"
+    shutil.copytree(DEFAULT_BASE_PATH, path, ignore=shutil.ignore_patterns(CACHE_FILE_NAME))
+    return path
+
+
+def test_cache_round_trip(question_dir):
+    parsed = QuestionBank.load(question_dir, cache_path=None)
+    first = QuestionBank.load(question_dir)
+    assert (question_dir / CACHE_FILE_NAME).exists()
+    cached = QuestionBank.load(question_dir)
+
+    assert bank_state(first) == bank_state(parsed)
+    assert bank_state(cached) == bank_state(parsed)
+    assert not cached.pref_matrix.flags.writeable
+    with pytest.raises(TypeError):
+        cached.questions[0]['question'] = 'x'
+
+
+def test_cache_invalidated_when_csv_changes(question_dir):
+    bank = QuestionBank.load(question_dir)
+    question = bank.tables['choice_ox'][0]['question']
+
+    csv_path = question_dir / "O-X-question.csv"
+    csv_path.write_text(csv_path.read_text(encoding='utf-8-sig').replace(question, question + '!', 1),
+                        encoding='utf-8')
+    assert QuestionBank.load(question_dir).tables['choice_ox'][0]['question'] == question + '!'
+
+
+def test_corrupt_cache_falls_back_to_csv(question_dir):
+    parsed = QuestionBank.load(question_dir, cache_path=None)
+    (question_dir / CACHE_FILE_NAME).write_bytes(b'not a pickle')
+
+    assert bank_state(QuestionBank.load(question_dir)) == bank_state(parsed)
+    # 다시 저장된 캐시는 정상
+    assert bank_state(QuestionBank.load(question_dir)) == bank_state(parsed)
+
+
+def _fail_read(*args, **kwargs):
+    raise AssertionError('캐시가 유효한데 CSV를 다시 읽음')
+
+
+def test_cache_hit_skips_csv_parsing(question_dir, monkeypatch):
+    parsed = QuestionBank.load(question_dir)
+    monkeypatch.setattr(QuestionBank, '_parse', classmethod(_fail_read))
+
+    assert bank_state(QuestionBank.load(question_dir)) == bank_state(parsed)
+
+
+def test_mtime_only_change_reuses_cache(question_dir, monkeypatch):
+    parsed = QuestionBank.load(question_dir)
+    csv_path = question_dir / "O-X-question.csv"
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    monkeypatch.setattr(QuestionBank, '_parse', classmethod(_fail_read))
+
+    assert bank_state(QuestionBank.load(question_dir)) == bank_state(parsed)
+    # 갱신된 서명으로 다시 저장되어 다음 로드는 해시 계산 없이 적중
+    monkeypatch.setattr('recommend.question_bank._file_hash', _fail_read)
+    assert bank_state(QuestionBank.load(question_dir)) == bank_state(parsed)
+
+
+def test_cache_from_other_format_version_is_ignored(question_dir, monkeypatch):
+    parsed = QuestionBank.load(question_dir)
+    monkeypatch.setattr('recommend.question_bank.CACHE_FORMAT_VERSION', CACHE_FORMAT_VERSION + 1)
+    calls = []
+    original = QuestionBank._parse.__func__
+
+    def counting_parse(cls, base_path):
+        calls.append(base_path)
+        return original(cls, base_path)
+
+    monkeypatch.setattr(QuestionBank, '_parse', classmethod(counting_parse))
+    assert bank_state(QuestionBank.load(question_dir)) == bank_state(parsed)
+    assert len(calls) == 1
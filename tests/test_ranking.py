@@ -0,0 +1,48 @@
+"""
+부분 선택 Top-K 동등성 테스트 (전체 정렬과 비교, k > 아이템 수, -inf 마스킹)
+"""
+import numpy as np
+import pytest
+
+from recommend.ranking import top_k_indices
+
+
+@pytest.mark.parametrize('top_k', [1, 5, 37, 100, 150])
+def test_top_k_matches_full_sort(top_k):
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=(8, 100)).astype(np.float32)
+
+    indices = top_k_indices(scores, top_k)
+    expected = np.argsort(-scores, axis=1, kind='stable')[:, :min(top_k, scores.shape[1])]
+    np.testing.assert_array_equal(indices, expected)
+
+
+def test_top_k_with_ties_returns_top_scores():
+    rng = np.random.default_rng(1)
+    scores = rng.integers(0, 5, size=(4, 50)).astype(np.float32)
+
+    indices = top_k_indices(scores, 10)
+    expected = -np.sort(-scores, axis=1)[:, :10]
+    np.testing.assert_array_equal(np.take_along_axis(scores, indices, axis=1), expected)
+    assert all(len(set(row)) == 10 for row in indices.tolist())
+
+
+def test_top_k_single_vector_and_empty():
+    scores = np.asarray([0.1, 0.9, 0.5], dtype=np.float32)
+    np.testing.assert_array_equal(top_k_indices(scores, 2), [1, 2])
+    assert top_k_indices(scores, 0).shape == (0,)
+
+
+def test_top_k_larger_than_item_count_returns_full_sort():
+    rng = np.random.default_rng(2)
+    scores = rng.normal(size=(3, 7)).astype(np.float32)
+
+    indices = top_k_indices(scores, 20)
+    np.testing.assert_array_equal(indices, np.argsort(-scores, axis=1, kind='stable'))
+
+
+def test_top_k_masked_scores_rank_last():
+    # 필터로 -inf가 된 아이템은 남은 자리가 있을 때만 뒤쪽에 옴
+    scores = np.asarray([[0.3, -np.inf, 0.7, -np.inf, 0.1]], dtype=np.float32)
+    np.testing.assert_array_equal(top_k_indices(scores, 3), [[2, 0, 4]])
+    assert np.isneginf(scores[0, top_k_indices(scores, 5)[0, 3:]]).all()
@@ -0,0 +1,34 @@
+"""
+추천 결과 캐시 키 / LRU 테스트
+"""
+import math
+
+from recommend.result_cache import RecommendationCache, quantize_weights
+
+
+def test_quantize_is_scale_invariant():
+    assert quantize_weights([3, 1], [0.4, 0.8]) == quantize_weights([1, 3], [0.2, 0.1])
+    assert quantize_weights([1, 2], [0.5, -0.5]) == quantize_weights([1, 2], [0.5, 0.5])
+    assert quantize_weights([1, 2], [0.5, -0.5], signed=True) != quantize_weights([1, 2], [0.5, 0.5], signed=True)
+
+
+def test_quantize_skips_empty_and_non_finite_weights():
+    assert quantize_weights([], []) is None
+    assert quantize_weights([1], [0.0]) is None
+    for bad in (math.nan, math.inf, -math.inf):
+        assert quantize_weights([1, 2], [0.5, bad]) is None
+        assert quantize_weights([1, 2], [0.5, bad], signed=True) is None
+
+
+def test_cache_lru_and_top_k():
+    cache = RecommendationCache(max_entries=2)
+    cache.put('a', 5, [{'item_id': 1}])
+    cache.put('b', 5, [{'item_id': 2}])
+    assert cache.get('a', 10) is None
+    assert cache.get('a', 5) == [{'item_id': 1}]
+
+    # 'b'가 가장 오래 안 쓴 항목
+    cache.put('c', 5, [{'item_id': 3}])
+    assert cache.get('b', 5) is None
+    assert cache.get('c', 5) == [{'item_id': 3}]
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 2, 1)
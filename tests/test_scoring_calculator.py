@@ -0,0 +1,159 @@
+"""
+채점 계산기 동등성 테스트
+
+- 컴파일된 선택지 가중치 / Pref_ 전파 표 == 질문 CSV를 pandas로 직접 읽어 계산한 원래 규칙
+- Pref_ 전파 행렬 == emotion-concept-relation.csv의 +/- 표시 × 0.25
+"""
+import random
+
+import pytest
+
+from recommend.question_bank import QuestionBank, QUESTION_FILES, DEFAULT_BASE_PATH, PREF_CONCEPT_COLUMNS
+from recommend.scoring_calculator import ScoringCalculator
+
+pd = pytest.importorskip('pandas')
+
+PREF_CONCEPTS = (
+    'Texture_Softness', 'Texture_Smoothness', 'Brand', 'Color_Brightness',
+    'Color_Saturation', 'Simple', 'Glossiness', 'Color_Temperature'
+)
+
+
+class ReferenceCalculator:
+    """pandas DataFrame 필터링으로 질문마다 CSV 행을 찾는 원래 채점 규칙"""
+
+    def __init__(self, base_path=DEFAULT_BASE_PATH):
+        read = lambda name: pd.read_csv(base_path / QUESTION_FILES[name])
+        self.choice_2 = read('choice_2')
+        self.choice_4 = read('choice_4')
+        self.choice_5 = read('choice_5')
+        self.choice_ox = read('choice_ox')
+        self.emotion_concept = read('emotion_concept')
+
+    @staticmethod
+    def _first_row(data, question):
+        rows = data[data['question'] == question]
+        return None if rows.empty else rows.iloc[0]
+
+    def answer_weight(self, question_type, question, choice_index):
+        if question_type == '5_point_question':
+            weight = (choice_index + 1) * 0.2
+            row = self._first_row(self.choice_5, question)
+            if row is not None and row['positive_negative_relation'] == '-':
+                weight = -weight
+            return weight
+
+        data = {'2_choice_question': self.choice_2, '4_choice_question': self.choice_4,
+                'O_X_question': self.choice_ox}.get(question_type)
+        if data is None:
+            return None
+        row = self._first_row(data, question)
+        if row is None:
+            return 0.0
+        if question_type == '4_choice_question':
+            column = f'pn_response_{choice_index + 1}'
+        else:
+            column = 'pn_response_1' if choice_index == 0 else 'pn_response_2'
+        if column not in row:
+            return 0.0
+        return 0.7 if row[column] == '+' else -0.7
+
+    def calculate_user_weights(self, answers):
+        grouped = {}
+        for answer in answers.values():
+            weight = self.answer_weight(answer['question_type'], answer['question'], answer['choice_index'])
+            if weight is not None:
+                grouped.setdefault(answer['target_node'], []).append(weight)
+        weights = {node: sum(values) / len(values) for node, values in grouped.items()}
+
+        for pref_node in [node for node in weights if node.startswith('Pref_')]:
+            emotion = pref_node.replace('Pref_', '')
+            rows = self.emotion_concept[self.emotion_concept['Emotion'] == f'[{emotion}]']
+            if not rows.empty:
+                row = rows.iloc[0]
+                for concept in PREF_CONCEPTS:
+                    if concept in row and row[concept] in ('+', '-'):
+                        extra = weights[pref_node] * 0.25 * (1 if row[concept] == '+' else -1)
+                        weights[concept] = weights.get(concept, 0.0) + extra
+            weights[emotion] = weights.pop(pref_node)
+
+        return {node: max(-1.0, min(1.0, weight)) for node, weight in weights.items()}
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return ScoringCalculator(QuestionBank.load(cache_path=None))
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return ReferenceCalculator()
+
+
+def make_answers(questions, choice_indices):
+    return {
+        question['id']: {
+            'question': question['question'],
+            'question_type': question['question_type'],
+            'target_node': question['target_node'],
+            'selected_choice': '',
+            'choice_index': int(choice_index)
+        }
+        for question, choice_index in zip(questions, choice_indices)
+        if choice_index >= 0
+    }
+
+
+def assert_same_weights(actual, expected):
+    # 노드 순서까지 같아야 함 (Streamlit 표시 순서)
+    assert list(actual) == list(expected)
+    for node, weight in expected.items():
+        assert actual[node] == pytest.approx(weight, abs=1e-12)
+
+
+def test_choice_weight_tables_match_csv(calculator, reference):
+    for question in calculator.question_bank.questions:
+        for choice_index in range(-1, len(question['choices']) + 1):
+            expected = reference.answer_weight(question['question_type'], question['question'], choice_index)
+            actual = calculator._answer_weight(question['question_type'], question['question'], choice_index)
+            assert actual == pytest.approx(expected, abs=1e-12), (question['id'], choice_index)
+
+
+def test_unknown_questions_match_reference(calculator, reference):
+    for question_type in ('5_point_question', '2_choice_question', '4_choice_question', 'O_X_question', 'other'):
+        answers = {'x': {'question': '없는 질문', 'question_type': question_type, 'target_node': 'Pref_Cute',
+                         'selected_choice': '', 'choice_index': 1}}
+        assert_same_weights(calculator.calculate_user_weights(answers), reference.calculate_user_weights(answers))
+
+
+def test_user_weights_match_reference(calculator, reference):
+    questions = calculator.question_bank.questions
+    rng = random.Random(0)
+    for _ in range(50):
+        choice_indices = [
+            rng.randrange(len(question['choices'])) if rng.random() > 0.1 else -1 for question in questions
+        ]
+        answers = make_answers(questions, choice_indices)
+        assert_same_weights(calculator.calculate_user_weights(answers), reference.calculate_user_weights(answers))
+
+
+def test_pref_matrix_matches_emotion_concept_csv(calculator, reference):
+    relation = reference.emotion_concept
+    emotions = relation['Emotion'][relation['Emotion'].str.match(r'^\[.*\]$', na=False)].str[1:-1].unique().tolist()
+    assert list(calculator.pref_emotions) == emotions
+
+    concept_cols = {concept: col for col, concept in enumerate(PREF_CONCEPT_COLUMNS)}
+    for emotion in emotions:
+        row = relation[relation['Emotion'] == f'[{emotion}]'].iloc[0]
+        for concept in PREF_CONCEPTS:
+            sign = {'+': 1, '-': -1}.get(row[concept], 0) if concept in row else 0
+            assert calculator.pref_matrix[calculator.pref_index[emotion], concept_cols[concept]] == 0.25 * sign
+
+
+def test_pref_only_answers_match_reference(calculator, reference):
+    # emotion마다 Pref_ 노드 하나만 응답 (관계 행이 없는 emotion 포함)
+    for emotion in list(calculator.pref_emotions) + ['없는감정']:
+        for choice_index in range(5):
+            answers = {'x': {'question': '없는 질문', 'question_type': '5_point_question',
+                             'target_node': f'Pref_{emotion}', 'selected_choice': '', 'choice_index': choice_index}}
+            assert_same_weights(calculator.calculate_user_weights(answers), reference.calculate_user_weights(answers))
@@ -0,0 +1,107 @@
+"""
+추천 서비스 요청 검증 / 마이크로 배치 실패 격리 테스트 (엔진은 가짜 객체로 대체)
+"""
+import asyncio
+import math
+
+import pytest
+
+from recommend import service
+from recommend.service import BadRequest, RecommendationBatcher, RecommendationService
+
+
+class FakeEngine:
+    """가중치에 'boom' 노드가 있으면 배치 전체를 실패시키는 엔진"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def get_batch_recommendations(self, user_weights, top_k, filters=None, diversity=None):
+        self.batch_sizes.append(len(user_weights))
+        if any('boom' in weights for weights in user_weights):
+            raise RuntimeError('boom')
+        return [[{'item_id': row, 'score': 1.0}] for row in range(len(user_weights))]
+
+    def get_item_details(self, recommendations):
+        return recommendations
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(service, 'get_engine', lambda: engine)
+    return engine
+
+
+@pytest.mark.parametrize('value', ['NaN', 'Infinity', '-Infinity'])
+def test_non_finite_weights_rejected(value):
+    with pytest.raises(BadRequest):
+        RecommendationService().parse_request(f'{{"weights": {{"Extraversion": {value}}}}}'.encode())
+
+
+def test_failing_request_does_not_fail_its_batch(engine):
+    service_ = RecommendationService(RecommendationBatcher(window_ms=50.0))
+    bodies = [b'{"weights": {"Extraversion": 0.5}, "details": false}'] * 4
+    bodies.insert(2, b'{"weights": {"boom": 1.0}, "details": false}')
+
+    async def run():
+        return await asyncio.gather(
+            *(service_.batcher.submit(service_.parse_request(body)) for body in bodies), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert isinstance(results[2], RuntimeError)
+    assert all(isinstance(result, dict) and result['recommendations'] for i, result in enumerate(results) if i != 2)
+    # 첫 배치(5개)가 실패한 뒤 요청별로 다시 실행
+    assert engine.batch_sizes[0] == 5
+    assert math.isclose(results[0]['weights']['Extraversion'], 0.5)
+
+
+@pytest.mark.parametrize('content_length, status', [('abc', 400), ('-5', 400), (str(service.MAX_BODY_BYTES + 1), 413)])
+def test_invalid_content_length(content_length, status):
+    async def run():
+        server = await asyncio.start_server(RecommendationService().handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f'POST /recommend HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n'.encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            writer.close()
+            return status_line
+
+    assert asyncio.run(run()).split()[1] == str(status).encode()
+
+
+def test_answers_scored_in_one_batch_call(engine, monkeypatch):
+    from recommend.scoring_calculator import ScoringCalculator
+
+    calculator = ScoringCalculator()
+    calls = []
+    batch_user_weights = calculator.calculate_batch_user_weights
+    monkeypatch.setattr(calculator, 'calculate_batch_user_weights',
+                        lambda answers_list: calls.append(len(answers_list)) or batch_user_weights(answers_list))
+    batcher = RecommendationBatcher()
+    batcher.calculator = calculator
+
+    questions = calculator.question_bank.questions[:10]
+    answers = [
+        {q['id']: {'question': q['question'], 'question_type': q['question_type'],
+                   'target_node': q['target_node'], 'choice_index': (row + col) % len(q['choices'])}
+         for col, q in enumerate(questions)}
+        for row in range(3)
+    ]
+    bad = {'x': {'question': 'q', 'question_type': '5_point_question', 'target_node': 'Openness', 'choice_index': 9}}
+    requests = [
+        {'weights': None, 'answers': answers_, 'top_k': 1, 'filters': None, 'filters_key': None,
+         'diversity': None, 'diversity_key': None, 'details': False, 'explain': False}
+        for answers_ in answers + [bad]
+    ]
+
+    results = batcher._recommend_batch(requests)
+    assert calls[0] == 4
+    for answers_, result in zip(answers, results):
+        expected = calculator.calculate_user_weights(answers_)
+        assert list(result['weights']) == list(expected)
+        assert result['weights'] == pytest.approx(expected, abs=1e-12)
+    assert 'error' in results[3]
@@ -0,0 +1,39 @@
+"""
+User 임베딩 저장소 테스트
+
+- `in` 검사는 통계 카운터와 LRU 순서를 바꾸지 않음
+"""
+import numpy as np
+
+from recommend.user_store import UserEmbeddingStore
+
+
+def test_contains_has_no_side_effects():
+    store = UserEmbeddingStore(max_entries=2)
+    store.put('a', np.zeros(4))
+    store.put('b', np.ones(4))
+
+    assert 'a' in store
+    assert 'missing' not in store
+    assert store.stats()['hits'] == 0
+    assert store.stats()['misses'] == 0
+
+    # 'a'가 LRU 맨 앞에 그대로 있어야 새 항목이 들어올 때 'a'가 제거됨
+    store.put('c', np.ones(4))
+    assert 'a' not in store
+    assert 'b' in store and 'c' in store
+
+
+def test_contains_respects_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('recommend.user_store.time.monotonic', lambda: now[0])
+    store = UserEmbeddingStore(ttl_seconds=10)
+    store.put('a', np.zeros(4))
+
+    assert 'a' in store
+    now[0] += 11
+    assert 'a' not in store
+    # 만료 정리는 get()/put()의 몫이므로 통계는 그대로
+    assert store.stats()['expirations'] == 0
+    assert store.get('a') is None
+    assert store.stats()['expirations'] == 1
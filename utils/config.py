@@ -13,6 +13,7 @@ GRAPH_DATA_DIR = DATA_DIR / "graph_data"
 
 # 그래프 관련 경로
 GRAPH_PKL_PATH = DATA_DIR / "recommendation_graph.pkl"
+GRAPH_SNAPSHOT_PATH = DATA_DIR / "recommendation_graph.npz"
 ENTITY_LIST_PATH = GRAPH_DATA_DIR / "entity_list.txt"
 TRAIT_CONCEPT_WEIGHTS_PATH = GRAPH_DATA_DIR / "trait_concept_weights.txt"
 ITEM_CONCEPT_WEIGHTS_PATH = GRAPH_DATA_DIR / "item_concept_weights.txt"